@@ -5,7 +5,7 @@
     'category': 'Agro Modules',
     'author': 'Nadim Hossain',
     'website': 'https://betopiagroup.com/',
-    'depends': ['base'],
+    'depends': ['base', 'stock'],
     'data': [
         'views/res_company_views.xml',
     ],
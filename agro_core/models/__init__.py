@@ -1 +1,3 @@
-from . import res_company
\ No newline at end of file
+from . import res_company
+from . import ir_sequence
+from . import stock_consumption
@@ -0,0 +1,60 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+
+class IrSequence(models.Model):
+    _inherit = "ir.sequence"
+
+    date_range_daily = fields.Boolean(
+        string="Reset Every Day",
+        help="Create one date range per day instead of one per year, so the numbering restarts daily.",
+    )
+
+    def _create_date_range_seq(self, date):
+        if not self.date_range_daily:
+            return super()._create_date_range_seq(date)
+        return self.env['ir.sequence.date_range'].sudo().create({
+            'date_from': date,
+            'date_to': date,
+            'sequence_id': self.id,
+        })
+
+    def _next_batch(self, count, sequence_date=None):
+        """Return ``count`` new references of this sequence.
+
+        Standard sequences draw all the numbers from their PostgreSQL sequence
+        in a single statement, without locking or scanning any table; no-gap
+        sequences fall back to ``_next``.
+        """
+        self.ensure_one()
+        if count <= 0:
+            return []
+        if self.implementation != 'standard':
+            return [self._next(sequence_date=sequence_date) for _i in range(count)]
+
+        sequence_date = sequence_date or fields.Date.today()
+        sequence = self.with_context(ir_sequence_date=sequence_date)
+        pg_sequence = "ir_sequence_%03d" % self.id
+        if self.use_date_range:
+            date_range = self.env['ir.sequence.date_range'].search([
+                ('sequence_id', '=', self.id),
+                ('date_from', '<=', sequence_date),
+                ('date_to', '>=', sequence_date),
+            ], order='id', limit=1) or self._create_date_range_seq(sequence_date)
+            sequence = sequence.with_context(ir_sequence_date_range=date_range.date_from)
+            pg_sequence = "ir_sequence_%03d_%03d" % (self.id, date_range.id)
+
+        self.env.cr.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [pg_sequence, count])
+        return [sequence.get_next_char(number) for number, in self.env.cr.fetchall()]
+
+    @api.model
+    def _next_batch_by_code(self, code, count, sequence_date=None, company=None):
+        """Return ``count`` new references of the sequence ``code`` of ``company``."""
+        company = company or self.env.company
+        sequence = self.sudo().search([
+            ('code', '=', code),
+            ('company_id', 'in', [company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            raise UserError(f"No sequence is defined for '{code}'.")
+        return sequence._next_batch(count, sequence_date=sequence_date)
@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from odoo import models, api
+from odoo.exceptions import UserError
+from odoo.tools import float_compare, float_is_zero
+
+
+class StockConsumption(models.AbstractModel):
+    """FIFO stock deduction shared by the agro modules.
+
+    Takes consumption requests in bulk, locks the matching internal quants
+    once, allocates every request oldest-quant first across locations and
+    posts one scrap per (product, location) instead of one per quant and
+    record.
+    """
+
+    _name = "agro.stock.consumption"
+    _description = "FIFO Stock Consumption"
+
+    @api.model
+    def consume(self, requests, company=None):
+        """Deduct the requested quantities from internal stock.
+
+        :param requests: list of dicts with ``product`` (product.product),
+            ``qty`` and ``origin``; an optional ``location`` restricts the
+            request to that location and its children, an optional
+            ``company`` overrides the default one.
+        :param company: default company of the quants and scraps, the
+            current one if not given
+        :returns: list of ``stock.scrap`` recordsets, one per request in the
+            same order; requests without product or quantity get an empty one
+        :raises UserError: when a product does not have enough stock
+        """
+        company = company or self.env.company
+        Scrap = self.env['stock.scrap']
+        result = [Scrap.browse() for _req in requests]
+        # (input index, request) of the requests to deduct
+        requests = [
+            (index, dict(req, company=req.get('company') or company))
+            for index, req in enumerate(requests) if req['product'] and req['qty'] > 0
+        ]
+        if not requests:
+            return result
+
+        pools = self._lock_quants([req for _index, req in requests])
+
+        # (product id, location id, company id) -> [qty, origins, request indexes]
+        postings = defaultdict(lambda: [0.0, [], set()])
+        for index, req in requests:
+            product = req['product']
+            rounding = product.uom_id.rounding
+            location = req.get('location')
+            pool = [
+                quant for quant in pools[(product.id, req['company'].id)]
+                if not location or quant['parent_path'].startswith(location.parent_path)
+            ]
+            available = sum(quant['quantity'] for quant in pool)
+            if float_compare(available, req['qty'], precision_rounding=rounding) < 0:
+                raise UserError(
+                    f"Not enough {product.display_name} in stock!\n"
+                    f"Available: {available}, Required: {req['qty']}"
+                )
+            remaining = req['qty']
+            for quant in pool:
+                if float_is_zero(remaining, precision_rounding=rounding):
+                    break
+                take = min(quant['quantity'], remaining)
+                if float_is_zero(take, precision_rounding=rounding):
+                    continue
+                quant['quantity'] -= take
+                remaining -= take
+                posting = postings[(product.id, quant['location_id'], req['company'].id)]
+                posting[0] += take
+                if req.get('origin') and req['origin'] not in posting[1]:
+                    posting[1].append(req['origin'])
+                posting[2].add(index)
+
+        products = {req['product'].id: req['product'] for _index, req in requests}
+        for (product_id, location_id, company_id), (qty, origins, indexes) in postings.items():
+            scrap = Scrap.create({
+                'product_id': product_id,
+                'product_uom_id': products[product_id].uom_id.id,
+                'scrap_qty': qty,
+                'location_id': location_id,
+                'company_id': company_id,
+                'origin': ", ".join(origins),
+            })
+            scrap.action_validate()
+            for index in indexes:
+                result[index] |= scrap
+        return result
+
+    @api.model
+    def _lock_quants(self, requests):
+        """Lock the internal quants of the requested products, oldest first.
+
+        :returns: ``{(product id, company id): [quant dicts]}`` in FIFO order
+        """
+        product_ids = list({req['product'].id for req in requests})
+        company_ids = list({req['company'].id for req in requests})
+        self.env['stock.quant'].flush_model(['product_id', 'company_id', 'location_id', 'quantity', 'in_date'])
+        self.env.cr.execute("""
+            SELECT q.id, q.product_id, q.company_id, q.location_id, q.quantity, l.parent_path
+              FROM stock_quant q
+              JOIN stock_location l ON l.id = q.location_id
+             WHERE q.product_id = ANY(%s)
+               AND q.company_id = ANY(%s)
+               AND l.usage = 'internal'
+               AND q.quantity > 0
+             ORDER BY q.in_date, q.id
+               FOR UPDATE OF q
+        """, [product_ids, company_ids])
+        pools = defaultdict(list)
+        for row in self.env.cr.dictfetchall():
+            pools[(row['product_id'], row['company_id'])].append(row)
+        return pools
@@ -28,12 +28,21 @@
         'views/ventilation_level_views.xml',
         'views/ventilation_details_views.xml',
         'views/open_level_views.xml',
+        'views/daily_import_views.xml',
+        'views/breed_standard_views.xml',
+        'views/flock_daily_kpi_views.xml',
         'views/menu_views.xml',
+        'views/res_company_views.xml',
         'data/seq_mortality_details.xml',
         'data/seq_production_details.xml',
         'data/seq_temperature.xml',
         'data/seq_flock_details.xml',
+        'data/reference_sequences.xml',
         'data/ir_cron.xml',
+        'data/running_totals.xml',
+        'data/weather_provider.xml',
+        'data/weather_data.xml',
+        'data/anomaly_detection.xml',
     ],
 
     'assets': {
@@ -1 +1,2 @@
-from . import temperature_controller
\ No newline at end of file
+from . import temperature_controller
+from . import daily_import_controller
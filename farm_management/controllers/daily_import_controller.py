@@ -0,0 +1,18 @@
+from odoo import http
+from odoo.exceptions import UserError, AccessError
+from odoo.http import request
+
+
+class DailyImportController(http.Controller):
+
+    @http.route('/farm/daily-import', type='json', auth='user', methods=['POST'])
+    def import_daily_entries(self, rows=None, csv=None):
+        """Bulk import shed readings given as JSON ``rows`` or as ``csv`` text."""
+        Import = request.env['farm.daily.import']
+        try:
+            rows = Import._parse_rows(csv, 'csv') if csv is not None else Import._normalize_rows(rows or [])
+            counts = Import._import_rows(rows)
+        except (UserError, AccessError) as e:
+            request.env.cr.rollback()
+            return {'success': False, 'error': str(e)}
+        return {'success': True, 'result': counts}
@@ -7,6 +7,25 @@ _logger = logging.getLogger(__name__)
 
 class TemperatureController(http.Controller):
 
+    @http.route('/weather/dashboard/hourly', type='http', auth='user', methods=['GET'])
+    def get_dashboard_hourly(self):
+        """Serve the cached hourly series; read-only, answers 304 when unchanged."""
+        Weather = request.env['weather.data'].sudo()
+        version = Weather._get_dashboard_version()
+        if not version:
+            return request.make_json_response(
+                {'success': False, 'error': 'No weather data available.'}, status=404
+            )
+
+        etag = 'weather-%s-%s' % version
+        headers = [('ETag', '"%s"' % etag), ('Cache-Control', 'private, no-cache')]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response('', headers=headers, status=304)
+        return request.make_response(
+            Weather._get_dashboard_payload(*version),
+            headers=headers + [('Content-Type', 'application/json')],
+        )
+
     @http.route('/get/live-temperature', type='json', auth='user', methods=['POST'])
     def get_live_temperature(self, record_id=None):
 
@@ -1,3 +1,10 @@
+from . import running_total
+from . import reference
+from . import line_audit
+from . import breed_standard
+from . import flock_daily_kpi
+from . import flock_analytics
+from . import flock_anomaly
 
 from . import flock 
 from . import mortality_details 
@@ -7,6 +14,8 @@ from . import feed
 from . import water_intake
 from . import medicine_entry
 from . import suggest_medicine_by_temp
+from . import weather_hourly
+from . import weather_provider
 from . import farm_boy_requests
 from . import body_weight
 from . import  producttemplateinherit
@@ -14,3 +23,5 @@ from . import menual_temp_entry
 from . import ventilation_level 
 from . import ventilation_fans
 from . import ventilation_farm_details 
+from . import res_company
+from . import daily_import
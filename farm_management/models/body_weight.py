@@ -1,15 +1,20 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
 from datetime import date
 from datetime import datetime
 from odoo.exceptions import ValidationError
+from odoo.tools import float_compare
 MAX_INT_32 = 2**32
 
+# weight field -> breed standard curve field
+STANDARD_WEIGHT_FIELDS = {'std_weight': 'body_weight', 'min_weight': 'min_weight', 'max_weight': 'max_weight'}
+
 class FlockBodyWeight(models.Model):
     _name = "flock.body.weight"
     _description = "Flock Body Weight Records"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'farm.daily.kpi.source', 'mail.thread', 'mail.activity.mixin']
     _order = "age_in_days asc"
+    _kpi_trigger_fields = ('act_weight',)
     
     
     date = fields.Date(string="Date", default=fields.Date.today,tracking =True)
@@ -19,9 +24,16 @@ class FlockBodyWeight(models.Model):
     age_in_days = fields.Integer(string="Age (Days)", required=True, tracking=True)
 
     act_weight = fields.Float(string="Actual Weight (g)",tracking=True)
-    std_weight = fields.Float(string="Standard Range (g)",tracking=True)
-    min_weight = fields.Float(string="Min Weight (g)",tracking=True)
-    max_weight = fields.Float(string="Max Weight (g)",tracking=True)
+    std_weight = fields.Float(string="Standard Range (g)", compute="_compute_standard_weights", store=True, readonly=False, tracking=True)
+    min_weight = fields.Float(string="Min Weight (g)", compute="_compute_standard_weights", store=True, readonly=False, tracking=True)
+    max_weight = fields.Float(string="Max Weight (g)", compute="_compute_standard_weights", store=True, readonly=False, tracking=True)
+    weights_typed = fields.Boolean(string="Weights Typed", readonly=True, copy=False,
+                                   help="The standard weights were entered by hand and no longer follow the breed standard.")
+    status = fields.Selection([
+        ('low', 'Below Standard'),
+        ('normal', 'Normal'),
+        ('high', 'Above Standard'),
+    ], string="Status", compute="_compute_status", store=True)
     note_html = fields.Html(string="Notes (HTML)")
 
     flock_id = fields.Many2one("farm.layer.flock", string="Flock", tracking=True)
@@ -34,24 +46,10 @@ class FlockBodyWeight(models.Model):
     age_in_days = fields.Integer(string="Age in Days")
     age_in_weeks = fields.Char(string="Age in Weeks")
 
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            last_record = self.search([('name', 'like', 'B/W/%')], 
-                                      order='id desc', limit=1)
-            if last_record and last_record.name:
-                try:
-                    last_seq = int(last_record.name.split('/')[-1])
-                    next_seq = str(last_seq + 1).zfill(5)  
-                except ValueError:
-                    next_seq = '00001'
-            else:
-                next_seq = '00001'
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            vals['name'] = f"B/W/{today_str}"
+    def init(self):
+        # daily records are looked up by flock and day
+        tools.create_index(self._cr, 'flock_body_weight_flock_date_idx', self._table, ['flock_id', 'date'])
 
-        return super(FlockBodyWeight, self).create(vals)
-    
     @api.constrains('act_weight', 'min_weight', 'max_weight')
     def _check_weight_limits(self):
         for rec in self:
@@ -83,6 +81,65 @@ class FlockBodyWeight(models.Model):
         self.current_birds = self.flock_id.total_qty
 
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._mark_typed_weights(vals_list)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'weights_typed' not in vals:
+            self._mark_typed_weights([vals] * len(self))
+        return res
+
+    def _mark_typed_weights(self, vals_list):
+        """Flag the records whose written weights differ from their breed standard."""
+        written = [
+            (rec, vals, STANDARD_WEIGHT_FIELDS.keys() & vals.keys())
+            for rec, vals in zip(self, vals_list)
+        ]
+        written = [(rec, vals, keys) for rec, vals, keys in written if keys and not rec.weights_typed]
+        if not written:
+            return
+        standard_weights = self.browse([rec.id for rec, _vals, _keys in written])._get_standard_weights()
+        self.browse([
+            rec.id for rec, vals, keys in written
+            if any(
+                float_compare(vals[key] or 0.0, standard_weights.get(rec, {}).get(key, 0.0), precision_digits=2)
+                for key in keys
+            )
+        ]).weights_typed = True
+
+    def _get_standard_weights(self):
+        """Return ``{record: {weight field: value}}`` from each flock's breed standard.
+
+        Records without a standard are left out, as are the weights the
+        standard gives no positive value for.
+        """
+        standards = self.env['farm.breed.standard']
+        result = {}
+        for standard, records in self.grouped(lambda rec: rec.flock_id.breed_standard_id).items():
+            if not standard or not standard.line_ids:
+                continue
+            curve = standards._interpolate(standard.id, records.mapped('age_in_days'))
+            for index, rec in enumerate(records):
+                result[rec] = {
+                    fname: curve[curve_field][index]
+                    for fname, curve_field in STANDARD_WEIGHT_FIELDS.items()
+                    if curve[curve_field][index] > 0
+                }
+        return result
+
+    @api.depends('flock_id.breed_standard_id', 'age_in_days')
+    def _compute_standard_weights(self):
+        """Read the weights from the flock's breed standard; typed ones and those it lacks stay as they are."""
+        standard_weights = self._get_standard_weights()
+        for rec in self:
+            values = {} if rec.weights_typed else standard_weights.get(rec, {})
+            for fname in STANDARD_WEIGHT_FIELDS:
+                rec[fname] = values.get(fname, rec[fname])
+
     @api.depends('act_weight', 'min_weight', 'max_weight')
     def _compute_status(self):
         for rec in self:
@@ -0,0 +1,134 @@
+from bisect import bisect_right
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+
+# curve columns, named like their farm.flock.daily.kpi counterparts
+STANDARD_METRICS = ('body_weight', 'production_percentage', 'feed_per_bird', 'water_per_bird')
+CURVE_FIELDS = STANDARD_METRICS + ('min_weight', 'max_weight')
+
+
+class FarmBreedStandard(models.Model):
+    """Breed performance curve: expected figures by age, with a tolerance."""
+
+    _name = "farm.breed.standard"
+    _description = "Breed Standard"
+    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _order = "name"
+
+    name = fields.Char(string="Breed", required=True, tracking=True)
+    bird_type = fields.Selection([('layer', 'Layer'), ('broiler', 'Broiler')], string="Bird Type", tracking=True)
+    tolerance = fields.Float(string="Tolerance (%)", default=5.0, tracking=True,
+                             help="Deviation from the curve beyond which a flock is flagged.")
+    line_ids = fields.One2many("farm.breed.standard.line", "standard_id", string="Curve", copy=True)
+    active = fields.Boolean(default=True)
+
+    @api.constrains('tolerance')
+    def _check_tolerance(self):
+        for rec in self:
+            if rec.tolerance <= 0:
+                raise ValidationError("Tolerance must be greater than zero.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        standards = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return standards
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'tolerance' in vals:
+            self.env.registry.clear_cache()
+            self._rescore_flocks()
+        return res
+
+    def unlink(self):
+        flocks = self.env['farm.layer.flock'].search([('breed_standard_id', 'in', self.ids)])
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        self.env['farm.flock.daily.kpi']._score_flocks(flocks)
+        return res
+
+    def _rescore_flocks(self):
+        flocks = self.env['farm.layer.flock'].search([('breed_standard_id', 'in', self.ids)])
+        self.env['farm.flock.daily.kpi']._score_flocks(flocks)
+
+    @tools.ormcache('standard_id')
+    def _get_curve(self, standard_id):
+        """Return ``(tolerance, ages, {curve field: values})`` of a standard, sorted on age."""
+        standard = self.browse(standard_id).with_context(active_test=False)
+        lines = standard.line_ids.sorted('age_days')
+        return (
+            standard.tolerance,
+            tuple(lines.mapped('age_days')),
+            {fname: tuple(lines.mapped(fname)) for fname in CURVE_FIELDS},
+        )
+
+    @api.model
+    def _interpolate(self, standard_id, ages):
+        """Read the curve of ``standard_id`` at each of ``ages``.
+
+        Values between two curve points are interpolated linearly; ages outside
+        the curve take the value of its nearest end.
+
+        :returns: ``{curve field: [value per age]}``
+        """
+        _tolerance, curve_ages, curve = self._get_curve(standard_id)
+        if not curve_ages:
+            return {fname: [0.0] * len(ages) for fname in CURVE_FIELDS}
+        last = len(curve_ages) - 1
+        # (lower point, upper point, weight of the upper point) per age
+        spans = []
+        for age in ages:
+            upper = min(max(bisect_right(curve_ages, age), 1), last) if last else 0
+            lower = max(upper - 1, 0)
+            width = curve_ages[upper] - curve_ages[lower]
+            weight = min(max((age - curve_ages[lower]) / width, 0.0), 1.0) if width else 0.0
+            spans.append((lower, upper, weight))
+        return {
+            fname: [
+                values[lower] + (values[upper] - values[lower]) * weight
+                for lower, upper, weight in spans
+            ]
+            for fname, values in curve.items()
+        }
+
+
+class FarmBreedStandardLine(models.Model):
+    _name = "farm.breed.standard.line"
+    _description = "Breed Standard Point"
+    _order = "age_days"
+
+    standard_id = fields.Many2one("farm.breed.standard", string="Breed Standard", required=True, ondelete="cascade")
+    age_days = fields.Integer(string="Age (Days)", required=True)
+    body_weight = fields.Float(string="Body Weight (g)")
+    min_weight = fields.Float(string="Min Weight (g)")
+    max_weight = fields.Float(string="Max Weight (g)")
+    production_percentage = fields.Float(string="Hen-Day Production %")
+    feed_per_bird = fields.Float(string="Feed Per Bird (gm)")
+    water_per_bird = fields.Float(string="Water Per Bird (ml)")
+
+    _sql_constraints = [
+        ('standard_age_uniq', 'unique(standard_id, age_days)', "A breed standard has one point per age."),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env.registry.clear_cache()
+        lines.standard_id._rescore_flocks()
+        return lines
+
+    def write(self, vals):
+        standards = self.standard_id
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        (standards | self.standard_id)._rescore_flocks()
+        return res
+
+    def unlink(self):
+        standards = self.standard_id
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        standards._rescore_flocks()
+        return res
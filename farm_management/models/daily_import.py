@@ -0,0 +1,300 @@
+import base64
+import csv
+import io
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError
+
+from .mortality_details import MORTALITY_CAUSE_KEYS
+
+_logger = logging.getLogger(__name__)
+
+# context for the bulk creates: no tracking, no per-record chatter
+IMPORT_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+    'farm_skip_line_audit': True,
+}
+MAX_REPORTED_ERRORS = 20
+
+
+class FarmDailyImport(models.TransientModel):
+    """Import a day's readings for many flocks at once.
+
+    Each CSV line or JSON object holds one flock and one day:
+
+    - ``flock`` (name or reference) and ``date`` (YYYY-MM-DD), required;
+    - ``eggs_<type>`` per egg type and ``egg_weight``;
+    - ``mortality_<cause>`` per mortality cause;
+    - ``feed_kg``, ``feed_time`` (morning by default) and ``feed_product``;
+    - ``water_category`` and ``water_lit``;
+    - ``body_weight``, ``min_weight``, ``max_weight`` and ``std_weight``.
+
+    Empty readings are skipped; every record of the file is created in one
+    batch per model and each flock gets one summary message.
+    """
+
+    _name = "farm.daily.import"
+    _description = "Import Daily Shed Data"
+
+    file = fields.Binary(string="File", required=True)
+    file_name = fields.Char(string="File Name")
+    file_type = fields.Selection([('csv', 'CSV'), ('json', 'JSON')], string="Format", default='csv', required=True)
+    result = fields.Text(string="Result", readonly=True)
+
+    @api.onchange('file_name')
+    def _onchange_file_name(self):
+        if self.file_name and self.file_name.lower().endswith('.json'):
+            self.file_type = 'json'
+
+    def action_import(self):
+        self.ensure_one()
+        try:
+            content = base64.b64decode(self.file or b'').decode('utf-8-sig')
+        except (ValueError, UnicodeDecodeError):
+            raise UserError("The file must be UTF-8 encoded text.")
+        counts = self._import_rows(self._parse_rows(content, self.file_type))
+        self.result = "\n".join(f"{label}: {count}" for label, count in counts.items())
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    @api.model
+    def _parse_rows(self, content, file_type):
+        if file_type == 'json':
+            try:
+                data = json.loads(content)
+            except ValueError as e:
+                raise UserError(f"Invalid JSON: {e}")
+            rows = data.get('rows', []) if isinstance(data, dict) else data
+        else:
+            rows = list(csv.DictReader(io.StringIO(content)))
+        return self._normalize_rows(rows)
+
+    @api.model
+    def _normalize_rows(self, rows):
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise UserError("The rows must be a list of objects or an object with a 'rows' list.")
+        return [
+            {str(key or '').strip().lower(): value for key, value in row.items()}
+            for row in rows
+        ]
+
+    @api.model
+    def _import_rows(self, rows):
+        """Validate ``rows`` and create all their records, or raise with every error found.
+
+        :returns: number of records created per kind
+        """
+        if not rows:
+            raise UserError("There is nothing to import.")
+        errors = []
+        flocks = self._find_flocks({str(row.get('flock') or '').strip() for row in rows})
+        feed_products = self._find_feed_products({str(row.get('feed_product') or '').strip() for row in rows})
+        egg_types = [key for key, _label in self.env['farm.egg.line']._fields['egg_type'].selection]
+        egg_products = {}
+        for product in self.env['product.template'].search([('egg_type', 'in', egg_types)]):
+            egg_products.setdefault(product.egg_type, product.id)
+        water_categories = dict(self.env['farm.water.intake']._fields['providing_category'].selection)
+        feed_times = dict(self.env['feed.details']._fields['feed_time'].selection)
+
+        vals_by_model = defaultdict(list)
+        days_by_flock = defaultdict(set)
+        feed_lines = {}
+        for line, row in enumerate(rows, start=1):
+            row_errors = []
+
+            def number(key, integer=False):
+                value = row.get(key)
+                if value in (None, ''):
+                    return 0
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    row_errors.append(f"'{key}' is not a number")
+                    return 0
+                if value < 0:
+                    row_errors.append(f"'{key}' cannot be negative")
+                    return 0
+                if integer and not value.is_integer():
+                    row_errors.append(f"'{key}' must be a whole number")
+                return int(value) if integer else value
+
+            flock_key = str(row.get('flock') or '').strip()
+            flock = flocks.get(flock_key)
+            if not flock:
+                row_errors.append(f"unknown flock '{flock_key}'" if flock_key else "flock is missing")
+            try:
+                day = fields.Date.to_date(str(row.get('date') or '').strip() or None)
+            except ValueError:
+                day = None
+            if not day:
+                row_errors.append("date is missing or not YYYY-MM-DD")
+
+            eggs = {egg_type: number(f'eggs_{egg_type}', integer=True) for egg_type in egg_types}
+            deaths = {cause: number(f'mortality_{cause}', integer=True) for cause in MORTALITY_CAUSE_KEYS}
+            feed_kg = number('feed_kg')
+            feed_time = str(row.get('feed_time') or 'morning').strip().lower()
+            feed_product_key = str(row.get('feed_product') or '').strip()
+            water_category = str(row.get('water_category') or '').strip().lower()
+            water_lit = number('water_lit')
+            egg_weight = number('egg_weight')
+            body_weight = number('body_weight')
+            # weights left out of the row come from the flock's breed standard
+            standard_weights = {
+                key: number(key) for key in ('min_weight', 'max_weight', 'std_weight')
+                if row.get(key) not in (None, '')
+            }
+            if body_weight:
+                for key in ('min_weight', 'max_weight'):
+                    if standard_weights.get(key, 1) <= 0:
+                        row_errors.append(f"'{key}' must be greater than zero")
+                missing = [key for key in ('min_weight', 'max_weight') if key not in standard_weights]
+                if missing and flock and day and not self._standard_covers(flock, day, missing):
+                    row_errors.append(f"{' and '.join(missing)} missing and the flock has no breed standard to fill them in")
+            if feed_kg and feed_time not in feed_times:
+                row_errors.append(f"feed_time must be one of {', '.join(feed_times)}")
+            elif feed_kg and flock and day:
+                first_line = feed_lines.setdefault((flock.id, day, feed_time), line)
+                if first_line != line:
+                    row_errors.append(f"feed for this flock, date and feed_time is already on line {first_line}")
+            if feed_product_key and feed_product_key not in feed_products:
+                row_errors.append(f"unknown feed product '{feed_product_key}'")
+            if water_category and water_category not in water_categories:
+                row_errors.append(f"water_category must be one of {', '.join(water_categories)}")
+
+            if row_errors:
+                errors.append(f"Line {line}: {'; '.join(row_errors)}")
+                continue
+
+            age = self._age_at(flock, day)
+            age_display = f"{age // 7} weeks {age % 7} days"
+            birds = int(flock.total_qty)
+            base = {'flock_id': flock.id}
+
+            if any(eggs.values()):
+                vals_by_model['farm.production.details'].append(dict(
+                    base, date=day, current_birds=birds, bird_type=flock.bird_type,
+                    current_age_display=age_display, egg_weight=egg_weight,
+                    egg_line_ids=[
+                        Command.create({
+                            'egg_type': egg_type,
+                            'value': value,
+                            'date': datetime.combine(day, datetime.min.time()),
+                            'product_id': egg_products.get(egg_type, False),
+                        })
+                        for egg_type, value in eggs.items() if value
+                    ],
+                ))
+            if any(deaths.values()):
+                vals_by_model['farm.mortality.details'].append(dict(
+                    base, date=day, product_id=flock.product_id.id,
+                    flock_opening_bird=flock.opening_bird_count,
+                    flock_starting_date=flock.start_date, flock_ending_date=flock.end_date,
+                    current_birds=birds, age_in_days=age, current_age_display=age_display,
+                    breakdown_ids=[
+                        Command.create({'type': cause, 'count': count, 'date': day})
+                        for cause, count in deaths.items() if count
+                    ],
+                ))
+            if feed_kg:
+                vals_by_model['feed.details'].append(dict(
+                    base, datetime=day, feed_time=feed_time, feed_kg=feed_kg,
+                    feed_product_id=feed_products.get(feed_product_key, False),
+                    product_id=flock.product_id.id, current_bird=birds, current_age_days=age,
+                ))
+            if water_category or water_lit:
+                vals_by_model['farm.water.intake'].append(dict(
+                    base, date=day, providing_category=water_category or False, water_lit=water_lit,
+                    current_birds=birds, bird_type=flock.bird_type,
+                    current_age_display=age_display, current_age_days=age,
+                ))
+            if body_weight:
+                vals_by_model['flock.body.weight'].append(dict(
+                    base, date=day, act_weight=body_weight,
+                    age_in_days=age, age_in_weeks=age_display,
+                    current_birds=birds, birds_type=flock.bird_type,
+                    **standard_weights,
+                ))
+            days_by_flock[flock].add(day)
+
+        if errors:
+            more = len(errors) - MAX_REPORTED_ERRORS
+            raise UserError("\n".join(
+                errors[:MAX_REPORTED_ERRORS] + ([f"... and {more} more lines with errors"] if more > 0 else [])
+            ))
+
+        labels = {
+            'farm.production.details': "Production records",
+            'farm.mortality.details': "Mortality records",
+            'feed.details': "Feed records",
+            'farm.water.intake': "Water intake records",
+            'flock.body.weight': "Body weight records",
+        }
+        counts = {}
+        created_by_flock = defaultdict(lambda: defaultdict(int))
+        for model, label in labels.items():
+            records = self.env[model].with_context(**IMPORT_CONTEXT).create(vals_by_model[model])
+            counts[label] = len(records)
+            for flock, flock_records in records.grouped('flock_id').items():
+                created_by_flock[flock][label] += len(flock_records)
+
+        for flock, days in days_by_flock.items():
+            flock.message_post(body="\n".join(
+                [
+                    "Daily Data Imported",
+                    f"Imported By     : {self.env.user.name}",
+                    f"Dates           : {min(days)} to {max(days)}" if len(days) > 1 else f"Date            : {min(days)}",
+                ] + [f"{label:<16}: {count}" for label, count in created_by_flock[flock].items()]
+            ))
+        _logger.info("Daily import: %s flocks, %s", len(days_by_flock), counts)
+        counts["Flocks"] = len(days_by_flock)
+        return counts
+
+    @api.model
+    def _find_flocks(self, keys):
+        """Map flock names and references to flocks, with one search."""
+        keys = [key for key in keys if key]
+        flocks = self.env['farm.layer.flock'].search(['|', ('name', 'in', keys), ('reference', 'in', keys)])
+        found = {flock.reference: flock for flock in flocks}
+        found.update({flock.name: flock for flock in flocks})
+        return found
+
+    @api.model
+    def _find_feed_products(self, keys):
+        keys = [key for key in keys if key]
+        if not keys:
+            return {}
+        products = self.env['product.product'].search([
+            ('is_feed', '=', True),
+            '|', ('name', 'in', keys), ('default_code', 'in', keys),
+        ])
+        found = {product.default_code: product.id for product in products if product.default_code}
+        found.update({product.name: product.id for product in products})
+        return found
+
+    @api.model
+    def _age_at(self, flock, day):
+        """Age of ``flock`` in days on ``day``."""
+        if flock.start_date:
+            return (flock.age_in_days or 0) + (day - flock.start_date).days
+        return flock.current_age_in_days
+
+    @api.model
+    def _standard_covers(self, flock, day, keys):
+        """Whether the flock's breed standard gives a positive value for each of ``keys`` on ``day``."""
+        standard = flock.breed_standard_id
+        if not standard or not standard.line_ids:
+            return False
+        curve = self.env['farm.breed.standard']._interpolate(standard.id, [self._age_at(flock, day)])
+        return all(curve.get(key, [0.0])[0] > 0 for key in keys)
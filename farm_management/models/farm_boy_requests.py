@@ -1,4 +1,4 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import UserError
 from datetime import datetime
 import logging
@@ -8,7 +8,7 @@ class FarmBoyRequest(models.Model):
 
     _name = "farm.boy.request.data"
     _description = "Farm Boy Medicine Request"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
     _order = "name desc"
     
     
@@ -51,6 +51,10 @@ class FarmBoyRequest(models.Model):
     ('rejected', 'Rejected')
     ], default='draft', string="Status", tracking=True)
 
+    def init(self):
+        # daily records are looked up by flock and day
+        tools.create_index(self._cr, 'farm_boy_request_data_flock_date_idx', self._table, ['flock_id', 'date'])
+
     def action_confirm(self):
         for record in self:
             record.state = 'requested'
@@ -59,28 +63,20 @@ class FarmBoyRequest(models.Model):
                 if line.state != 'requested':
                     line.action_done() 
                     
+    def write(self, vals):
+        if 'date' not in vals:
+            return super().write(vals)
+        keys = self.farmboy_request_line_ids._kpi_keys()
+        res = super().write(vals)
+        self.env['farm.flock.daily.kpi']._refresh_days(keys | self.farmboy_request_line_ids._kpi_keys())
+        return res
+
     def action_draft(self):
         for record in self:
             record.state ="draft"
             if record.farmboy_request_line_ids:
                 record.farmboy_request_line_ids.write({"state":"draft"})
         
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search([('name', 'like', f'F/B/{today_str}/%')], order='id desc', limit=1)
-            if last_record and last_record.name:
-                try:
-                    last_seq = int(last_record.name.split('/')[-1])
-                    next_seq = str(last_seq + 1).zfill(5)
-                except ValueError:
-                    next_seq = '00001'
-            else:
-                next_seq = '00001'
-            vals['name'] = f"F/B/{today_str}/{next_seq}"
-        return super(FarmBoyRequest, self).create(vals)
-    
     def _update_parent_state(self):
 
         for request in self:
@@ -104,7 +100,9 @@ class FarmBoyRequestAddLine(models.Model):
 
     _name = "farmboy.request.add.line"
     _description = "Requested from live temperature or manually added medicine"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.daily.kpi.source', 'mail.thread', 'mail.activity.mixin']
+    _kpi_date_field = 'request_date'
+    _kpi_trigger_fields = ('request_id', 'product_id', 'total_dose')
     
 
     
@@ -116,9 +114,9 @@ class FarmBoyRequestAddLine(models.Model):
         tracking=True
     )
 
-    flock_id = fields.Many2one("farm.layer.flock", string="Flock", tracking=True)
+    flock_id = fields.Many2one("farm.layer.flock", string="Flock", tracking=True, index=True)
     product_id = fields.Many2one('product.product', string="Product",tracking =True)
-    request_id = fields.Many2one('farm.boy.request.data',string="Request Reference")
+    request_id = fields.Many2one('farm.boy.request.data',string="Request Reference", index=True)
     total_dose = fields.Float(string="Available Quantity", tracking=True)
     dose_per_bird = fields.Float(string="Dose Per Bird (ml)", tracking=True)
     bird_count = fields.Integer(string="Number of Birds", default=0, tracking=True)
@@ -243,6 +241,13 @@ class FarmBoyRequestAddLine(models.Model):
                 _logger.info(f"Request {record.id} transferred to approval {approval_record.name}")
 
 
+    def _kpi_keys(self):
+        # lines of a request count on the request's day
+        return {
+            (line.flock_id.id, line.request_id.date or line.request_date)
+            for line in self if line.flock_id and (line.request_id.date or line.request_date)
+        }
+
     def write(self, vals):
         res = super(FarmBoyRequestAddLine, self).write(vals)
         if 'state' in vals:
@@ -250,51 +255,23 @@ class FarmBoyRequestAddLine(models.Model):
             self.action_state()
         return res
 
-    def create(self, vals):
-        rec = super(FarmBoyRequestAddLine, self).create(vals)
-        rec.request_id._update_parent_state()
-        if 'state' in vals:
-            rec.action_state()
-        return rec
+    @api.model_create_multi
+    def create(self, vals_list):
+        recs = super(FarmBoyRequestAddLine, self).create(vals_list)
+        recs.request_id._update_parent_state()
+        recs.filtered(lambda rec: rec.state != 'draft').action_state()
+        return recs
 
     def action_state(self):
-        print("done")
-        for record in self:  # loop over all records safely
-            # Only process records in approved state
-            if record.state != "approved":
-                continue
-
+        approved = self.filtered(lambda r: r.state == "approved")
+        for record in approved:
             if not record.product_id:
                 raise UserError("Product not assigned!")
-
             if record.consume_quantity <= 0:
                 raise UserError("Consume quantity must be greater than zero!")
 
-            product = record.product_id
-            quants = self.env['stock.quant'].search([
-                ('product_id', '=', product.id),
-                ('location_id.usage', '=', 'internal'),
-                ('quantity', '>', 0)
-            ], order='quantity desc')
-
-            total_available = sum(q.quantity for q in quants)
-            if total_available < record.consume_quantity:
-                raise UserError(
-                    f"Not enough Medicine available!\nAvailable: {total_available}, Required: {record.consume_quantity}"
-                )
-
-            qty_to_remove = record.consume_quantity
-            for quant in quants:
-                if qty_to_remove <= 0:
-                    break
-
-                remove_qty = min(quant.quantity, qty_to_remove)
-                scrap = self.env['stock.scrap'].create({
-                    'product_id': product.id,
-                    'scrap_qty': remove_qty,
-                    'location_id': quant.location_id.id,
-                    'company_id': self.env.company.id,
-                    'origin': f"Consume Quantity Record ({product.display_name}) - Flock ({record.flock_id.name})"
-                })
-                scrap.action_validate()
-                qty_to_remove -= remove_qty
\ No newline at end of file
+        self.env['agro.stock.consumption'].consume([{
+            'product': record.product_id,
+            'qty': record.consume_quantity,
+            'origin': f"Consume Quantity Record ({record.product_id.display_name}) - Flock ({record.flock_id.name})",
+        } for record in approved])
@@ -1,4 +1,4 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError, UserError
 from datetime import datetime
 import logging
@@ -10,7 +10,7 @@ class AddMedicineByTemp(models.Model):
 
     _name = "farm.medicine.temperature"
     _description = "Temperature-based Medicine Record"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
     _order = "create_date desc"
     
 
@@ -38,22 +38,6 @@ class AddMedicineByTemp(models.Model):
                 record.outside_min <= 0 or record.outside_max <= 0):
                 raise ValidationError("Temperature values must be greater than 0°C.")
 
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('name', 'like', f'T/M/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.name.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['name'] = f"A/M/{today_str}/{next_seq}"
-        return super(AddMedicineByTemp, self).create(vals)
-
     def action_draft(self):
         for rec in self:
             if rec.state != "draft":
@@ -71,7 +55,7 @@ class FarmTemperature(models.Model):
 
     _name = "farm.temperature"
     _description = "Daily Temperature Record"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
     _order = "date desc"
     
 
@@ -99,28 +83,10 @@ class FarmTemperature(models.Model):
     daily_temperature_ids = fields.One2many(
         'daily.temperature.medicine.line', 'daily_temperature_id', string="Medicine Lines",ondelate="casecade"
     )
-    @api.model
-    def create(self, vals):
-        record = super(FarmTemperature, self).create(vals)
-        record._assign_medicines_by_temperature()
-        return record
-    
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('name', 'like', f'M/S/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.name.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['name'] = f"M/S/{today_str}/{next_seq}"
-        return super(FarmTemperature, self).create(vals)
-    
+
+    def init(self):
+        # daily records are looked up by flock and day
+        tools.create_index(self._cr, 'farm_temperature_flock_date_idx', self._table, ['flock_id', 'date'])
 
     def write(self, vals):
         res = super(FarmTemperature, self).write(vals)
@@ -144,44 +110,13 @@ class FarmTemperature(models.Model):
     def _assign_medicines_by_temperature(self):
         for record in self:
             record.daily_temperature_ids = [(5, 0, 0)]
-            medicine_lines_dict = {}
             age = record.age_in_days or 0
             tmin = record.temp_min or 0
             tmax = record.temp_max or 0
 
-            medicine_records = self.env['add.medicine.by.live.temperature'].search([])
-            matched_medicines = self.env['add.medicine.by.live.temperature']
-
-            for med in medicine_records:
-                if med.state != 'done':  
-                    continue
-                ok = False
-                if med.selection_type == 'age':
-                    if med.min_age is not None and med.max_age is not None:
-                        if med.min_age <= age <= med.max_age:
-                            ok = True
-                elif med.selection_type == 'temp':
-                    if med.min_temp is not None and med.max_temp is not None:
-                        if med.min_temp <= tmax and med.max_temp >= tmin:
-                            ok = True
-                elif med.selection_type == 'age_temp':
-                    age_ok = med.min_age is not None and med.max_age is not None and med.min_age <= age <= med.max_age
-                    temp_ok = med.min_temp is not None and med.max_temp is not None and med.min_temp <= tmax and med.max_temp >= tmin
-                    if age_ok and temp_ok:
-                        ok = True
-                if ok:
-                    matched_medicines |= med
-
-            for med in matched_medicines:
-                for line in med.medicine_line_ids:
-                    pid = line.product_id.id
-                    qty = (line.dose_per_water_liter or 0) * (record.current_birds or 0)
-                    if qty <= 0:
-                        continue
-                    if pid in medicine_lines_dict:
-                        medicine_lines_dict[pid] += qty
-                    else:
-                        medicine_lines_dict[pid] = qty
+            medicine_lines_dict = self.env['add.medicine.by.live.temperature']._match_medicines(
+                age, tmin, tmax, record.current_birds
+            )
 
             lines_to_add = []
             for pid, total_qty in medicine_lines_dict.items():
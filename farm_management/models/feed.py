@@ -1,4 +1,4 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from datetime import datetime
 from odoo.exceptions import UserError
 import logging
@@ -9,7 +9,14 @@ class FeedDetails(models.Model):
     _name = "feed.details"
     _description = "Feed Details"
     _rec_name = "flock_id"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'farm.running.total.mixin', 'farm.daily.kpi.source',
+                'mail.thread', 'mail.activity.mixin']
+    _kpi_date_field = 'datetime'
+
+    # per-flock running feed, in (date, id) order
+    _running_date = 'datetime'
+    _running_totals = {'cumm_feed': 'feed_kg'}
+    _kpi_trigger_fields = ('feed_kg', 'current_bird')
    
    
     datetime =fields.Date(string="Date", default=fields.Date.context_today)
@@ -23,7 +30,7 @@ class FeedDetails(models.Model):
     product_id = fields.Many2one('product.product', string="Product")
     on_hand_qty = fields.Float(string="On hand Qty",related='feed_product_id.qty_available',tracking =True)
     feed_kg = fields.Float(string="Feed (kg)", help="Feed quantity in kilograms" )
-    cumm_feed = fields.Float( string="Cumm. Feed", compute="_compute_cumm_feed",store=True )
+    cumm_feed = fields.Float(string="Cumm. Feed", readonly=True)
     status = fields.Boolean( string="Status", default=False )
     state = fields.Selection([('draft','Draft'),('done','Done')],string="Status",default='draft',tracking=True)
     description_html = fields.Html(string='HTML Description', sanitize_attributes=False)
@@ -33,32 +40,33 @@ class FeedDetails(models.Model):
         ('night', 'Night'),
     ], string="Feed Time", required=True, tracking=True)
 
-    @api.model
-    def create(self, vals):
-        
-        existing = self.search([
-        ('flock_id', '=', vals.get('flock_id')),
-        ('datetime', '=', vals.get('datetime')),
-        ('feed_time', '=', vals.get('feed_time')),
-        ], limit=1)
-        if existing:
+    def init(self):
+        # daily records are looked up by flock and day, entries by feed time too
+        tools.create_index(self._cr, 'feed_details_flock_datetime_time_idx', self._table, ['flock_id', 'datetime', 'feed_time'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # one lookup for the whole batch, which must not repeat a slot itself either
+        today = fields.Date.context_today(self)
+        slots = [
+            (vals.get('flock_id'), fields.Date.to_date(vals.get('datetime')) or today, vals.get('feed_time'))
+            for vals in vals_list
+        ]
+        if len(set(slots)) < len(slots) or self._taken_slots(slots):
             raise UserError("A feed record already exists for this flock, date, and time!")
-        
-        if vals.get('name', 'New') == 'New':
-            last_record = self.search([('name', 'like', 'F/M/%')], 
-                                      order='id desc', limit=1)
-            if last_record and last_record.name:
-                try:
-                    last_seq = int(last_record.name.split('/')[-1])
-                    next_seq = str(last_seq + 1).zfill(5)  
-                except ValueError:
-                    next_seq = '00001'
-            else:
-                next_seq = '00001'
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            vals['name'] = f"F/M/{today_str}"
 
-        return super(FeedDetails, self).create(vals)
+        return super(FeedDetails, self).create(vals_list)
+
+    @api.model
+    def _taken_slots(self, slots):
+        """Return the ``(flock id, date, feed time)`` of ``slots`` already recorded."""
+        existing = self.search_read([
+            ('flock_id', 'in', list({flock_id for flock_id, _day, _time in slots})),
+            ('datetime', 'in', list({day for _flock_id, day, _time in slots})),
+            ('feed_time', 'in', list({feed_time for _flock_id, _day, feed_time in slots})),
+        ], ['flock_id', 'datetime', 'feed_time'])
+        recorded = {(rec['flock_id'][0], rec['datetime'], rec['feed_time']) for rec in existing}
+        return recorded.intersection(slots)
     
     @api.onchange('flock_id')
     def _on_change_get_flock_info(self):
@@ -75,15 +83,6 @@ class FeedDetails(models.Model):
             else:
                 rec.feed_per_bird = 0
 
-    @api.depends('feed_kg')
-    def _compute_cumm_feed(self):
-        for rec in self:
-            records = self.search([('flock_id', '=', rec.flock_id.id)], order='datetime')
-            total = 0
-            for r in records:
-                total += r.feed_kg
-                r.cumm_feed = total
-
     def unlink(self):
         for rec in self:
             if rec.state == 'done':
@@ -93,47 +92,24 @@ class FeedDetails(models.Model):
         return super(FeedDetails, self).unlink()
     
     def action_confirm(self):
-
-        for record in self:
-            if record.state == 'done':
-                continue
+        records = self.filtered(lambda r: r.state != 'done')
+        for record in records:
             if not record.feed_product_id:
                 raise UserError("Feed Product is not assigned!")
-
             if record.feed_kg <= 0:
                 raise UserError("Feed quantity must be greater than zero!")
-            qty_to_scrap = record.feed_kg
-
-            quants = self.env['stock.quant'].search([
-                ('product_id', '=', record.feed_product_id.id),
-                ('location_id.usage', '=', 'internal'),
-                ('quantity', '>', 0)
-            ], order='quantity desc')
 
-            total_available = sum(q.quantity for q in quants)
-            if total_available < qty_to_scrap:
-                raise UserError(
-                    f"Not enough feed in stock!\nAvailable: {total_available} kg, Required: {qty_to_scrap} kg"
-                )
-            qty_remaining = qty_to_scrap
-            for quant in quants:
-                if qty_remaining <= 0:
-                    break
-                remove_qty = min(quant.quantity, qty_remaining)
-                scrap = self.env['stock.scrap'].create({
-                    'product_id': record.feed_product_id.id,
-                    'scrap_qty': remove_qty,
-                    'location_id': quant.location_id.id,
-                    'company_id': self.env.company.id,
-                    'origin': f"Feed Details Record {record.id} - Flock {record.flock_id.name}"
-                })
-                scrap.action_validate()
-                qty_remaining -= remove_qty
+        self.env['agro.stock.consumption'].consume([{
+            'product': record.feed_product_id,
+            'qty': record.feed_kg,
+            'origin': f"Feed Details Record {record.name} - Flock {record.flock_id.name}",
+        } for record in records])
 
+        for record in records:
             _logger.info("Feed transferred (scrapped) for flock %s: %s kg", record.flock_id.name, record.feed_kg)
             record.message_post(body=f"Feed used: {record.feed_kg} kg has been scrapped from stock.")
-            
-            record.state = 'done'
+        records.write({'state': 'done'})
+        self.env['farm.flock.anomaly.state']._trigger_detection()
 
     def action_draft(self):
         if self.state =="draft":
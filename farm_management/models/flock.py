@@ -8,14 +8,18 @@ from odoo import models
 from odoo.exceptions import UserError
 from odoo import models, fields
 from odoo.exceptions import ValidationError
+from odoo.tools import html_escape
 
 import logging
 
+_logger = logging.getLogger(__name__)
+
 class LayerFlock(models.Model):
     
     _name = "farm.layer.flock"
     _description = "Layer / Broiler Flock Information"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
+    _reference_field = 'reference'
     
   
     name = fields.Char(string="Flock Name", required=True,tracking =True)
@@ -47,8 +51,27 @@ class LayerFlock(models.Model):
     state = fields.Selection([('draft','Draft'),('done','Confirm')],string="Status", default='draft', tracking=True)
     share_token = fields.Char(string="Share Token", copy=False, readonly=True)
     preview_html = fields.Html(string="Email Preview", readonly=True)
+    breed_standard_id = fields.Many2one("farm.breed.standard", string="Breed Standard", tracking=True)
+    weekly_analytics_ids = fields.One2many("farm.flock.weekly.analytics", "flock_id", string="Weekly Analytics")
+    fcr = fields.Float(string="FCR", compute="_compute_analytics", digits=(16, 3))
+    cumulative_feed_per_bird = fields.Float(string="Cumulative Feed Per Bird (gm)", compute="_compute_analytics")
+    weekly_weight_gain = fields.Float(string="Last Weekly Weight Gain (g)", compute="_compute_analytics")
+    feed_per_dozen = fields.Float(string="Feed Per Dozen Eggs (kg)", compute="_compute_analytics", digits=(16, 3))
 
 
+    def _compute_analytics(self):
+        analytics = self.env['farm.flock.weekly.analytics']
+        versions = analytics._get_versions(self.ids)
+        for rec in self:
+            version = versions.get(rec.id)
+            fcr, feed_per_bird, gain, per_dozen = (
+                analytics._get_flock_summary(rec.id, version) if version else (0.0, 0.0, 0.0, 0.0)
+            )
+            rec.fcr = fcr
+            rec.cumulative_feed_per_bird = feed_per_bird
+            rec.weekly_weight_gain = gain
+            rec.feed_per_dozen = per_dozen
+
     @api.depends('age_in_days')
     def _compute_age_weeks(self):
         for rec in self:
@@ -91,14 +114,29 @@ class LayerFlock(models.Model):
 
 
     def _cron_update_current_age(self):
-        flocks = self.search([])
-        for rec in flocks:
-            if rec.start_date:
-                temp_days = (date.today() - rec.start_date).days
-                rec.current_age_in_days = (rec.age_in_days or 0) + temp_days
-                rec.current_age_in_weeks = rec.current_age_in_days // 7
-                rec.current_extra_days = rec.current_age_in_days % 7
-                rec.current_age_display = f"{rec.current_age_in_weeks} weeks {rec.current_extra_days} days"
+        """Roll every flock's current age forward in one statement.
+
+        The stored ages only drift with the calendar, so they are rewritten in
+        SQL rather than through write(), which would track and log a chatter
+        message on every flock each day.
+        """
+        self.flush_model(['start_date', 'age_in_days'])
+        self.env.cr.execute("""
+            WITH ages AS (
+                SELECT id, COALESCE(age_in_days, 0) + (%(today)s::date - start_date) AS days
+                  FROM farm_layer_flock
+                 WHERE start_date IS NOT NULL
+            )
+            UPDATE farm_layer_flock f
+               SET current_age_in_days = ages.days,
+                   current_age_in_weeks = FLOOR(ages.days / 7.0),
+                   current_extra_days = ages.days - 7 * FLOOR(ages.days / 7.0)
+              FROM ages
+             WHERE f.id = ages.id
+               AND f.current_age_in_days IS DISTINCT FROM ages.days
+        """, {'today': date.today()})
+        _logger.info("Flock ages updated for %s flocks", self.env.cr.rowcount)
+        self.invalidate_model(['current_age_in_days', 'current_age_in_weeks', 'current_extra_days'])
 
 
     @api.onchange('product_id')
@@ -116,35 +154,21 @@ class LayerFlock(models.Model):
             raise UserError("Only Settings users can delete records!")
         return super(LayerFlock, self).unlink()
     
-    @api.model
-    def create(self, vals):
-        if vals.get('reference', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('reference', 'like', f'Flock/Details/{today_str}/')],
-                order='id desc', limit=1
-            )
-            if last_record and last_record.reference:
-                try:
-                    last_seq = int(last_record.reference.split('/')[-1])
-                    next_seq = str(last_seq + 1).zfill(5) 
-                except:
-                    next_seq = '00001'
-            else:
-                next_seq = '00001'
-
-            vals['reference'] = f"F/S/{next_seq}"
-
-        if 'product_id' in vals and vals['product_id'] and not vals.get('opening_bird_count'):
-            product = self.env['product.product'].browse(vals['product_id'])
-            vals['opening_bird_count'] = product.qty_available
-        record = super(LayerFlock, self).create(vals)
-
-        if not record.share_token:
-            record.share_token = secrets.token_urlsafe(16)
-            print("Generated Share Token:", record.share_token)
-
-        return record
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if 'product_id' in vals and vals['product_id'] and not vals.get('opening_bird_count'):
+                product = self.env['product.product'].browse(vals['product_id'])
+                vals['opening_bird_count'] = product.qty_available
+            if not vals.get('share_token'):
+                vals['share_token'] = secrets.token_urlsafe(16)
+        return super(LayerFlock, self).create(vals_list)
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'breed_standard_id', 'start_date', 'age_in_days'}.intersection(vals):
+            self.env['farm.flock.daily.kpi']._score_flocks(self)
+        return res
 
     def action_draft(self):
         if self.state =="draft":
@@ -156,6 +180,15 @@ class LayerFlock(models.Model):
             return 
         self.state = 'done'
     
+    def action_rebuild_running_totals(self):
+        """Recompute the flock's cumulative figures from its daily records."""
+        self.env['farm.mortality.ledger']._rebuild_ledger(self)
+        self.env['farm.production.details']._rebuild_running_totals(self)
+        self.env['feed.details']._rebuild_running_totals(self)
+        self.env['farm.water.intake']._rebuild_running_totals(self)
+        self.env['farm.flock.daily.kpi']._rebuild(self)
+        return True
+
     def action_send_flock_mail(self):
         """Send Flock details email"""
         self.ensure_one()
@@ -180,620 +213,156 @@ class LayerFlock(models.Model):
             if existing:
                 raise ValidationError(f"A flock with the name '{rec.name}' already exists!")
 
-    
+    # -------------------------------------------------------------------------
+    # Daily digest
+    # -------------------------------------------------------------------------
+
+    _DIGEST_CELL = "padding: 4px; border: 1px solid #000;"
+    _DIGEST_TITLE = (
+        "text-align: center; background-color: #017E84; color: white; "
+        "font-weight: bold; font-size: 16px; padding: 10px;"
+    )
+
     def send_mail(self):
+        """Queue the daily digest of all flocks for the configured recipients."""
+        return self._send_daily_digest(self[:1].date or fields.Date.context_today(self))
 
-        Mail = self.env['mail.mail']
-        partners = self.env['res.partner'].search([])
-
-        for partner in partners:
-            html_content = ""
-
-            flocks = self.env['farm.layer.flock'].search([])
-
-            for flock in flocks:
-                today = datetime.today().date()
-                production_records = self.env['farm.production.details'].search([
-                    ('flock_id', '=', flock.id),
-                    ('date', '=', self.date or date.today())
-                ])
-
-                mortality_records = self.env["farm.mortality.details"].search([
-                    ('flock_id', '=', flock.id),
-                    ('date', '=', self.date or date.today())
-                ])
-
-                feed_records = self.env["feed.details"].search([
-                    ('flock_id', '=', flock.id)
-                    ,('datetime','=',fields.Date.today())
-                 ])
-                
-                water_intake_records = self.env["farm.water.intake"].search([
-                    ('date', '=', today),
-                    ('flock_id', '=', flock.id),
-                ])
-                
-              
-                body_weight_records = self.env["flock.body.weight"].search([
-                    ('date', '=', today),
-                    ('flock_id', '=',flock.id),
-                ])
-
-
-                requests = self.env['farm.boy.request.data'].search([
-                
-                ])
-
-                current_birds = production_records[0].current_birds if production_records else flock.opening_bird_count
-                html_content += f"""
-                <div style="font-family: Arial, sans-serif; color: #333; padding: 20px; background-color: #f8f9fa; margin-bottom: 20px;">
-                    <div style="background-color: #714B67; color: white; padding: 18px 18px; border-radius: 5px 5px 0 0;">
-                        <h2 style="margin: 0; color: #FFFFFF;"> Shed <strong> <span style="color: #FFFFFF;">{flock.name} </span></strong> Of Overview & Key Insights</h2>
-                    </div>
-                    <div style="background: white; border: 1px solid #ddd; border-top: none; border-radius: 0 0 5px 5px; padding: 20px;">
-                        
-                    
-                        <p> {today} ,<br><strong>Dear Sir</strong>,<br>
-                            Kindly review the summary of today’s details provided below.
-                        </p>
-
-                        <table style="width: 100%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                            <tr style="background-color: #f2f2f2;">
-                                <th style="padding: 4px; text-align: left; border: 1px solid #000;">Field</th>
-                                <th style="padding: 4px; text-align: left; border: 1px solid #000;">Value</th>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Shed Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{flock.name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Birds Type</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{flock.bird_type or ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Starting Date</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{flock.start_date or ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Current Age</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{flock.current_age_display or ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Opening Birds</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{flock.opening_bird_count or 0}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Current Birds</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{current_birds}</td>
-                            </tr>
-                        </table>
-                """
-                if not production_records:
-                    html_content += f"""
-
-                        <div style="display: flex; gap: 20px; margin-top: 15px;">
-                    
-                            <table style="width: 50%; margin-right: 10px; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px; "> Today's Production Summary </th>
-                            </tr>
-
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name </td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;"> Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Small Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Medium Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total High Medium Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total High Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Double Yolk Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Broken Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total White Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Damage Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Egg </td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Production Percentage</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                        </table>
-                    """
-
-                for production in production_records:
-                    html_content += f"""
-
-                        <div style="display: flex; gap:20px; margin-top: 15px;">
-                    
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;margin-right: 10px;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px;"> Today's Production Summary </th>
-                            </tr>
-
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name </td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;"> Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.created_by.name if production.created_by else ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Small Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_small}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Medium Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_medium}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total High Medium Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_high_medium}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total High Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_high}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Double Yolk Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_double_yolk}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Broken Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_broken}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total White Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_white}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Damage Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_damage}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Egg</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.total_egg}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;"> Production Percentage  </td>
-                                <td style="padding: 4px; border: 1px solid #000;">{production.percentage}%</td>
-                            </tr>
-                        </table>
-                    """
-
-                """" name, flock_id, date, state, created_by, product_id, flock_opening_bird, flock_starting_date, flock_ending_date, current_birds, 
-                age_in_days, total_qty, breakdown_ids, total_mortality, today_overall_mortality_percentage, normal_cause_mortality, culled_cause_mortality,
-                vaccine_reaction_mortality, prolapse_mortality, heat_stress_mortality, mechanical_mortality, injury_mortality, other_cause_mortality, 
-                cumaletive_mortality, comalitive_mortality_normal, comalitive_mortality_culled, comalitive_mortality_vaccine, comalitive_mortality_prolapse,
-                    comalitive_mortality_heat_stress, comalitive_mortality_mechanical, comalitive_mortality_injury, comalitive_mortality_other, 
-                    cause_percentage_normal, cause_percentage_culled, cause_percentage_vaccine,
-                cause_percentage_prolapse, cause_percentage_heat_stress, cause_percentage_mechanical, cause_percentage_injury, cause_percentage_other """
-                
-                if not mortality_records:
-                    
-                    html_content += f"""
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px; "> Today's Mortality Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Normal Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Culled Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Vaccine Reaction Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Prolapse Cause Mortality </td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Heat Streess Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Mechanical Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Injury Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Other's Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Today Mortality Percentage </td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                        </table>
-                        </div>
-                    """
-
-                for mortality in mortality_records:
-                    html_content += f"""
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px; "> Today's Mortality Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.created_by.name if mortality.created_by else ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Normal Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.normal_cause_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Culled Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.culled_cause_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Vaccine Reaction Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.vaccine_reaction_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Prolapse Cause Mortality </td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.prolapse_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Heat Streess Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.heat_stress_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Mechanical Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.mechanical_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Injury Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.injury_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Other's Cause Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.other_cause_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Mortality</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.total_mortality}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Today Mortality Percentage </td>
-                                <td style="padding: 4px; border: 1px solid #000;">{mortality.today_overall_mortality_percentage}%</td>
-                            </tr>
-                        </table>
-                        </div>
-                    """
-
-                    # feed details fields . 
-
-                    """datetime, name, flock_id, created_by, current_bird, current_age_days, feed_per_bird, 
-                    feed_product_id, product_id, on_hand_qty, feed_kg, cumm_feed, status, state, description_html, feed_time"""
-
-                if not feed_records:
-                    
-                    html_content += f"""
-                        <div style="display: flex; gap: 20px; margin-top: 15px;">
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;margin-right: 10px;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px; "> Today's Feed  Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Feed Time</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Feed Per Birds</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Product Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">On Hand Quantity</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Consume quantity</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-
-                        </table>
-                    
-                    """
-
-                for feed in feed_records:
-                    html_content += f"""
-                        <div style="display: flex; gap: 20px; margin-top: 15px;">
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;margin-right: 10px;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px;"> Today's Feed  Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.created_by.name if feed.created_by else ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Feed Time</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.feed_time}</td>
-                            </tr>
-
-                             <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Product Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.feed_product_id.name}</td>
-                            </tr>
-
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Feed Per Birds</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.feed_per_bird}(g)</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">On Hand Quantity</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.on_hand_qty}(Kg)</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Consume quantity</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{feed.feed_kg}(Kg)</td>
-                            </tr>
-
-                        </table>
-                    
-                    """
-                    
-                """date, flock_id, created_by, providing_category, current_birds, 
-                bird_type, current_age_display, name, water_lit, water_ml_per_bird, state, cumulative_water, user_id, note_html"""
-                if not water_intake_records:
-                    html_content += f"""
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 4px 8px;"> Today's Water Intake Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Providing Category </td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;"> Water Per bird (ml)</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Provided Water(L)</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                        
-                        </table>
-                        </div>
-                    """
-
-                for water in water_intake_records:
-                    html_content += f"""
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px;"> Today's Water Intake Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{water.name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{water.created_by.name if water.created_by else ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Providing Category </td>
-                                <td style="padding: 4px; border: 1px solid #000;">{water.providing_category}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;"> Water Per bird (ml)</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{water.water_ml_per_bird}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Total Provided Water(L)</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{water.water_lit}</td>
-                            </tr>
-                        
-                        </table>
-                        </div>
-                    """
-                    """date, created_by, name, state, age_in_days, 
-                    act_weight, std_weight, min_weight, max_weight, note_html, flock_id, current_birds, birds_type, age_in_weeks"""
-
-                if not body_weight_records:
-                    html_content += f"""
-                        <div style="display: flex; gap: 20px; margin-top: 15px;">
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;margin-right: 10px;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px; "> Today's Body Weight Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Standard Weight </td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Minimum Weight</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Maximum Weight</td>
-                                <td style="padding: 4px; border: 1px solid #000;">N/A</td>
-                            </tr>
-                        
-                        </table>
-                    
-                    """
-
-                for weight in body_weight_records:
-                    
-                
-                    html_content += f"""
-                        <div style="display: flex; gap: 20px; margin-top: 15px;">
-
-                            <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000; margin-right: 10px;">
-                            <tr style="background-color: #f9f9f9;">
-                                <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px; "> Today's Body Weight Summary </th>
-                            </tr>
-                            <tr style="background-color: #f9f9f9;">
-                                <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{weight.name}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{weight.created_by.name if weight.created_by else ''}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Standard Weight </td>
-                                <td style="padding: 4px; border: 1px solid #000;">{weight.std_weight}(g)</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Minimum Weight</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{weight.min_weight}(g)</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 4px; border: 1px solid #000;">Maximum Weight</td>
-                                <td style="padding: 4px; border: 1px solid #000;">{weight.max_weight}(g)</td>
-                            </tr>
-                        
-                        </table>
-                    
-                    """
-                    
-                """product_id, flock_id, request_id, total_dose, dose_per_bird, bird_count, short_note, consume_quantity, 
-                remaining_dose, cost_per_unit, total_cost, daily_temperature_id, farmboy_request_id, state, approval_id, request_date
-                """
-                
-                for request in requests:
-
-                    flock_lines = request.farmboy_request_line_ids.filtered(
-                        lambda l: l.flock_id.id == flock.id
-                    )
-                    for line in flock_lines:
-                        html_content += f"""
-                                <table style="width: 50%; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">
-                                <tr style="background-color: #f9f9f9;">
-                                    <th colspan="2" style=" text-align: center;  background-color: #017E84; /* professional green background */ color: white; /* white text for contrast */  font-weight: bold;font-size: 16px; padding: 10px;"> Today's Medicine Summary </th>
-                                </tr>
-                                <tr style="background-color: #f9f9f9;">
-                                    <td style="padding: 4px; border: 1px solid #000;">Reference Name</td>
-                                    <td style="padding: 4px; border: 1px solid #000;">{line.product_id}</td>
-                                </tr>
-                                <tr>
-                                    <td style="padding: 4px; border: 1px solid #000;">Responsible Person</td>
-                                    <td style="padding: 4px; border: 1px solid #000;">{line.remaining_dose or''}</td>
-                                </tr>
-                                <tr>
-                                    <td style="padding: 4px; border: 1px solid #000;">Standard Weight </td>
-                                    <td style="padding: 4px; border: 1px solid #000;">{line.total_dose}</td>
-                                </tr>
-                                <tr>
-                                    <td style="padding: 4px; border: 1px solid #000;">Minimum Weight</td>
-                                    <td style="padding: 4px; border: 1px solid #000;">{line.dose_per_bird}</td>
-                                </tr>
-                                <tr>
-                                    <td style="padding: 4px; border: 1px solid #000;">Maximum Weight</td>
-                                    <td style="padding: 4px; border: 1px solid #000;">{line.consume_quantity}</td>
-                                </tr>
-                            
-                            </table>
-                            </div>
-                        """
-
-                html_content += """
-                        
-                    </div>
-                </div>
-                """
-
-            self.preview_html = html_content
-        
-            mail_values = {
-                'subject': f"Flock Summary:",
-                'body_html': html_content,
-                'email_to': partner.email,
-                'email_from': "afzalkhan101.contact@gmail.com",
-            }
-            mail = Mail.create(mail_values)
-            mail.send()
+    @api.model
+    def _cron_send_daily_digest(self):
+        self._send_daily_digest(fields.Date.context_today(self))
 
-    
+    def _get_digest_recipients(self):
+        companies = self.env['res.company'].sudo().search([])
+        return companies.flock_digest_partner_ids.filtered('email')
+
+    def _send_daily_digest(self, day):
+        partners = self._get_digest_recipients()
+        if not partners:
+            _logger.warning("Flock digest skipped: no recipients configured on any company.")
+            return False
+
+        flocks = self.search([])
+        body = self._render_daily_digest(flocks, day)
+        if self:
+            self.preview_html = body
+
+        # No force send: the mail queue cron delivers it, one email per recipient.
+        self.env['mail.mail'].sudo().create({
+            'subject': f"Flock Summary: {day}",
+            'body_html': body,
+            'email_from': self.env.company.email_formatted or self.env.user.email_formatted,
+            'recipient_ids': [(6, 0, partners.ids)],
+            'auto_delete': True,
+        })
+        return True
 
+    def _get_digest_data(self, flocks, day):
+        """Read the day's KPI row of every flock in one query."""
+        return self.env['farm.flock.daily.kpi'].search([
+            ('flock_id', 'in', flocks.ids),
+            ('date', '=', day),
+        ]).grouped('flock_id')
 
+    def _render_daily_digest(self, flocks, day):
+        kpis = self._get_digest_data(flocks, day)
+        no_kpi = self.env['farm.flock.daily.kpi']
+        return "".join(flock._render_flock_digest(day, kpis.get(flock, no_kpi)) for flock in flocks)
+
+    def _render_flock_digest(self, day, kpi):
+        self.ensure_one()
+        current_birds = kpi.current_birds if kpi else self.opening_bird_count
+
+        def table(title, rows):
+            return self._digest_table(title, [(label, value if kpi else "N/A") for label, value in rows])
+
+        production_table = table("Today's Production Summary", [
+            ("Total Small Egg", kpi.eggs_small),
+            ("Total Medium Egg", kpi.eggs_medium),
+            ("Total High Medium Egg", kpi.eggs_high_medium),
+            ("Total High Egg", kpi.eggs_high),
+            ("Total Double Yolk Egg", kpi.eggs_double_yolk),
+            ("Total Broken Egg", kpi.eggs_broken),
+            ("Total White Egg", kpi.eggs_white),
+            ("Total Damage Egg", kpi.eggs_damage),
+            ("Total Egg", kpi.total_egg),
+            ("Production Percentage", f"{kpi.production_percentage:.2f}%"),
+        ])
+
+        mortality_percentage = kpi.total_mortality * 100.0 / current_birds if current_birds else 0.0
+        mortality_table = table("Today's Mortality Summary", [
+            ("Normal Cause Mortality", kpi.mortality_normal),
+            ("Culled Cause Mortality", kpi.mortality_culled),
+            ("Vaccine Reaction Cause Mortality", kpi.mortality_vaccine),
+            ("Prolapse Cause Mortality", kpi.mortality_prolapse),
+            ("Heat Stress Cause Mortality", kpi.mortality_heat_stress),
+            ("Mechanical Cause Mortality", kpi.mortality_mechanical),
+            ("Injury Cause Mortality", kpi.mortality_injury),
+            ("Other's Cause Mortality", kpi.mortality_other),
+            ("Total Mortality", kpi.total_mortality),
+            ("Today Mortality Percentage", f"{mortality_percentage:.2f}%"),
+        ])
+
+        feed_table = table("Today's Feed Summary", [
+            ("Consume quantity", f"{kpi.feed_kg}(Kg)"),
+            ("Feed Per Birds", f"{kpi.feed_per_bird:.2f}(g)"),
+            ("Standard Feed Per Birds", f"{kpi.std_feed_per_bird:.2f}(g)"),
+        ])
+
+        water_table = table("Today's Water Intake Summary", [
+            ("Total Provided Water(L)", kpi.water_lit),
+            ("Water Per bird (ml)", f"{kpi.water_per_bird:.2f}"),
+            ("Standard Water Per bird (ml)", f"{kpi.std_water_per_bird:.2f}"),
+        ])
+
+        weight_table = table("Today's Body Weight Summary", [
+            ("Body Weight", f"{kpi.body_weight:.2f}(g)"),
+            ("Standard Weight", f"{kpi.std_body_weight:.2f}(g)"),
+            ("Deviation", f"{kpi.body_weight_deviation:.2f}%"),
+        ])
+
+        medicine_table = table("Today's Medicine Summary", [
+            ("Medicine Cost", kpi.medicine_cost),
+        ])
+
+        overview = self._digest_table("Shed Overview", [
+            ("Shed Name", self.name),
+            ("Birds Type", dict(self._fields['bird_type'].selection).get(self.bird_type)),
+            ("Starting Date", self.start_date),
+            ("Current Age", self.current_age_display),
+            ("Opening Birds", self.opening_bird_count or 0),
+            ("Current Birds", current_birds),
+        ], width="100%")
+
+        return f"""
+            <div style="font-family: Arial, sans-serif; color: #333; padding: 20px; background-color: #f8f9fa; margin-bottom: 20px;">
+                <div style="background-color: #714B67; color: white; padding: 18px; border-radius: 5px 5px 0 0;">
+                    <h2 style="margin: 0; color: #FFFFFF;">Shed <strong>{html_escape(self.name)}</strong> Of Overview &amp; Key Insights</h2>
+                </div>
+                <div style="background: white; border: 1px solid #ddd; border-top: none; border-radius: 0 0 5px 5px; padding: 20px;">
+                    <p>{day},<br/><strong>Dear Sir</strong>,<br/>
+                        Kindly review the summary of today's details provided below.
+                    </p>
+                    {overview}
+                    {self._digest_row([production_table, mortality_table])}
+                    {self._digest_row([feed_table, water_table])}
+                    {self._digest_row([weight_table, medicine_table])}
+                </div>
+            </div>
+        """
+
+    @api.model
+    def _digest_table(self, title, rows, width="50%"):
+        """Render a two-column (label, value) summary table."""
+        cells = "".join(
+            f'<tr><td style="{self._DIGEST_CELL}">{label}</td>'
+            f'<td style="{self._DIGEST_CELL}">{html_escape("" if value is None or value is False else value)}</td></tr>'
+            for label, value in rows
+        )
+        return (
+            f'<table style="width: {width}; border-collapse: collapse; margin-top: 15px; border: 1px solid #000;">'
+            f'<tr><th colspan="2" style="{self._DIGEST_TITLE}">{title}</th></tr>{cells}</table>'
+        )
+
+    @api.model
+    def _digest_row(self, tables):
+        return f'<div style="display: flex; gap: 20px; margin-top: 15px;">{"".join(tables)}</div>'
@@ -0,0 +1,104 @@
+from odoo import models, fields, api, tools
+
+
+class FlockWeeklyAnalytics(models.Model):
+    """Weekly feed conversion and growth figures per flock.
+
+    A view over ``farm.flock.daily.kpi``: the weekly series and their running
+    sums are computed by the database in one pass over the flock's rows, so
+    neither the flock form nor the comparison report loops over records.
+    """
+
+    _name = "farm.flock.weekly.analytics"
+    _description = "Weekly Flock Analytics"
+    _auto = False
+    _order = "week_start desc, flock_id"
+    _rec_name = "week_start"
+
+    flock_id = fields.Many2one("farm.layer.flock", string="Flock", readonly=True)
+    week_start = fields.Date(string="Week", readonly=True)
+    birds = fields.Float(string="Average Birds", readonly=True, aggregator='avg')
+    feed_kg = fields.Float(string="Feed (kg)", readonly=True)
+    eggs = fields.Integer(string="Eggs", readonly=True)
+    feed_per_bird = fields.Float(string="Feed Per Bird (gm)", readonly=True, aggregator='avg')
+    cumulative_feed_per_bird = fields.Float(string="Cumulative Feed Per Bird (gm)", readonly=True, aggregator='max')
+    body_weight = fields.Float(string="Body Weight (g)", readonly=True, aggregator='avg')
+    weight_gain = fields.Float(string="Weight Gain (g)", readonly=True)
+    fcr = fields.Float(string="FCR", readonly=True, aggregator='avg', digits=(16, 3))
+    feed_per_dozen = fields.Float(string="Feed Per Dozen Eggs (kg)", readonly=True, aggregator='avg', digits=(16, 3))
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                WITH weekly AS (
+                    SELECT flock_id, date_trunc('week', date)::date AS week_start,
+                           AVG(NULLIF(current_birds, 0)) AS birds,
+                           SUM(feed_kg) AS feed_kg,
+                           SUM(total_egg) AS eggs,
+                           AVG(NULLIF(body_weight, 0)) AS body_weight
+                      FROM farm_flock_daily_kpi
+                     GROUP BY flock_id, date_trunc('week', date)
+                ),
+                series AS (
+                    SELECT *,
+                           COALESCE(feed_kg * 1000.0 / NULLIF(birds, 0), 0) AS feed_per_bird,
+                           body_weight - LAG(body_weight) OVER (PARTITION BY flock_id ORDER BY week_start) AS weight_gain
+                      FROM weekly
+                )
+                -- stable id from the key (weeks since Monday 1970-01-05), and every window
+                -- partitioned by flock so a flock filter is pushed down to its own rows
+                SELECT flock_id::int8 * 100000 + (week_start - DATE '1970-01-05') / 7 AS id,
+                       flock_id, week_start,
+                       COALESCE(birds, 0) AS birds,
+                       COALESCE(feed_kg, 0) AS feed_kg,
+                       COALESCE(eggs, 0) AS eggs,
+                       feed_per_bird,
+                       SUM(feed_per_bird) OVER (PARTITION BY flock_id ORDER BY week_start) AS cumulative_feed_per_bird,
+                       COALESCE(body_weight, 0) AS body_weight,
+                       COALESCE(weight_gain, 0) AS weight_gain,
+                       CASE WHEN weight_gain > 0 THEN feed_per_bird / weight_gain ELSE 0 END AS fcr,
+                       COALESCE(feed_kg / NULLIF(eggs / 12.0, 0), 0) AS feed_per_dozen
+                  FROM series
+            )
+        """)
+
+    @api.model
+    def _get_versions(self, flock_ids):
+        """Return ``{flock id: version}`` of the KPI rows behind the flocks' figures."""
+        if not flock_ids:
+            return {}
+        self.env['farm.flock.daily.kpi'].flush_model()
+        self.env.cr.execute("""
+            SELECT flock_id, COUNT(*), MAX(write_date)
+              FROM farm_flock_daily_kpi
+             WHERE flock_id = ANY(%s)
+             GROUP BY flock_id
+        """, [list(flock_ids)])
+        return {
+            flock_id: f"{count}-{write_date.strftime('%Y%m%d%H%M%S%f')}"
+            for flock_id, count, write_date in self.env.cr.fetchall()
+        }
+
+    @tools.ormcache('flock_id', 'version')
+    def _get_flock_summary(self, flock_id, version):
+        """Whole-life figures of a flock, cached until its KPI rows change.
+
+        :returns: ``(fcr, cumulative feed per bird in gm, last weekly weight gain
+            in g, feed per dozen eggs in kg)``
+        """
+        self.env.cr.execute(f"""
+            SELECT SUM(feed_kg), SUM(eggs), MAX(cumulative_feed_per_bird),
+                   (ARRAY_AGG(body_weight ORDER BY week_start) FILTER (WHERE body_weight > 0)),
+                   (ARRAY_AGG(weight_gain ORDER BY week_start DESC) FILTER (WHERE weight_gain <> 0))[1]
+              FROM {self._table}
+             WHERE flock_id = %s
+        """, [flock_id])
+        feed_kg, eggs, feed_per_bird, weights, last_gain = self.env.cr.fetchone()
+        gain = weights[-1] - weights[0] if weights else 0
+        return (
+            (feed_per_bird or 0) / gain if gain > 0 else 0.0,
+            feed_per_bird or 0.0,
+            last_gain or 0.0,
+            feed_kg / (eggs / 12.0) if eggs else 0.0,
+        )
@@ -0,0 +1,140 @@
+import logging
+import math
+from collections import defaultdict
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+PARAM_PREFIX = "farm_management.anomaly_"
+
+# metric: (label, farm.flock.daily.kpi expression, row filter, direction that raises an alert)
+ANOMALY_METRICS = {
+    'mortality': ("Mortality per 1000 birds", "k.total_mortality * 1000.0 / NULLIF(k.current_birds, 0)", "TRUE", 1),
+    'water': ("Water per bird (ml)", "k.water_per_bird", "k.water_lit > 0", -1),
+    'feed': ("Feed per bird (gm)", "k.feed_per_bird", "k.feed_kg > 0", -1),
+}
+
+
+class FlockAnomalyState(models.Model):
+    """Rolling statistics of one flock metric, advanced one day at a time.
+
+    Each row keeps an exponentially weighted mean and variance and the last
+    day folded into them, so the detector only ever reads the days after it.
+    """
+
+    _name = "farm.flock.anomaly.state"
+    _description = "Flock Anomaly Detector State"
+    _rec_name = "flock_id"
+
+    flock_id = fields.Many2one("farm.layer.flock", string="Flock", required=True, ondelete="cascade", readonly=True)
+    metric = fields.Selection(
+        [(key, label) for key, (label, _expr, _filter, _direction) in ANOMALY_METRICS.items()],
+        string="Metric", required=True, readonly=True,
+    )
+    last_date = fields.Date(string="Last Day", readonly=True)
+    count = fields.Integer(string="Days Seen", readonly=True)
+    mean = fields.Float(string="Mean", readonly=True)
+    variance = fields.Float(string="Variance", readonly=True)
+    last_zscore = fields.Float(string="Last Z-Score", readonly=True)
+
+    _sql_constraints = [
+        ('flock_metric_uniq', 'unique(flock_id, metric)', "Only one detector state per flock and metric is allowed."),
+    ]
+
+    @api.model
+    def _get_config(self):
+        params = self.env['ir.config_parameter'].sudo()
+
+        def param(key, default):
+            return float(params.get_param(PARAM_PREFIX + key, default))
+
+        return {
+            'alpha': 2.0 / (param("span_days", 7) + 1),
+            'threshold': param("zscore", 3.0),
+            'warmup': int(param("warmup_days", 7)),
+        }
+
+    @api.model
+    def _cron_detect_anomalies(self):
+        """Fold the complete days not seen yet into each flock's statistics and alert on outliers."""
+        config = self._get_config()
+        self.env['farm.flock.daily.kpi'].flush_model()
+        today = fields.Date.context_today(self)
+        states = {
+            (state['flock_id'][0], state['metric']): state
+            for state in self.search_read([], ['flock_id', 'metric', 'last_date', 'count', 'mean', 'variance', 'last_zscore'])
+        }
+
+        updated, alerts = [], defaultdict(list)
+        for metric, (label, expression, row_filter, direction) in ANOMALY_METRICS.items():
+            self.env.cr.execute(f"""
+                SELECT k.flock_id, k.date, COALESCE({expression}, 0)
+                  FROM farm_flock_daily_kpi k
+                  LEFT JOIN farm_flock_anomaly_state s ON s.flock_id = k.flock_id AND s.metric = %s
+                 WHERE k.date < %s AND (s.last_date IS NULL OR k.date > s.last_date) AND {row_filter}
+                 ORDER BY k.flock_id, k.date
+            """, [metric, today])
+            rows_by_flock = defaultdict(list)
+            for flock_id, day, value in self.env.cr.fetchall():
+                rows_by_flock[flock_id].append((day, value))
+
+            for flock_id, rows in rows_by_flock.items():
+                state = states.get((flock_id, metric)) or {}
+                count, mean, variance = state.get('count', 0), state.get('mean', 0.0), state.get('variance', 0.0)
+                zscore = state.get('last_zscore', 0.0)
+                for day, value in rows:
+                    if count == 0:
+                        mean, variance, zscore = value, 0.0, 0.0
+                    else:
+                        zscore = (value - mean) / math.sqrt(variance) if variance > 0 else 0.0
+                        if count >= config['warmup'] and zscore * direction > config['threshold']:
+                            alerts[flock_id].append((label, day, value, mean, zscore))
+                        diff = value - mean
+                        increment = config['alpha'] * diff
+                        mean += increment
+                        variance = (1 - config['alpha']) * (variance + diff * increment)
+                    count += 1
+                updated.append((flock_id, metric, rows[-1][0], count, mean, variance, zscore))
+
+        if updated:
+            self.env.cr.execute("""
+                INSERT INTO farm_flock_anomaly_state (flock_id, metric, last_date, count, mean, variance, last_zscore,
+                                                      create_uid, create_date, write_uid, write_date)
+                SELECT s.flock_id, s.metric, s.last_date, s.count, s.mean, s.variance, s.last_zscore,
+                       %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+                  FROM unnest(%s::int4[], %s::varchar[], %s::date[], %s::int4[], %s::float8[], %s::float8[], %s::float8[])
+                    AS s(flock_id, metric, last_date, count, mean, variance, last_zscore)
+                ON CONFLICT (flock_id, metric) DO UPDATE
+                   SET last_date = EXCLUDED.last_date,
+                       count = EXCLUDED.count,
+                       mean = EXCLUDED.mean,
+                       variance = EXCLUDED.variance,
+                       last_zscore = EXCLUDED.last_zscore,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+            """, [self.env.uid, self.env.uid] + [list(column) for column in zip(*updated)])
+            self.invalidate_model()
+        self._raise_alerts(alerts)
+
+    @api.model
+    def _raise_alerts(self, alerts):
+        """Schedule one warning activity per flock listing its anomalous days."""
+        for flock in self.env['farm.layer.flock'].browse(list(alerts)):
+            lines = [
+                f"{day}: {label} {value:.2f} (expected {mean:.2f}, z-score {zscore:+.1f})"
+                for label, day, value, mean, zscore in sorted(alerts[flock.id], key=lambda alert: alert[1])
+            ]
+            flock.activity_schedule(
+                'mail.mail_activity_data_warning',
+                summary=f"Anomaly detected on flock {flock.name}",
+                note="<br/>".join(lines),
+                user_id=flock.created_by.id or self.env.uid,
+            )
+        if alerts:
+            _logger.info("Anomaly detection: alerts on %s flocks", len(alerts))
+
+    @api.model
+    def _trigger_detection(self):
+        """Ask the detector cron to run as soon as possible."""
+        self.env.ref('farm_management.ir_cron_detect_flock_anomalies')._trigger()
@@ -0,0 +1,332 @@
+from collections import defaultdict
+
+from odoo import models, fields, api
+
+from .breed_standard import STANDARD_METRICS
+from .mortality_details import MORTALITY_CAUSE_KEYS
+
+# {kpi column: farm.production.details column}
+EGG_COLUMNS = {
+    'eggs_small': 'total_small',
+    'eggs_medium': 'total_medium',
+    'eggs_high_medium': 'total_high_medium',
+    'eggs_high': 'total_high',
+    'eggs_double_yolk': 'total_double_yolk',
+    'eggs_broken': 'total_broken',
+    'eggs_white': 'total_white',
+    'eggs_damage': 'total_damage',
+    'total_egg': 'total_egg',
+}
+
+# models whose tables the KPI upsert and scoring read
+KPI_SOURCE_MODELS = (
+    'farm.production.details', 'farm.mortality.details', 'farm.mortality.breakdown', 'feed.details',
+    'farm.water.intake', 'flock.body.weight', 'farmboy.request.add.line', 'farm.boy.request.data',
+)
+
+
+class FarmDailyKpiSource(models.AbstractModel):
+    """Keep ``farm.flock.daily.kpi`` current when a source record changes.
+
+    Sources name the paths to their flock and day and the fields feeding the
+    KPIs; each create, relevant write and unlink refreshes the touched
+    (flock, day) rows only.
+    """
+
+    _name = "farm.daily.kpi.source"
+    _description = "Daily Flock KPI Source"
+
+    _kpi_flock_field = 'flock_id'
+    _kpi_date_field = 'date'
+    _kpi_trigger_fields = ()
+
+    def _kpi_keys(self):
+        keys = set()
+        for record in self:
+            flock = record.mapped(self._kpi_flock_field)
+            day = record.mapped(self._kpi_date_field)
+            if flock and day and day[0]:
+                keys.add((flock[:1].id, fields.Date.to_date(day[0])))
+        return keys
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['farm.flock.daily.kpi']._refresh_days(records._kpi_keys())
+        return records
+
+    def write(self, vals):
+        triggers = {self._kpi_flock_field.split('.')[0], self._kpi_date_field.split('.')[0]}
+        if not triggers.union(self._kpi_trigger_fields).intersection(vals):
+            return super().write(vals)
+        keys = self._kpi_keys()
+        res = super().write(vals)
+        self.env['farm.flock.daily.kpi']._refresh_days(keys | self._kpi_keys())
+        return res
+
+    def unlink(self):
+        keys = self._kpi_keys()
+        res = super().unlink()
+        self.env['farm.flock.daily.kpi']._refresh_days(keys)
+        return res
+
+
+class FlockDailyKpi(models.Model):
+    """One row per flock and day with the figures the reports and charts need."""
+
+    _name = "farm.flock.daily.kpi"
+    _description = "Daily Flock KPI"
+    _order = "date desc, flock_id"
+    _rec_name = "date"
+
+    flock_id = fields.Many2one("farm.layer.flock", string="Flock", required=True, ondelete="cascade", readonly=True)
+    date = fields.Date(string="Date", required=True, readonly=True)
+    current_birds = fields.Integer(string="Current Birds", readonly=True)
+
+    mortality_normal = fields.Integer(string="Normal Mortality", readonly=True)
+    mortality_culled = fields.Integer(string="Culled", readonly=True)
+    mortality_vaccine = fields.Integer(string="Vaccine Reaction Mortality", readonly=True)
+    mortality_prolapse = fields.Integer(string="Prolapse Mortality", readonly=True)
+    mortality_heat_stress = fields.Integer(string="Heat Stress Mortality", readonly=True)
+    mortality_mechanical = fields.Integer(string="Mechanical Mortality", readonly=True)
+    mortality_injury = fields.Integer(string="Injury Mortality", readonly=True)
+    mortality_other = fields.Integer(string="Other Mortality", readonly=True)
+    total_mortality = fields.Integer(string="Total Mortality", readonly=True)
+
+    eggs_small = fields.Integer(string="Small Eggs", readonly=True)
+    eggs_medium = fields.Integer(string="Medium Eggs", readonly=True)
+    eggs_high_medium = fields.Integer(string="High Medium Eggs", readonly=True)
+    eggs_high = fields.Integer(string="High Eggs", readonly=True)
+    eggs_double_yolk = fields.Integer(string="Double Yolk Eggs", readonly=True)
+    eggs_broken = fields.Integer(string="Broken Eggs", readonly=True)
+    eggs_white = fields.Integer(string="White Eggs", readonly=True)
+    eggs_damage = fields.Integer(string="Damaged Eggs", readonly=True)
+    total_egg = fields.Integer(string="Total Eggs", readonly=True)
+    production_percentage = fields.Float(string="Production %", readonly=True)
+
+    feed_kg = fields.Float(string="Feed (kg)", readonly=True)
+    feed_per_bird = fields.Float(string="Feed Per Bird (gm)", readonly=True)
+    water_lit = fields.Float(string="Water (Liters)", readonly=True)
+    water_per_bird = fields.Float(string="Water Per Bird (ml)", readonly=True)
+    body_weight = fields.Float(string="Body Weight (g)", readonly=True)
+    medicine_cost = fields.Float(string="Medicine Cost", readonly=True)
+
+    # breed standard of the flock's age and the deviation from it, in %
+    std_body_weight = fields.Float(string="Standard Body Weight (g)", readonly=True)
+    std_production_percentage = fields.Float(string="Standard Production %", readonly=True)
+    std_feed_per_bird = fields.Float(string="Standard Feed Per Bird (gm)", readonly=True)
+    std_water_per_bird = fields.Float(string="Standard Water Per Bird (ml)", readonly=True)
+    body_weight_deviation = fields.Float(string="Body Weight Deviation (%)", readonly=True, aggregator='avg')
+    production_percentage_deviation = fields.Float(string="Production Deviation (%)", readonly=True, aggregator='avg')
+    feed_per_bird_deviation = fields.Float(string="Feed Deviation (%)", readonly=True, aggregator='avg')
+    water_per_bird_deviation = fields.Float(string="Water Deviation (%)", readonly=True, aggregator='avg')
+    off_standard = fields.Boolean(string="Off Standard", readonly=True,
+                                  help="A recorded figure is further from the breed standard than its tolerance.")
+
+    _sql_constraints = [
+        ('flock_date_uniq', 'unique(flock_id, date)', "Only one KPI row per flock and day is allowed."),
+    ]
+
+    @api.model
+    def _refresh_days(self, keys):
+        """Recompute the KPI rows of the given (flock id, date) pairs from the source tables.
+
+        Pairs without any source record left lose their row.
+        """
+        keys = {(flock_id, day) for flock_id, day in keys if flock_id and day}
+        if not keys:
+            return
+        self._flush_sources()
+        keys = sorted(keys)
+
+        mortality_cols = [f"mortality_{cause}" for cause in MORTALITY_CAUSE_KEYS]
+        egg_cols = list(EGG_COLUMNS)
+        columns = ["current_birds"] + mortality_cols + ["total_mortality"] + egg_cols + [
+            "production_percentage", "feed_kg", "feed_per_bird", "water_lit", "water_per_bird",
+            "body_weight", "medicine_cost",
+        ]
+        self.env.cr.execute(f"""
+            WITH k AS (
+                SELECT * FROM unnest(%s::int4[], %s::date[]) AS k(flock_id, date)
+            ),
+            prod AS (
+                SELECT p.flock_id, p.date, MAX(p.current_birds) AS birds,
+                       {", ".join(f"SUM(p.{src}) AS {col}" for col, src in EGG_COLUMNS.items())}
+                  FROM farm_production_details p JOIN k ON k.flock_id = p.flock_id AND k.date = p.date
+                 GROUP BY p.flock_id, p.date
+            ),
+            mort AS (
+                SELECT m.flock_id, m.date, MAX(m.current_birds) AS birds,
+                       {", ".join(
+                           f"SUM(b.count) FILTER (WHERE b.type = '{cause}') AS mortality_{cause}"
+                           for cause in MORTALITY_CAUSE_KEYS)},
+                       SUM(b.count) AS total_mortality
+                  FROM farm_mortality_details m JOIN k ON k.flock_id = m.flock_id AND k.date = m.date
+                  LEFT JOIN farm_mortality_breakdown b ON b.mortality_id = m.id
+                 GROUP BY m.flock_id, m.date
+            ),
+            feed AS (
+                SELECT f.flock_id, f.datetime AS date, MAX(f.current_bird) AS birds, SUM(f.feed_kg) AS feed_kg
+                  FROM feed_details f JOIN k ON k.flock_id = f.flock_id AND k.date = f.datetime
+                 GROUP BY f.flock_id, f.datetime
+            ),
+            water AS (
+                SELECT w.flock_id, w.date, MAX(w.current_birds) AS birds, SUM(w.water_lit) AS water_lit
+                  FROM farm_water_intake w JOIN k ON k.flock_id = w.flock_id AND k.date = w.date
+                 GROUP BY w.flock_id, w.date
+            ),
+            weight AS (
+                SELECT w.flock_id, w.date, AVG(w.act_weight) FILTER (WHERE w.act_weight > 0) AS body_weight
+                  FROM flock_body_weight w JOIN k ON k.flock_id = w.flock_id AND k.date = w.date
+                 GROUP BY w.flock_id, w.date
+            ),
+            med AS (
+                SELECT k.flock_id, k.date, SUM(l.total_cost) AS medicine_cost
+                  FROM farmboy_request_add_line l
+                  LEFT JOIN farm_boy_request_data r ON r.id = l.request_id
+                  JOIN k ON k.flock_id = l.flock_id AND k.date = COALESCE(r.date, l.request_date)
+                 GROUP BY k.flock_id, k.date
+            ),
+            joined AS (
+                SELECT k.flock_id, k.date,
+                       COALESCE(prod.birds, mort.birds, feed.birds, water.birds, 0) AS birds,
+                       {", ".join(f"prod.{col}" for col in egg_cols)},
+                       {", ".join(f"mort.{col}" for col in mortality_cols)}, mort.total_mortality,
+                       feed.feed_kg, water.water_lit, weight.body_weight, med.medicine_cost
+                  FROM k
+                  LEFT JOIN prod ON prod.flock_id = k.flock_id AND prod.date = k.date
+                  LEFT JOIN mort ON mort.flock_id = k.flock_id AND mort.date = k.date
+                  LEFT JOIN feed ON feed.flock_id = k.flock_id AND feed.date = k.date
+                  LEFT JOIN water ON water.flock_id = k.flock_id AND water.date = k.date
+                  LEFT JOIN weight ON weight.flock_id = k.flock_id AND weight.date = k.date
+                  LEFT JOIN med ON med.flock_id = k.flock_id AND med.date = k.date
+                 WHERE prod.flock_id IS NOT NULL OR mort.flock_id IS NOT NULL OR feed.flock_id IS NOT NULL
+                    OR water.flock_id IS NOT NULL OR weight.flock_id IS NOT NULL OR med.flock_id IS NOT NULL
+            ),
+            kpi_rows AS (
+                SELECT j.flock_id AS kpi_flock_id, j.date AS kpi_date, j.birds AS current_birds,
+                       {", ".join(f"COALESCE(j.{col}, 0) AS {col}" for col in mortality_cols + ["total_mortality"] + egg_cols)},
+                       COALESCE(j.total_egg * 100.0 / NULLIF(j.birds, 0), 0) AS production_percentage,
+                       COALESCE(j.feed_kg, 0) AS feed_kg,
+                       COALESCE(j.feed_kg * 1000.0 / NULLIF(j.birds, 0), 0) AS feed_per_bird,
+                       COALESCE(j.water_lit, 0) AS water_lit,
+                       COALESCE(j.water_lit * 1000.0 / NULLIF(j.birds, 0), 0) AS water_per_bird,
+                       COALESCE(j.body_weight, 0) AS body_weight,
+                       COALESCE(j.medicine_cost, 0) AS medicine_cost
+                  FROM joined j
+            ),
+            removed AS (
+                DELETE FROM farm_flock_daily_kpi t
+                 USING k
+                 WHERE t.flock_id = k.flock_id AND t.date = k.date
+                   AND NOT EXISTS (SELECT 1 FROM kpi_rows WHERE kpi_flock_id = k.flock_id AND kpi_date = k.date)
+            )
+            INSERT INTO farm_flock_daily_kpi (flock_id, date, {", ".join(columns)},
+                                              create_uid, create_date, write_uid, write_date)
+            SELECT kpi_flock_id, kpi_date, {", ".join(columns)},
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+              FROM kpi_rows
+            ON CONFLICT (flock_id, date) DO UPDATE
+               SET {", ".join(f"{col} = EXCLUDED.{col}" for col in columns)},
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, [
+            [flock_id for flock_id, _day in keys], [day for _flock_id, day in keys],
+            self.env.uid, self.env.uid,
+        ])
+        self._score("(k.flock_id, k.date) IN (SELECT * FROM unnest(%s::int4[], %s::date[]))", [
+            [flock_id for flock_id, _day in keys], [day for _flock_id, day in keys],
+        ])
+        self.invalidate_model()
+
+    @api.model
+    def _flush_sources(self, model_names=KPI_SOURCE_MODELS):
+        """Flush the pending writes of ``model_names``, the flocks and the KPI rows before reading them in SQL."""
+        for model_name in model_names + ('farm.layer.flock', self._name):
+            self.env[model_name].flush_model()
+
+    @api.model
+    def _score_flocks(self, flocks):
+        """Score every KPI row of ``flocks`` against their breed standard again."""
+        if not flocks:
+            return
+        self._flush_sources(())
+        self._score("k.flock_id = ANY(%s)", [flocks.ids])
+        self.invalidate_model()
+
+    @api.model
+    def _score(self, where, params):
+        """Compare the KPI rows matching ``where`` with their flock's breed standard.
+
+        The rows are read in one query, each standard interpolates the ages of
+        all its rows at once and the results are written back in one UPDATE.
+        """
+        self.env.cr.execute(f"""
+            SELECT k.id, f.breed_standard_id,
+                   COALESCE(f.age_in_days, 0) + (k.date - COALESCE(f.start_date, k.date)),
+                   {", ".join(f"k.{metric}" for metric in STANDARD_METRICS)}
+              FROM farm_flock_daily_kpi k
+              JOIN farm_layer_flock f ON f.id = k.flock_id
+             WHERE {where}
+        """, params)
+        rows_by_standard = defaultdict(list)
+        for row in self.env.cr.fetchall():
+            rows_by_standard[row[1]].append(row)
+        if not rows_by_standard:
+            return
+
+        standards = self.env['farm.breed.standard']
+        ids, standard_values, deviations, flags = [], defaultdict(list), defaultdict(list), []
+        for standard_id, rows in rows_by_standard.items():
+            ids += [row[0] for row in rows]
+            if not standard_id:
+                for metric in STANDARD_METRICS:
+                    standard_values[metric] += [0.0] * len(rows)
+                    deviations[metric] += [0.0] * len(rows)
+                flags += [False] * len(rows)
+                continue
+            tolerance = standards._get_curve(standard_id)[0]
+            curve = standards._interpolate(standard_id, [row[2] for row in rows])
+            row_flags = [False] * len(rows)
+            for index, metric in enumerate(STANDARD_METRICS):
+                actuals = [row[3 + index] for row in rows]
+                metric_deviations = [
+                    (actual - expected) * 100.0 / expected if actual and expected else 0.0
+                    for actual, expected in zip(actuals, curve[metric])
+                ]
+                standard_values[metric] += curve[metric]
+                deviations[metric] += metric_deviations
+                row_flags = [flag or abs(deviation) > tolerance for flag, deviation in zip(row_flags, metric_deviations)]
+            flags += row_flags
+
+        metrics = STANDARD_METRICS
+        self.env.cr.execute(f"""
+            UPDATE farm_flock_daily_kpi t
+               SET {", ".join(f"std_{metric} = s.std_{metric}, {metric}_deviation = s.{metric}_deviation" for metric in metrics)},
+                   off_standard = s.off_standard
+              FROM unnest(%s::int4[], {", ".join("%s::float8[], %s::float8[]" for _metric in metrics)}, %s::bool[])
+                AS s(id, {", ".join(f"std_{metric}, {metric}_deviation" for metric in metrics)}, off_standard)
+             WHERE t.id = s.id
+        """, [ids] + [values for metric in metrics for values in (standard_values[metric], deviations[metric])] + [flags])
+
+    @api.model
+    def _rebuild(self, flocks=None):
+        """Recompute every KPI row, or those of ``flocks``, from scratch."""
+        self._flush_sources()
+        flock_filter = "WHERE flock_id = ANY(%(flocks)s)" if flocks is not None else ""
+        params = {'flocks': flocks.ids if flocks is not None else None}
+        self.env.cr.execute(f"DELETE FROM farm_flock_daily_kpi {flock_filter}", params)
+        self.env.cr.execute(f"""
+            SELECT flock_id, date FROM (
+                SELECT flock_id, date FROM farm_production_details
+                 UNION SELECT flock_id, date FROM farm_mortality_details
+                 UNION SELECT flock_id, datetime FROM feed_details
+                 UNION SELECT flock_id, date FROM farm_water_intake
+                 UNION SELECT flock_id, date FROM flock_body_weight
+                 UNION SELECT l.flock_id, COALESCE(r.date, l.request_date)
+                         FROM farmboy_request_add_line l LEFT JOIN farm_boy_request_data r ON r.id = l.request_id
+            ) keys
+            {flock_filter}
+        """, params)
+        self._refresh_days(self.env.cr.fetchall())
+        return True
@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from odoo import models, fields
+
+
+class FarmLineAuditMixin(models.AbstractModel):
+    """Log line changes in the chatter of their parent record.
+
+    Inheriting models name the parent field and the audited fields and
+    provide ``_format_plain_message(action, changes, previous_state)``. A write
+    diffs the whole recordset first, writes once, then posts one message per
+    parent covering all of its lines. The ``farm_skip_line_audit`` context key
+    disables the messages.
+    """
+
+    _name = "farm.line.audit.mixin"
+    _description = "Line Audit in Parent Chatter"
+
+    _audit_parent_field = None
+    _audit_fields = ()
+    _audit_label = "Line"
+
+    def _audit_changes(self, vals):
+        """Return ``{line: (changes, previous state)}`` of the lines ``vals`` would change."""
+        displays = {}
+        for fname in self._audit_fields:
+            if fname not in vals:
+                continue
+            field = self._fields[fname]
+            if isinstance(field, fields.Many2one):
+                displays[fname] = self.env[field.comodel_name].browse(vals[fname]).name if vals[fname] else False
+            else:
+                displays[fname] = vals[fname]
+
+        result = {}
+        for line in self:
+            changes = []
+            for fname, new_display in displays.items():
+                old_val = line[fname]
+                old_display = (old_val.name or False) if isinstance(old_val, models.BaseModel) else old_val
+                if old_display != new_display:
+                    changes.append(f"{fname.replace('_', ' ').title()}: '{old_display}' → '{new_display}'")
+            if changes:
+                result[line] = (changes, line.state)
+        return result
+
+    def _audit_post(self, action, changes=None):
+        """Post one message per parent with a block for each of the lines."""
+        if self.env.context.get('farm_skip_line_audit'):
+            return
+        blocks = defaultdict(list)
+        for line in self:
+            parent = line[self._audit_parent_field]
+            if not parent:
+                continue
+            if changes is None:
+                blocks[parent].append(line._format_plain_message(action=action))
+            elif line in changes:
+                line_changes, previous_state = changes[line]
+                blocks[parent].append(line._format_plain_message(
+                    action=action, changes=line_changes, previous_state=previous_state,
+                ))
+        for parent, parent_blocks in blocks.items():
+            parent.message_post(body="\n\n".join(parent_blocks))
+
+    def write(self, vals):
+        if self.env.context.get('farm_skip_line_audit') or not set(self._audit_fields).intersection(vals):
+            return super().write(vals)
+        changes = self._audit_changes(vals)
+        res = super().write(vals)
+        self.browse([line.id for line in changes])._audit_post(f"{self._audit_label} Updated", changes)
+        return res
@@ -1,4 +1,7 @@
-from odoo import models, fields, api
+from bisect import bisect_right
+from collections import defaultdict
+
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError, UserError
 from datetime import datetime
 
@@ -6,7 +9,7 @@ from datetime import datetime
 class AddMedicineByLiveTemperature(models.Model):
     _name = "add.medicine.by.live.temperature"
     _description = "Temperature-based Medicine Record"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
     _order = "create_date desc"
  
 
@@ -46,21 +49,84 @@ class AddMedicineByLiveTemperature(models.Model):
             if record.selection_type in ['temp', 'age_temp']:
                 if record.min_temp and record.max_temp and record.min_temp >= record.max_temp:
                     raise ValidationError("Minimum temperature must be less than maximum temperature.")
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(AddMedicineByLiveTemperature, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'selection_type', 'min_age', 'max_age', 'min_temp', 'max_temp', 'state'}.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache()
+    def _get_rule_index(self):
+        """Compile the confirmed rules into interval lists sorted on their lower bound.
+
+        :returns: ``(age intervals, temp intervals, kinds, doses)`` made of plain
+            tuples only: the intervals are ``(lower bounds, (lower, upper, rule id))``,
+            ``kinds`` maps a rule id to its selection type and ``doses`` to its
+            ``(product id, dose per water liter)`` pairs
+        """
+        rules = self.sudo().search([('state', '=', 'done')])
+        age_intervals, temp_intervals, kinds, doses = [], [], {}, defaultdict(list)
+        for rule in rules:
+            kinds[rule.id] = rule.selection_type
+            if rule.selection_type in ('age', 'age_temp'):
+                age_intervals.append((rule.min_age, rule.max_age, rule.id))
+            if rule.selection_type in ('temp', 'age_temp'):
+                temp_intervals.append((rule.min_temp, rule.max_temp, rule.id))
+        for line in rules.medicine_line_ids:
+            doses[line.temperature_id.id].append((line.product_id.id, line.dose_per_water_liter or 0))
+
+        def compile_intervals(intervals):
+            intervals = tuple(sorted(intervals))
+            return tuple(lower for lower, _upper, _rule_id in intervals), intervals
+
+        return (
+            compile_intervals(age_intervals),
+            compile_intervals(temp_intervals),
+            kinds,
+            {rule_id: tuple(pairs) for rule_id, pairs in doses.items()},
+        )
+
     @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('name', 'like', f'MED/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.name.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['name'] = f"MED/{today_str}/{next_seq}"
-        return super(AddMedicineByLiveTemperature, self).create(vals)
+    def _match_medicines(self, age, tmin, tmax, birds):
+        """Return the summed doses of the rules matching a flock's age and temperature.
+
+        Age rules match when ``age`` falls within their range, temperature rules
+        when their range overlaps ``[tmin, tmax]``, combined rules need both.
+
+        :returns: ``{product id: dose per water liter * birds}``, positive quantities only
+        """
+        (age_lowers, age_intervals), (temp_lowers, temp_intervals), kinds, doses = self._get_rule_index()
+        age_hits = {
+            rule_id for _lower, upper, rule_id in age_intervals[:bisect_right(age_lowers, age)]
+            if upper >= age
+        }
+        temp_hits = {
+            rule_id for _lower, upper, rule_id in temp_intervals[:bisect_right(temp_lowers, tmax)]
+            if upper >= tmin
+        }
+        matched = {
+            rule_id for rule_id in age_hits | temp_hits
+            if kinds[rule_id] != 'age_temp' or (rule_id in age_hits and rule_id in temp_hits)
+        }
+
+        quantities = defaultdict(float)
+        for rule_id in matched:
+            for product_id, dose in doses.get(rule_id, ()):
+                qty = dose * (birds or 0)
+                if qty > 0:
+                    quantities[product_id] += qty
+        return dict(quantities)
 
     def action_draft(self):
         if self.state == "draft":
@@ -100,6 +166,23 @@ class AddMedicineTemperatureLine(models.Model):
     uom_id = fields.Many2one('uom.uom', string="Unit of Measure", readonly=True)
 
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'temperature_id', 'product_id', 'dose_per_water_liter'}.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
     @api.depends('temperature_id.selection_type', 'temperature_id.min_age', 'temperature_id.max_age',
                  'temperature_id.min_temp', 'temperature_id.max_temp')
     def _compute_selection_display(self):
@@ -7,7 +7,7 @@ _logger = logging.getLogger(__name__)
 class MenualTemperatureEntry(models.Model):
     _name = "menual.temperature.entry"
     _description = "Manual Temperature Entry for Tunnel Ventilation"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
  
 
     name = fields.Char(string="Reference", default="New", readonly=True, tracking=True)
@@ -40,26 +40,15 @@ class MenualTemperatureEntry(models.Model):
             self.age_in_days = self.flock_id.current_age_in_days
             self.current_age_display = self.flock_id.current_age_display
 
-    @api.model
-    def create(self, vals):
-        if 'date' in vals:
-            existing = self.search([('date', '=', vals['date'])])
-            if existing:
-                raise ValidationError("A temperature entry for this day already exists.")
-            
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('name', 'like', f'MTE/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.name.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['name'] = f"MTE/{today_str}/{next_seq}"
-        return super(MenualTemperatureEntry, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if 'date' in vals:
+                existing = self.search([('date', '=', vals['date'])])
+                if existing:
+                    raise ValidationError("A temperature entry for this day already exists.")
+
+        return super(MenualTemperatureEntry, self).create(vals_list)
     def action_done(self):
         if self.state == "done":
             return 
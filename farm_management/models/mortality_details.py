@@ -1,4 +1,4 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import UserError
 from datetime import date
 from datetime import datetime
@@ -7,12 +7,25 @@ from odoo import models, fields, api, _
 
 _logger = logging.getLogger(__name__)
 
+MORTALITY_CAUSES = [
+    ('normal', 'Normal'),
+    ('culled', 'Culled'),
+    ('vaccine', 'Vaccine Reaction'),
+    ('prolapse', 'Prolapse'),
+    ('heat_stress', 'Heat Stress'),
+    ('mechanical', 'Mechanical'),
+    ('injury', 'Injury'),
+    ('other', 'Other'),
+]
+MORTALITY_CAUSE_KEYS = [key for key, _label in MORTALITY_CAUSES]
+
 class MortalityDetails(models.Model):
 
     _name = "farm.mortality.details"
     _description = "Mortality Details"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'farm.daily.kpi.source', 'mail.thread', 'mail.activity.mixin']
     _order = "date desc, id desc"
+    _kpi_trigger_fields = ('current_birds', 'breakdown_ids')
     
 
 
@@ -69,17 +82,17 @@ class MortalityDetails(models.Model):
     other_cause_mortality_new = fields.Integer(string="Other Cause Mortality", compute="_compute_new_added_mortality", store=True)  
 
 
-    cumaletive_mortality = fields.Float( string="Cumulative Mortality", compute="_compute_cumaletive_mortality", store=True )
+    cumaletive_mortality = fields.Float( string="Cumulative Mortality", compute="_compute_cumulative_mortality")
 
     ### cumalitive mortality fileds can be added here if needed ###
-    comalitive_mortality_normal = fields.Float(string="Cumulative Normal Cause Mortality", compute="_compute_cumalitive_mortality_normal", store=True)
-    comalitive_mortality_culled = fields.Float(string="Cumulative Culled Cause Mortality", compute="_compute_cumalitive_mortality_culled", store=True) 
-    comalitive_mortality_vaccine = fields.Float(string="Cumulative Vaccine Reaction Mortality", compute="_compute_cumalitive_mortality_vaccine", store=True)
-    comalitive_mortality_prolapse = fields.Float(string="Cumulative Prolapse Mortality", compute="_compute_cumalitive_mortality_prolapse", store=True)
-    comalitive_mortality_heat_stress = fields.Float(string="Cumulative Heat Stress Mortality", compute="_compute_cumalitive_mortality_heat_stress", store=True)
-    comalitive_mortality_mechanical = fields.Float(string="Cumulative Mechanical Mortality", compute="_compute_cumalitive_mortality_mechanical", store=True)
-    comalitive_mortality_injury = fields.Float(string="Cumulative Injury Mortality", compute="_compute_cumalitive_mortality_injury", store=True)
-    comalitive_mortality_other = fields.Float(string="Cumulative Other Cause Mortality", compute="_compute_cumalitive_mortality_other", store=True) 
+    comalitive_mortality_normal = fields.Float(string="Cumulative Normal Cause Mortality", compute="_compute_cumulative_mortality")
+    comalitive_mortality_culled = fields.Float(string="Cumulative Culled Cause Mortality", compute="_compute_cumulative_mortality") 
+    comalitive_mortality_vaccine = fields.Float(string="Cumulative Vaccine Reaction Mortality", compute="_compute_cumulative_mortality")
+    comalitive_mortality_prolapse = fields.Float(string="Cumulative Prolapse Mortality", compute="_compute_cumulative_mortality")
+    comalitive_mortality_heat_stress = fields.Float(string="Cumulative Heat Stress Mortality", compute="_compute_cumulative_mortality")
+    comalitive_mortality_mechanical = fields.Float(string="Cumulative Mechanical Mortality", compute="_compute_cumulative_mortality")
+    comalitive_mortality_injury = fields.Float(string="Cumulative Injury Mortality", compute="_compute_cumulative_mortality")
+    comalitive_mortality_other = fields.Float(string="Cumulative Other Cause Mortality", compute="_compute_cumulative_mortality") 
 
     ### individual cause percentage fields can be added here if needed ###
     
@@ -93,103 +106,24 @@ class MortalityDetails(models.Model):
     cause_percentage_other = fields.Float(string="Other Cause Percentage", compute="_compute_cause_percentage_other", store=True)
     ##### type wise total mortality 
 
-    ### Compute Methods for cumalitive mortality ###
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_normal(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                normal_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'normal').mapped('count'))
-                rec.comalitive_mortality_normal = normal_count
-            else:
-                rec.comalitive_mortality_normal = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_culled(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                culled_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'culled').mapped('count'))
-                rec.comalitive_mortality_culled = culled_count
-            else:
-                rec.comalitive_mortality_culled = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_vaccine(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                vaccine_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'vaccine').mapped('count'))
-                rec.comalitive_mortality_vaccine = vaccine_count
-            else:
-                rec.comalitive_mortality_vaccine = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_prolapse(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                prolapse_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'prolapse').mapped('count'))
-                rec.comalitive_mortality_prolapse = prolapse_count
-            else:
-                rec.comalitive_mortality_prolapse = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_heat_stress(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                heat_stress_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'heat_stress').mapped('count'))
-                rec.comalitive_mortality_heat_stress = heat_stress_count
-            else:
-                rec.comalitive_mortality_heat_stress = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_mechanical(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                mechanical_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'mechanical').mapped('count'))
-                rec.comalitive_mortality_mechanical = mechanical_count
-            else:
-                rec.comalitive_mortality_mechanical = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_injury(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                injury_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'injury').mapped('count'))
-                rec.comalitive_mortality_injury = injury_count
-            else:
-                rec.comalitive_mortality_injury = 0
-    @api.depends('breakdown_ids.count', 'date', 'flock_id')
-    def _compute_cumalitive_mortality_other(self):
+    def init(self):
+        # daily records are looked up by flock and day
+        tools.create_index(self._cr, 'farm_mortality_details_flock_date_idx', self._table, ['flock_id', 'date'])
+
+    ### Cumulative mortality, read from the per-cause running-total ledger ###
+    @api.depends('breakdown_ids.count', 'breakdown_ids.type', 'date', 'flock_id')
+    def _compute_cumulative_mortality(self):
+        keys = {(rec.flock_id.id, rec.date) for rec in self if rec.flock_id and rec.date}
+        cumulative = self.env['farm.mortality.ledger']._get_cumulative(keys)
         for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                other_count = sum(previous_records.mapped('breakdown_ids').filtered(lambda b: b.type == 'other').mapped('count'))
-                rec.comalitive_mortality_other = other_count
-            else:
-                rec.comalitive_mortality_other = 0 
+            by_cause = dict(cumulative.get((rec.flock_id.id, rec.date), {}))
+            if not rec._origin:
+                # unsaved record: its own lines are not in the ledger yet
+                for line in rec.breakdown_ids:
+                    by_cause[line.type] = by_cause.get(line.type, 0) + line.count
+            for cause in MORTALITY_CAUSE_KEYS:
+                rec[f'comalitive_mortality_{cause}'] = by_cause.get(cause, 0)
+            rec.cumaletive_mortality = sum(by_cause.values())
 
    
     @api.depends('breakdown_ids.count', 'total_mortality')
@@ -268,20 +202,6 @@ class MortalityDetails(models.Model):
             else:
                 rec.today_overall_mortality_percentage = 0
 
-    @api.depends('total_mortality', 'date', 'flock_id')
-    def _compute_cumaletive_mortality(self):
-        for rec in self:
-            if rec.flock_id:
-                previous_records = self.env['farm.mortality.details'].search([
-                    ('flock_id', '=', rec.flock_id.id),
-                    ('date', '<=', rec.date)
-                ])
-                rec.cumaletive_mortality = sum(previous_records.mapped('total_mortality'))
-
-            else:
-                rec.cumaletive_mortality = 0
-
-
     @api.depends('breakdown_ids.count')
     def _compute_total_mortality(self):
         for record in self:
@@ -355,41 +275,19 @@ class MortalityDetails(models.Model):
                 draft_lines.filtered(lambda b: b.type == 'other').mapped('count')
             )
 
+    def write(self, vals):
+        if not {'flock_id', 'date'}.intersection(vals):
+            return super().write(vals)
+        ledger_keys = self.breakdown_ids._ledger_keys()
+        res = super().write(vals)
+        self.env['farm.mortality.ledger']._sync_days(ledger_keys | self.breakdown_ids._ledger_keys())
+        return res
 
-    @api.model
-    def create(self, vals):
-
-        # record_date = vals.get('date') or fields.Date.context_today(self)
-        # flock_id = vals.get('flock_id')
-
-        # if record_date and flock_id:
-        #     count = self.search_count([
-        #         ('date', '=', record_date),
-        #         ('flock_id', '=', flock_id)
-        #     ])
-
-        #     if count >= 2:
-        #         raise UserError(
-        #             f"For this flock on {record_date}, only 2 entries are allowed. "
-        #             "You cannot create more than 2 records."
-        #         )
-            
-        if vals.get('name', 'New') == 'New':
-            last_record = self.search([('name', 'like', 'Daily/M/D/%')], 
-                                      order='id desc', limit=1)
-            if last_record and last_record.name:
-                try:
-                    last_seq = int(last_record.name.split('/')[-1])
-                    next_seq = str(last_seq + 1).zfill(5)  
-                except ValueError:
-                    next_seq = '00001'
-            else:
-                next_seq = '00001'
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            vals['name'] = f"M/D/{today_str}"
-
-        return super(MortalityDetails, self).create(vals)
-    
+    def unlink(self):
+        ledger_keys = self.breakdown_ids._ledger_keys()
+        res = super().unlink()
+        self.env['farm.mortality.ledger']._sync_days(ledger_keys)
+        return res
 
     @api.onchange('flock_id')
     def _onchange_get_flock_data(self):
@@ -409,57 +307,42 @@ class MortalityDetails(models.Model):
        
 
     def action_confirm(self):
-        
-        if self.state =="done":
-            return 
-        else:
-            for record in self:
-                if not record.flock_id:
-                    raise UserError("Flock not assigned!")
-                product = record.flock_id.product_id
-                if not product:
-                    raise UserError("No bird product linked with this flock!")
-                if record.new_added_ <= 0:
-                    record.state = "done"
-                    record.message_post(body="Mortality is zero. No birds removed.")
-                    continue 
-                
-                quants = self.env['stock.quant'].search([
-                    ('product_id', '=', product.id),
-                    ('location_id.usage', '=', 'internal'),
-                    ('quantity', '>', 0)
-                ], order='quantity desc')
-                total_available = sum(q.quantity for q in quants)
-                if total_available < record.new_added_:
-                    raise UserError(
-                        f"Not enough birds in stock to remove mortality!\nAvailable: {total_available}, Required: {record.total_mortality}"
-                    )
-                qty_to_remove = record.new_added_
-                for quant in quants:
-                    if qty_to_remove <0:
-                        break
-                    remove_qty = min(quant.quantity, qty_to_remove)
-                    scrap = self.env['stock.scrap'].create({
-                        'product_id': product.id,
-                        'scrap_qty': remove_qty,
-                        'location_id': quant.location_id.id,
-                        'company_id': self.env.company.id,
-                        'origin': f"Mortality Record {record.name} - Flock {record.flock_id.name}"
-                    })
-                    scrap.action_validate()
-                qty_to_remove -= remove_qty
-                record.current_birds = max(record.flock_opening_bird - record.new_added_, 0)
-                record.message_post(body=f"Removed {record.new_added_} birds from flock due to mortality.")
-                _logger.info("Mortality removed for flock %s: %s birds", record.flock_id.name, record.new_added_)
-                self.current_birds = self.flock_id.total_qty
-                if record.breakdown_ids:
-                    record.breakdown_ids.write({'state': 'done'})
-        self.state = 'done'
+        records = self.filtered(lambda r: r.state != 'done')
+        for record in records:
+            if not record.flock_id:
+                raise UserError("Flock not assigned!")
+            if not record.flock_id.product_id:
+                raise UserError("No bird product linked with this flock!")
+
+        removed = {record.id: record.new_added_ for record in records}
+        self.env['agro.stock.consumption'].consume([{
+            'product': record.flock_id.product_id,
+            'qty': removed[record.id],
+            'origin': f"Mortality Record {record.name} - Flock {record.flock_id.name}",
+        } for record in records if removed[record.id] > 0])
+
+        for record in records:
+            if removed[record.id] <= 0:
+                record.message_post(body="Mortality is zero. No birds removed.")
+                continue
+            record.current_birds = record.flock_id.total_qty
+            record.message_post(body=f"Removed {removed[record.id]} birds from flock due to mortality.")
+            _logger.info("Mortality removed for flock %s: %s birds", record.flock_id.name, removed[record.id])
+            if record.breakdown_ids:
+                record.breakdown_ids.write({'state': 'done'})
+        records.write({'state': 'done'})
+        self.env['farm.flock.anomaly.state']._trigger_detection()
     
 
 class MortalityBreakdown(models.Model):
     _name = "farm.mortality.breakdown"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.line.audit.mixin', 'farm.daily.kpi.source', 'mail.thread', 'mail.activity.mixin']
+    _audit_parent_field = 'mortality_id'
+    _audit_fields = ('type', 'count', 'date', 'state')
+    _audit_label = "Mortality Breakdown"
+    _kpi_flock_field = 'mortality_id.flock_id'
+    _kpi_date_field = 'mortality_id.date'
+    _kpi_trigger_fields = ('type', 'count')
     
 
     
@@ -467,18 +350,10 @@ class MortalityBreakdown(models.Model):
     mortality_id = fields.Many2one(
         'farm.mortality.details', 
         string="Mortality Reference", 
-        ondelete="cascade"
+        ondelete="cascade",
+        index=True,
     )
-    type = fields.Selection([
-        ('normal', 'Normal'),
-        ('culled', 'Culled'),
-        ('vaccine', 'Vaccine Reaction'),
-        ('prolapse', 'Prolapse'),
-        ('heat_stress', 'Heat Stress'),
-        ('mechanical', 'Mechanical'),
-        ('injury', 'Injury'),
-        ('other', 'Other'),
-    ], string="Cause", required=True, tracking=True)
+    type = fields.Selection(MORTALITY_CAUSES, string="Cause", required=True, tracking=True)
 
     count = fields.Integer(string="Quantity", required=True, default=0, tracking=True,)
     date = fields.Date(string="Date", required=True, default=fields.Date.today)
@@ -493,13 +368,14 @@ class MortalityBreakdown(models.Model):
             line.state = 'done'
         self.state =="done"
 
-    def unlink(self):
-        """Prevent deletion if record is in 'done' state."""
-        for record in self:
-            if record.state == 'done':
-                raise UserError("You cannot delete a mortality breakdown marked as Done!")
-        return super().unlink()
-    
+    def _ledger_keys(self):
+        """(flock, cause, day) ledger keys the lines contribute to."""
+        return {
+            (line.mortality_id.flock_id.id, line.type, line.mortality_id.date)
+            for line in self
+            if line.mortality_id.flock_id and line.mortality_id.date
+        }
+
 
     def _format_plain_message(self, action, changes=None, previous_state=None):
         
@@ -518,56 +394,127 @@ class MortalityBreakdown(models.Model):
         return "\n".join(msg_lines)
 
     def write(self, vals):
-        tracked_fields = ['type', 'count', 'date', 'state']
-        messages_by_mortality = {}
-        for line in self:
-            changes = []
-            previous_state = line.state
-            for field in tracked_fields:
-                if field in vals:
-                    old_val = line[field]
-                    new_val = vals[field]
-
-                    if isinstance(line._fields[field], fields.Many2one):
-                        comodel = line._fields[field].comodel_name
-                        new_val_display = self.env[comodel].browse(new_val).name if new_val else False
-                        old_val_display = old_val.name if old_val else False
-                    else:
-                        new_val_display = new_val
-                        old_val_display = old_val
-
-                    if old_val_display != new_val_display:
-                        changes.append(f"{field.replace('_', ' ').title()}: '{old_val_display}' → '{new_val_display}'")
-
-            res = super(MortalityBreakdown, self).write(vals)
-
-            if changes and line.mortality_id:
-                msg = line._format_plain_message(
-                    action="Mortality Breakdown Updated",
-                    changes=changes,
-                    previous_state=previous_state
-                )
-                line.mortality_id.message_post(body=msg)
+        sync_ledger = bool({'type', 'count', 'mortality_id'}.intersection(vals))
+        ledger_keys = self._ledger_keys() if sync_ledger else set()
+        res = super(MortalityBreakdown, self).write(vals)
+        if sync_ledger:
+            self.env['farm.mortality.ledger']._sync_days(ledger_keys | self._ledger_keys())
+        return res
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(MortalityBreakdown, self).create(vals_list)
+        self.env['farm.mortality.ledger']._sync_days(records._ledger_keys())
+        records._audit_post("New Mortality Breakdown Created")
+        return records
 
+    def unlink(self):
+        if any(record.state == 'done' for record in self):
+            raise UserError("You cannot delete a mortality breakdown marked as Done!")
+        self._audit_post("Mortality Breakdown Deleted")
+        ledger_keys = self._ledger_keys()
+        res = super(MortalityBreakdown, self).unlink()
+        self.env['farm.mortality.ledger']._sync_days(ledger_keys)
         return res
 
+
+class MortalityLedger(models.Model):
+    """Per-flock, per-cause running mortality by day.
+
+    One row per (flock, cause, day) holding the day's count and the running
+    total up to that day. Breakdown changes re-aggregate only the touched
+    days and roll the totals of the later rows forward.
+    """
+    _name = "farm.mortality.ledger"
+    _description = "Mortality Ledger"
+    _inherit = ['farm.running.total.mixin']
+    _order = "flock_id, cause, date"
+
+    _running_partition = ('flock_id', 'cause')
+    _running_order = ()
+    _running_totals = {'cumulative_count': 'day_count'}
+
+    flock_id = fields.Many2one("farm.layer.flock", string="Flock", required=True, ondelete="cascade")
+    cause = fields.Selection(MORTALITY_CAUSES, string="Cause", required=True)
+    date = fields.Date(string="Date", required=True)
+    day_count = fields.Integer(string="Mortality")
+    cumulative_count = fields.Integer(string="Cumulative Mortality")
+
+    _sql_constraints = [
+        ('flock_cause_date_uniq', 'unique(flock_id, cause, date)',
+         "Only one ledger row is allowed per flock, cause and date."),
+    ]
+
     @api.model
-    def create(self, vals):
-        record = super(MortalityBreakdown, self).create(vals)
-        if record.mortality_id:
-            msg = record._format_plain_message(
-                action="New Mortality Breakdown Created"
-            )
-            record.mortality_id.message_post(body=msg)
-        return record
+    def _sync_days(self, keys):
+        """Re-aggregate the (flock, cause, day) ``keys`` from the breakdown lines."""
+        keys = [key for key in keys if all(key)]
+        if not keys:
+            return
+        self.env['farm.mortality.breakdown'].flush_model(['mortality_id', 'type', 'count'])
+        self.env['farm.mortality.details'].flush_model(['flock_id', 'date'])
+        flock_ids, causes, dates = (list(column) for column in zip(*keys))
+        self.env.cr.execute("""
+            INSERT INTO farm_mortality_ledger (flock_id, cause, date, day_count, cumulative_count)
+            SELECT k.flock_id, k.cause, k.date, COALESCE(SUM(b.count), 0), 0
+              FROM unnest(%s::int4[], %s::varchar[], %s::date[]) AS k(flock_id, cause, date)
+              LEFT JOIN farm_mortality_details d ON d.flock_id = k.flock_id AND d.date = k.date
+              LEFT JOIN farm_mortality_breakdown b ON b.mortality_id = d.id AND b.type = k.cause
+             GROUP BY k.flock_id, k.cause, k.date
+            ON CONFLICT (flock_id, cause, date) DO UPDATE SET day_count = EXCLUDED.day_count
+        """, [flock_ids, causes, dates])
+        self.invalidate_model(['day_count'])
+
+        starts = {}
+        for flock_id, cause, day in keys:
+            starts[(flock_id, cause)] = min(starts.get((flock_id, cause), day), day)
+        self._refresh_running_totals(starts)
 
-    def unlink(self):
-        for record in self:
-            if record.state == 'done':
-                raise UserError("You cannot delete a mortality breakdown marked as Done!")
-            if record.mortality_id:
-                msg = record._format_plain_message(
-                    action="Mortality Breakdown Deleted"
-                )
-                record.mortality_id.message_post(body=msg)
-        return super(MortalityBreakdown, self).unlink()
\ No newline at end of file
+    @api.model
+    def _rebuild_ledger(self, flocks=None):
+        """Rebuild the ledger from the breakdown lines, for ``flocks`` or for all."""
+        self.env['farm.mortality.breakdown'].flush_model(['mortality_id', 'type', 'count'])
+        self.env['farm.mortality.details'].flush_model(['flock_id', 'date'])
+        flock_filter = "AND d.flock_id = ANY(%(flock_ids)s)" if flocks is not None else ""
+        params = {'flock_ids': flocks.ids if flocks is not None else []}
+        self.env.cr.execute(f"""
+            DELETE FROM farm_mortality_ledger d WHERE TRUE {flock_filter};
+            INSERT INTO farm_mortality_ledger (flock_id, cause, date, day_count, cumulative_count)
+            SELECT d.flock_id, b.type, d.date, SUM(b.count),
+                   SUM(SUM(b.count)) OVER (PARTITION BY d.flock_id, b.type ORDER BY d.date)
+              FROM farm_mortality_breakdown b
+              JOIN farm_mortality_details d ON d.id = b.mortality_id
+             WHERE d.flock_id IS NOT NULL AND d.date IS NOT NULL AND b.type IS NOT NULL {flock_filter}
+             GROUP BY d.flock_id, b.type, d.date
+        """, params)
+        self.invalidate_model()
+
+    @api.model
+    def _get_cumulative(self, keys):
+        """Running total per cause at each (flock, day) of ``keys``.
+
+        Each lookup is one descent of the (flock, cause, date) index.
+
+        :returns: ``{(flock_id, day): {cause: cumulative count}}``
+        """
+        keys = [key for key in keys if all(key)]
+        if not keys:
+            return {}
+        self.flush_model(['flock_id', 'cause', 'date', 'cumulative_count'])
+        flock_ids, dates = (list(column) for column in zip(*keys))
+        self.env.cr.execute("""
+            SELECT k.flock_id, k.date, c.cause, l.cumulative_count
+              FROM unnest(%s::int4[], %s::date[]) AS k(flock_id, date)
+             CROSS JOIN unnest(%s::varchar[]) AS c(cause)
+              JOIN LATERAL (
+                   SELECT cumulative_count
+                     FROM farm_mortality_ledger
+                    WHERE flock_id = k.flock_id AND cause = c.cause AND date <= k.date
+                    ORDER BY date DESC
+                    LIMIT 1
+              ) l ON TRUE
+        """, [flock_ids, dates, MORTALITY_CAUSE_KEYS])
+        result = {}
+        for flock_id, day, cause, cumulative in self.env.cr.fetchall():
+            result.setdefault((flock_id, day), {})[cause] = cumulative
+        return result
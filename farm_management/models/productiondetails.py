@@ -1,13 +1,26 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools, Command
 from odoo.exceptions import UserError, ValidationError
-from datetime import datetime
 
 class ProductionDetails(models.Model):
     _name = "farm.production.details"
     _description = "Production Details"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin', 'farm.running.total.mixin',
+                'farm.daily.kpi.source']
     _order = "id desc"
-    
+
+    # per-flock running egg counts, in (date, id) order
+    _running_totals = {
+        'small_cumulative': 'total_small',
+        'medium_cumulative': 'total_medium',
+        'high_medium_cumulative': 'total_high_medium',
+        'high_cumulative': 'total_high',
+        'double_yolk_cumulative': 'total_double_yolk',
+        'broken_cumulative': 'total_broken',
+        'white_cumulative': 'total_white',
+        'damage_cumulative': 'total_damage',
+        'cumulative_egg': 'total_egg',
+    }
+    _kpi_trigger_fields = ('current_birds', 'egg_line_ids')
 
     name = fields.Char(string="Reference", default="New", readonly=True)
     egg_line_ids = fields.One2many("farm.egg.line", "production_id", string="Egg Categories", default=lambda self: [])
@@ -24,7 +37,7 @@ class ProductionDetails(models.Model):
     total_egg = fields.Integer(string="Total Egg", compute="_compute_egg_totals", store=True, tracking=True)
 
     percentage = fields.Float(string="Production Percentage", compute="_compute_percentage", store=True, tracking=True)
-    cumulative_egg = fields.Integer(string="Cumulative Egg", compute="_compute_cumulative", store=True, tracking=True)
+    cumulative_egg = fields.Integer(string="Cumulative Egg", readonly=True)
 
     egg_weight = fields.Float(string="Egg Weight (gm)", tracking=True)
     act = fields.Integer(string="Act", tracking=True)
@@ -45,14 +58,14 @@ class ProductionDetails(models.Model):
     damage_percentage = fields.Float(string="Damage %", compute="_compute_category_percentage", store=True, tracking=True)
 
 
-    small_cumulative = fields.Float(string="Small Egg Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    medium_cumulative = fields.Float(string="Medium Egg Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    high_medium_cumulative = fields.Float(string="High Medium Egg Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    high_cumulative = fields.Float(string="High Egg Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    double_yolk_cumulative = fields.Float(string="Double Yolk Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    broken_cumulative = fields.Float(string="Broken Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    white_cumulative = fields.Float(string="White Cumulative", compute="_compute_cumulative", store=True, tracking=True)
-    damage_cumulative = fields.Float(string="Damage Cumulative", compute="_compute_cumulative", store=True, tracking=True)
+    small_cumulative = fields.Float(string="Small Egg Cumulative", readonly=True)
+    medium_cumulative = fields.Float(string="Medium Egg Cumulative", readonly=True)
+    high_medium_cumulative = fields.Float(string="High Medium Egg Cumulative", readonly=True)
+    high_cumulative = fields.Float(string="High Egg Cumulative", readonly=True)
+    double_yolk_cumulative = fields.Float(string="Double Yolk Cumulative", readonly=True)
+    broken_cumulative = fields.Float(string="Broken Cumulative", readonly=True)
+    white_cumulative = fields.Float(string="White Cumulative", readonly=True)
+    damage_cumulative = fields.Float(string="Damage Cumulative", readonly=True)
 
     ### Egg production Warehouse locations
 
@@ -80,6 +93,10 @@ class ProductionDetails(models.Model):
         required=True
     )
 
+    def init(self):
+        # daily records are looked up by flock and day
+        tools.create_index(self._cr, 'farm_production_details_flock_date_idx', self._table, ['flock_id', 'date'])
+
     @api.onchange('picking_type_id')
     def _onchange_picking_type_id(self):
         if self.picking_type_id:
@@ -87,19 +104,6 @@ class ProductionDetails(models.Model):
             self.location_dest_id = self.picking_type_id.default_location_dest_id
 
 
-    @api.depends("total_egg", "current_birds")
-    def _compute_cumulative(self):
-        all_records = self.search([])
-        for rec in self:
-            rec.small_cumulative = sum(all_records.mapped("total_small"))
-            rec.medium_cumulative = sum(all_records.mapped("total_medium"))
-            rec.high_medium_cumulative = sum(all_records.mapped("total_high_medium"))
-            rec.high_cumulative = sum(all_records.mapped("total_high"))
-            rec.double_yolk_cumulative = sum(all_records.mapped("total_double_yolk"))
-            rec.broken_cumulative = sum(all_records.mapped("total_broken"))
-            rec.white_cumulative = sum(all_records.mapped("total_white"))
-            rec.damage_cumulative = sum(all_records.mapped("total_damage"))
-
     @api.depends("total_egg")
     def _compute_category_percentage(self):
         for record in self:
@@ -118,28 +122,6 @@ class ProductionDetails(models.Model):
         self.current_age_display = self.flock_id.current_age_display
         self.bird_type = self.flock_id.bird_type
 
-
-    @api.model
-    def create(self, vals):
-
-        # record_date = vals.get('date') or fields.Date.context_today(self)
-        # flock_id = vals.get('flock_id')
-        # if record_date and flock_id:
-        #     count = self.search_count([
-        #         ('date', '=', record_date),
-        #         ('flock_id', '=', flock_id)
-        #     ])
-        #     if count >= 2:
-        #         raise UserError(
-        #             f"For this flock on {record_date}, only 2 entries are allowed. "
-        #             "You cannot create more than 2 records."
-        #         )
-        
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            vals['name'] = f"P/D/{today_str}"
-        return super(ProductionDetails, self).create(vals)
-
     @api.depends("egg_line_ids.egg_type", "egg_line_ids.value")
     def _compute_egg_totals(self):
         for rec in self:
@@ -158,11 +140,6 @@ class ProductionDetails(models.Model):
                 rec.total_white + rec.total_damage
             )
 
-        all_records = self.search([])
-        total_sum = sum(all_records.mapped("total_egg"))
-        for rec in self:
-            rec.cumulative_egg = total_sum
-
     @api.depends("total_egg", "current_birds")
     def _compute_percentage(self):
         for record in self:
@@ -178,8 +155,7 @@ class ProductionDetails(models.Model):
             self.state = 'done'
             self.message_post(body="Production marked as Done state.")
             if self.egg_line_ids:
-                    self.egg_line_ids.action_done()
-                    self.egg_line_ids.write({'state': 'done'})
+                self.egg_line_ids.action_done()
 
 
 class EggInventoryProcess(models.Model):
@@ -225,12 +201,19 @@ class EggInventoryProcess(models.Model):
 class EggLine(models.Model):
     _name = "farm.egg.line"
     _description = "Egg Line"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.line.audit.mixin', 'farm.daily.kpi.source', 'mail.thread', 'mail.activity.mixin']
+    _audit_parent_field = 'production_id'
+    _audit_fields = ('egg_type', 'value', 'date', 'state', 'product_id', 'short_description')
+    _audit_label = "Egg Line"
+    _kpi_flock_field = 'production_id.flock_id'
+    _kpi_date_field = 'production_id.date'
+    _kpi_trigger_fields = ('egg_type', 'value')
 
     production_id = fields.Many2one(
         "farm.production.details",
         string="Production",
         ondelete="cascade",
+        index=True,
         tracking=True
     )
     date = fields.Datetime(
@@ -279,129 +262,105 @@ class EggLine(models.Model):
         return "\n".join(msg_lines)
     
 
-    def action_done(self):
+    def _get_egg_products(self):
+        """Stock product of each egg type of the lines, resolved in one query."""
+        egg_types = set(self.mapped('egg_type'))
+        products = self.env['product.product'].sudo().search([
+            ('product_tmpl_id.egg_type', 'in', list(egg_types)),
+        ])
+        product_by_type = {}
+        for product in products:
+            product_by_type.setdefault(product.product_tmpl_id.egg_type, product)
+        missing = egg_types - set(product_by_type)
+        if missing:
+            raise UserError(f"No product found for egg type {', '.join(sorted(missing))}")
+        return product_by_type
 
-        for line in self:
-            if line.state == 'done':
-                continue
-            production = line.production_id
-            if not production:
-                raise UserError("Production record not found!")
+    def action_done(self):
+        """Receive the lines into stock: one picking per production record,
+        with one move per egg type, validated once."""
+        lines = self.filtered(lambda l: l.state != 'done')
+        if not lines:
+            return
+        if not all(lines.mapped('production_id')):
+            raise UserError("Production record not found!")
+        for production in lines.production_id:
             if not production.picking_type_id:
                 raise UserError("Operation Type is required in Production Details.")
             if not production.location_id:
                 raise UserError("Source Location is required in Production Details.")
             if not production.location_dest_id:
                 raise UserError("Destination Location is required in Production Details.")
-            previous_state = line.state
-            line.state = 'done'
-            product = self.env['product.product'].sudo().search(
-                [('product_tmpl_id.egg_type', '=', line.egg_type)],
-                limit=1
-            )
-            if not product:
-                raise UserError(f"No product found for egg type {line.egg_type}")
-            
+
+        product_by_type = lines._get_egg_products()
+        for production, production_lines in lines.grouped('production_id').items():
+            done_date = max(production_lines.mapped(lambda l: l.date or fields.Datetime.now()))
+            qty_by_type = {}
+            for line in production_lines:
+                qty_by_type[line.egg_type] = qty_by_type.get(line.egg_type, 0) + line.value
 
             picking = self.env['stock.picking'].sudo().create({
                 'picking_type_id': production.picking_type_id.id,
                 'location_id': production.location_id.id,
                 'location_dest_id': production.location_dest_id.id,
                 'origin': production.name,
-                'scheduled_date': line.date,
-                'company_id': self.env.company.id,
-            })
-
-            move = self.env['stock.move'].sudo().create({
-                'name': f"Egg {line.egg_type}",
-                'product_id': product.id,
-                'product_uom_qty': line.value,
-                'product_uom': product.uom_id.id,
-                'picking_id': picking.id,
-                'location_id': production.location_id.id,
-                'location_dest_id': production.location_dest_id.id,
+                'farm_production_id': production.id,
+                'scheduled_date': done_date,
                 'company_id': self.env.company.id,
-                'date': line.date, 
+                'move_ids': [Command.create({
+                    'name': f"Egg {egg_type}",
+                    'product_id': product_by_type[egg_type].id,
+                    'product_uom_qty': qty,
+                    'product_uom': product_by_type[egg_type].uom_id.id,
+                    'location_id': production.location_id.id,
+                    'location_dest_id': production.location_dest_id.id,
+                    'company_id': self.env.company.id,
+                    'date': done_date,
+                }) for egg_type, qty in qty_by_type.items()],
             })
-
             picking.action_confirm()
-
-            self.env['stock.move.line'].sudo().create({
-                'move_id': move.id,
-                'picking_id': picking.id,
-                'product_id': product.id,
-                'product_uom_id': product.uom_id.id,
-                'qty_done': line.value,
-                'location_id': production.location_id.id,
-                'location_dest_id': production.location_dest_id.id,
-                'company_id': self.env.company.id,
-            })
-            
-            picking.with_context(force_period_date=line.date).button_validate()
-            picking.sudo().write({
-                'date_done': line.date,
-            })
-            
-            move.sudo().write({
-                'date': line.date,
-            })
-
-            msg = line._format_plain_message(
-                action="Egg Line Marked as Done",
-                previous_state=previous_state
+            for move in picking.move_ids:
+                move.quantity = move.product_uom_qty
+            picking.move_ids.picked = True
+            picking.with_context(force_period_date=done_date).button_validate()
+            picking.write({'date_done': done_date})
+            picking.move_ids.write({'date': done_date})
+
+            # the production gets the single summary below instead of per-line posts
+            production_lines.with_context(farm_skip_line_audit=True).write({'state': 'done'})
+            summary = "\n".join(
+                f"Egg Type        : {egg_type} x {qty}" for egg_type, qty in qty_by_type.items()
             )
-            production.message_post(body=msg)
-
+            production.message_post(body=(
+                f"Egg Lines Marked as Done\n"
+                f"Updated By      : {self.env.user.name}\n"
+                f"Picking         : {picking.name}\n{summary}"
+            ))
 
     def unlink(self):
-        for record in self:
-            if record.state == 'done':
-                raise UserError("You cannot delete an Egg Line marked as Done!")
-            if record.production_id:
-                msg = record._format_plain_message(action="Egg Line Deleted")
-                record.production_id.message_post(body=msg)
-        return super(EggLine, self).unlink()
+        if any(record.state == 'done' for record in self):
+            raise UserError("You cannot delete an Egg Line marked as Done!")
+        self._audit_post("Egg Line Deleted")
+        productions = self.production_id
+        res = super(EggLine, self).unlink()
+        productions._refresh_running_totals(productions._running_starts())
+        return res
 
     def write(self, vals):
-        tracked_fields = ['egg_type', 'value', 'date', 'state', 'product_id', 'short_description']
-        for line in self:
-            changes = []
-            previous_state = line.state
-            for field in tracked_fields:
-                if field in vals:
-                    old_val = line[field]
-                    new_val = vals[field]
-
-                    if isinstance(line._fields[field], fields.Many2one):
-                        comodel = line._fields[field].comodel_name
-                        new_val_display = self.env[comodel].browse(new_val).name if new_val else False
-                        old_val_display = old_val.name if old_val else False
-                    else:
-                        new_val_display = new_val
-                        old_val_display = old_val
-
-                    if old_val_display != new_val_display:
-                        changes.append(f"{field.replace('_', ' ').title()}: '{old_val_display}' → '{new_val_display}'")
-
-            res = super(EggLine, self).write(vals)
-
-            if changes and line.production_id:
-                msg = line._format_plain_message(
-                    action="Egg Line Updated",
-                    changes=changes,
-                    previous_state=previous_state
-                )
-                line.production_id.message_post(body=msg)
-
+        productions = self.production_id
+        res = super(EggLine, self).write(vals)
+        if {'egg_type', 'value', 'production_id'}.intersection(vals):
+            productions |= self.production_id
+            productions._refresh_running_totals(productions._running_starts())
         return res
 
-    @api.model
-    def create(self, vals):
-        record = super(EggLine, self).create(vals)
-        if record.production_id:
-            msg = record._format_plain_message(action="New Egg Line Created")
-            record.production_id.message_post(body=msg)
-        return record
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(EggLine, self).create(vals_list)
+        productions = records.production_id
+        productions._refresh_running_totals(productions._running_starts())
+        records._audit_post("New Egg Line Created")
+        return records
 
     @api.onchange('egg_type')
     def _onchange_egg_type(self):
@@ -68,3 +68,12 @@ class StockPickingType(models.Model):
                     raise ValidationError(
                         "Only ONE Picking Type can be marked as 'For Egg Production' per company."
                     )
+
+
+class StockPicking(models.Model):
+    _inherit = 'stock.picking'
+
+    farm_production_id = fields.Many2one(
+        'farm.production.details', string="Farm Production", readonly=True, copy=False, index='btree_not_null',
+        help="Production record whose egg lines were received by this picking.",
+    )
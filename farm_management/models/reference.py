@@ -0,0 +1,30 @@
+from odoo import models, fields, api
+
+
+class FarmReferenceMixin(models.AbstractModel):
+    """Number new records from an ``ir.sequence`` instead of the last record of the day.
+
+    References are drawn for a whole batch of records at once; each model
+    points ``_reference_code`` to its sequence and ``_reference_field`` to the
+    field to fill when it is left empty or set to "New".
+    """
+
+    _name = "farm.reference.mixin"
+    _description = "Farm Reference Numbering"
+
+    _reference_field = 'name'
+    _reference_code = None
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        field = self._reference_field
+        pending = [vals for vals in vals_list if vals.get(field, 'New') in ('New', False)]
+        if pending:
+            references = self.env['ir.sequence']._next_batch_by_code(
+                self._reference_code or f"{self._name}.reference",
+                len(pending),
+                sequence_date=fields.Date.context_today(self),
+            )
+            for vals, reference in zip(pending, references):
+                vals[field] = reference
+        return super().create(vals_list)
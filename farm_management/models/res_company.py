@@ -0,0 +1,11 @@
+from odoo import models, fields
+
+
+class ResCompany(models.Model):
+    _inherit = "res.company"
+
+    flock_digest_partner_ids = fields.Many2many(
+        'res.partner', 'res_company_flock_digest_partner_rel', 'company_id', 'partner_id',
+        string="Flock Digest Recipients",
+        help="Contacts receiving the daily flock summary email.",
+    )
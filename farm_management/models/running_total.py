@@ -0,0 +1,128 @@
+from datetime import date
+
+from odoo import models, api
+
+
+class FarmRunningTotalMixin(models.AbstractModel):
+    """Per-flock running totals kept on the rows of a daily model.
+
+    Inheriting models map stored total columns to the source columns they
+    accumulate (``_running_totals``). After a change only the rows of the
+    touched partitions dated on or after the earliest touched date are
+    rewritten, in a single windowed UPDATE that starts from the last
+    untouched row, so appending today's entry costs the same whatever the
+    length of the history.
+    """
+
+    _name = "farm.running.total.mixin"
+    _description = "Per-flock Running Total"
+
+    # columns splitting the totals, the date they run along, and extra
+    # tie-breakers; without tie-breakers rows of the same day share a total
+    _running_partition = ('flock_id',)
+    _running_date = 'date'
+    _running_order = ('id',)
+    # {total column: source column}
+    _running_totals = {}
+
+    def _running_trigger_fields(self):
+        return set(self._running_partition) | {self._running_date} | set(self._running_totals.values())
+
+    def _running_key(self, record):
+        key = tuple(record[fname] for fname in self._running_partition)
+        return tuple(value.id if isinstance(value, models.BaseModel) else value for value in key)
+
+    def _running_starts(self, starts=None):
+        """Merge the (partition, earliest date) pairs of ``self`` into ``starts``."""
+        starts = dict(starts or {})
+        for record in self:
+            key = self._running_key(record)
+            day = record[self._running_date]
+            if not day or not all(key):
+                continue
+            starts[key] = min(starts[key], day) if key in starts else day
+        return starts
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._refresh_running_totals(records._running_starts())
+        return records
+
+    def write(self, vals):
+        if not self._running_totals or not self._running_trigger_fields().intersection(vals):
+            return super().write(vals)
+        starts = self._running_starts()
+        res = super().write(vals)
+        self._refresh_running_totals(self._running_starts(starts))
+        return res
+
+    def unlink(self):
+        starts = self._running_starts()
+        model = self.browse()
+        res = super().unlink()
+        model._refresh_running_totals(starts)
+        return res
+
+    @api.model
+    def _rebuild_running_totals(self, flocks=None):
+        """Recompute every running total, or only those of ``flocks``, in one pass."""
+        domain = [('flock_id', 'in', flocks.ids)] if flocks is not None else []
+        groups = self._read_group(domain, list(self._running_partition))
+        keys = (
+            tuple(value.id if isinstance(value, models.BaseModel) else value for value in group)
+            for group in groups
+        )
+        starts = {key: date.min for key in keys if all(key)}
+        self._refresh_running_totals(starts)
+
+    @api.model
+    def _refresh_running_totals(self, starts):
+        """Rewrite the running totals of each partition from its start date on.
+
+        :param starts: ``{partition values: first date to rewrite}``
+        """
+        if not starts or not self._running_totals:
+            return
+        self.flush_model(list(self._running_trigger_fields()))
+
+        partition = list(self._running_partition)
+        order = [self._running_date] + list(self._running_order)
+        totals = list(self._running_totals)
+        array_types = [
+            'int4' if self._fields[fname].type == 'many2one' else 'varchar'
+            for fname in partition
+        ]
+
+        keys = list(starts)
+        params = [[key[i] for key in keys] for i in range(len(partition))]
+        params.append([starts[key] for key in keys])
+
+        part_cols = ", ".join(f"r.{col}" for col in partition)
+        join_cond = " AND ".join(f"r.{col} = s.{col}" for col in partition)
+        self.env.cr.execute(f"""
+            WITH s AS (
+                SELECT * FROM unnest({", ".join(f"%s::{t}[]" for t in array_types)}, %s::date[])
+                    AS s({", ".join(partition)}, start)
+            ),
+            base AS (
+                SELECT DISTINCT ON ({part_cols}) {part_cols}, {", ".join(f"r.{col}" for col in totals)}
+                  FROM {self._table} r JOIN s ON {join_cond}
+                 WHERE r.{self._running_date} < s.start
+                 ORDER BY {part_cols}, {", ".join(f"r.{col} DESC" for col in order)}
+            ),
+            win AS (
+                SELECT r.id, {part_cols},
+                       {", ".join(
+                           f"SUM(COALESCE(r.{src}, 0)) OVER w AS {col}"
+                           for col, src in self._running_totals.items())}
+                  FROM {self._table} r JOIN s ON {join_cond}
+                 WHERE r.{self._running_date} >= s.start
+                WINDOW w AS (PARTITION BY {part_cols} ORDER BY {", ".join(f"r.{col}" for col in order)})
+            )
+            UPDATE {self._table} t
+               SET {", ".join(f"{col} = win.{col} + COALESCE(base.{col}, 0)" for col in totals)}
+              FROM win LEFT JOIN base ON {" AND ".join(f"base.{col} = win.{col}" for col in partition)}
+             WHERE t.id = win.id
+        """, params)
+        self.invalidate_model(totals)
@@ -1,9 +1,7 @@
-import requests
-from datetime import date
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import UserError
 from odoo.exceptions import ValidationError, UserError
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import json 
 _logger = logging.getLogger(__name__)
@@ -17,19 +15,75 @@ class WeatherData(models.Model):
 
     date = fields.Date(string="Date", default=fields.Date.today)
     api_response = fields.Json(string="Full API Response", readonly=True)
+    location = fields.Char(string="Location", readonly=True)
+    utc_offset = fields.Float(string="UTC Offset", readonly=True)
+
+    @api.model
+    def _store_api_response(self, data, location=None):
+        """Keep a fetched API response and bulk-store its hourly series in ``weather.hourly``."""
+        location = self.env['weather.hourly']._store_response(data, location)
+        return self.create({
+            'date': fields.Date.today(),
+            'api_response': data,
+            'location': location,
+            'utc_offset': data.get("metadata", {}).get("utc_timeoffset") or 0.0,
+        })
+
+    @api.model
+    def _backfill_hourly(self):
+        """Move the hourly series of responses stored before ``weather.hourly`` existed."""
+        for record in self.search([('location', '=', False)]):
+            data = record.api_response or {}
+            record.write({
+                'location': self.env['weather.hourly']._store_response(data),
+                'utc_offset': data.get("metadata", {}).get("utc_timeoffset") or 0.0,
+            })
+        return True
 
     @api.model
     def remove_old_data(self):
-        today = date.today()
-        old_records = self.search([('date', '!=', today)])
-        if old_records:
-            old_records.unlink() 
+        """Drop the raw responses superseded by a newer one of the same location.
+
+        The latest response of each location is kept for the dashboard; the
+        hourly history stays in ``weather.hourly``.
+        """
+        latest = set()
+        superseded = self.browse()
+        for record in self.search([], order='create_date desc, id desc'):
+            if record.location in latest:
+                superseded |= record
+            latest.add(record.location)
+        superseded.unlink()
         return True
 
+    @api.model
+    def _get_dashboard_version(self):
+        """Return ``(id, compact write_date)`` of the latest weather record, or None."""
+        latest = self.search_read([], ['write_date'], order='create_date desc, id desc', limit=1)
+        if not latest:
+            return None
+        return latest[0]['id'], latest[0]['write_date'].strftime('%Y%m%d%H%M%S%f')
+
+    @tools.ormcache('record_id', 'write_date')
+    def _get_dashboard_payload(self, record_id, write_date):
+        """Serialize the hourly series of a weather record for the dashboard.
+
+        Cached on the record version, so polling dashboards only pay for the
+        JSON once per API refresh.
+        """
+        record = self.browse(record_id)
+        start = datetime.combine(record.date, datetime.min.time()) - timedelta(hours=record.utc_offset)
+        return json.dumps({
+            'success': True,
+            'data': {
+                'data_1h': self.env['weather.hourly']._get_series(record.location, start),
+            },
+        })
+
 
 class TemperatureDetailsData(models.Model):
 
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
     _name = 'temperature.details.data'
     _description = "Live Temperature Data"
     _order = "date desc"
@@ -88,25 +142,6 @@ class TemperatureDetailsData(models.Model):
         string="Status", default='draft', tracking=True
     )
 
-    @api.model
-    def create(self, vals):
-        if not vals.get('name') or vals.get('name') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search([('name', 'like', f'S/M/{today_str}/%')], order='id desc', limit=1)
-            if last_record and last_record.name:
-                try:
-                    last_seq = int(last_record.name.split('/')[-1])
-                    next_seq = str(last_seq + 1).zfill(5)
-                except ValueError:
-                    next_seq = '00001'
-            else:
-                next_seq = '00001'
-
-            vals['name'] = f"S/M/{today_str}/{next_seq}"
-
-        record = super(TemperatureDetailsData, self).create(vals)
-        return record
-    
 
     @api.onchange("flock_id")
     def get_flock_data(self):
@@ -120,138 +155,91 @@ class TemperatureDetailsData(models.Model):
 
         if not self.flock_id:
           raise UserError("Operation cannot be performed: Flock is not assigned. Please provide a Flock.")
-        existing = self.env['weather.data'].search([])
-
-        if not existing:
-
-            url = "https://my.meteoblue.com/packages/basic-1h_basic-day"
-            params = {
-                "lat": 23.8041,
-                "lon": 90.4152,
-                "apikey": "XzAjEYK052Sfonue"
+        Provider = self.env['weather.provider']
+        record = Provider._get_cached()
+        if not record:
+            # never wait on the provider here: serve the last response and let the cron refresh it
+            Provider._trigger_refresh()
+            record = self.env['weather.data'].search([], order='create_date desc, id desc', limit=1)
+
+        if not record:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': "Weather",
+                    'message': "Weather data is being fetched in the background, please try again in a moment.",
+                    'type': 'info',
+                    'sticky': False,
+                },
             }
 
-            response = requests.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            self.env['weather.data'].create({
-                'date': fields.Date.today(),
-                'api_response': data
-            })
+        try:
+            # today's local hours of the location the response was stored under
+            today = fields.Date.context_today(self)
+            day_start = datetime.combine(today, datetime.min.time()) - timedelta(hours=record.utc_offset)
+            data_1h = self.env['weather.hourly']._get_series(record.location, day_start, day_start + timedelta(days=1))
+            hours = [
+                (time, temp, wind)
+                for time, temp, wind in zip(data_1h['time'], data_1h['temperature'], data_1h['windspeed'])
+                if temp is not None
+            ]
+            if not hours:
+                raise UserError("No hourly weather data for today yet.")
+            now_local = (fields.Datetime.now() + timedelta(hours=record.utc_offset)).strftime("%Y-%m-%d %H:%M")
+            temps = [temp for _time, temp, _wind in hours]
+            winds = [wind for _time, _temp, wind in hours if wind is not None] or [0.0]
+            self.temp_instant = next((temp for time, temp, _wind in reversed(hours) if time <= now_local), temps[0])
+            self.temp_max = max(temps)
+            self.temp_min = min(temps)
+            self.wind_max = max(winds)
+            self.wind_min = min(winds)
+            self.date = today
             
-        elif existing:
-            try:
-                record = self.env['weather.data'].search([], order='create_date desc', limit=1)
-                data = record.api_response
+            self.env["farm.boy.request.data"].create({
+                "flock_id": self.flock_id.id if self.flock_id else False,
+                "date": today,
+                "bird_type": self.birds_type,
+                "age_in_weeks": self.age_in_weeks,
+                "current_birds": self.current_birds,
+                "temp_max": self.temp_max,
+                "temp_min": self.temp_min,
+                "temp_instant": self.temp_instant
+            })
+
+            for record in self:
+                record.suggested_medicine_line_ids = [(5, 0, 0)]
+                age = record.age_in_days or 0
+                tmin = record.temp_min or 0
+                tmax = record.temp_max or 0
+                medicine_lines_dict = self.env['add.medicine.by.live.temperature']._match_medicines(
+                    age, tmin, tmax, record.current_birds
+                )
+                lines_to_add = []
                 
-                metadata = data.get("metadata", {})
-                units = data.get("units", {})
-                today_str = date.today().isoformat()
-                data_day = data.get("data_day", {})
-                dates = data_day.get("time", [])
-                temp_instant_list = data_day.get("temperature_instant", [])
-                temp_max_list = data_day.get("temperature_max", [])
-                temp_min_list = data_day.get("temperature_min", [])
-                wind_min_list = data_day.get("windspeed_min", [])
-                wind_max_list = data_day.get("windspeed_max", [])
-                time_zone = metadata.get("timezone_abbrevation")
-                update_model_run_time = metadata.get("modelrun_updatetime_utc")
-                pressure_unit = units.get("pressure")
-                config_param = self.env['ir.config_parameter'].sudo()
-                config_param.set_param('weather.raw.data', json.dumps(data))
-                data_1h = data.get("data_1h", {})
-                times = data_1h.get("time", [])
-                temps = data_1h.get("temperature",[])
-                winds = data_1h.get("windspeed", [])
-                rains = data_1h.get("precipitation", [])
-                self.timezone = time_zone 
-                self.pressure_unit = pressure_unit
-                self.modelrun_updatetime_utc = update_model_run_time
-                if not dates:
-                    raise UserError("No daily data returned from API.")
-                daily_record = self.search([('date', '=', today_str)], limit=1)
-                self.temp_instant = temp_instant_list[0]
-                self.temp_max = temp_max_list[0]
-                self.temp_min = temp_min_list[0]
-                self.wind_max = wind_max_list[0]
-                self.wind_min = wind_min_list[0]
-                self.date = dates[0]
+                for pid, total_qty in medicine_lines_dict.items():
+                    product = self.env['product.product'].browse(pid)
+                    lines_to_add.append((0, 0, {
+                        'product_id': pid,
+                        'consume_quantity': total_qty,
+                        'total_quantity':product.qty_available,
+                        'flock_id': record.flock_id.id,
+                        'date': record.date,
+                    }))
+
+                record.suggested_medicine_line_ids = lines_to_add
                 
-                self.env["farm.boy.request.data"].create({
-                    "flock_id": self.flock_id.id if self.flock_id else False,
-                    "date": dates[0],
-                    "bird_type": self.birds_type,
-                    "age_in_weeks": self.age_in_weeks,
-                    "current_birds": self.current_birds,
-                    "temp_max": temp_max_list[0],
-                    "temp_min": temp_min_list[0],
-                    "temp_instant": temp_instant_list[0]
-                })
-
-                for record in self:
-                    record.suggested_medicine_line_ids = [(5, 0, 0)]
-                    medicine_lines_dict = {}
-                    age = record.age_in_days or 0
-                    tmin = record.temp_min or 0
-                    tmax = record.temp_max or 0
-                    medicine_records = self.env['add.medicine.by.live.temperature'].search([])
-                    matched_medicines = self.env['add.medicine.by.live.temperature']
-                    for med in medicine_records:
-                        if med.state != 'done':  
-                            continue
-                        ok = False
-                        if med.selection_type == 'age':
-                            if med.min_age is not None and med.max_age is not None:
-                                if med.min_age <= age <= med.max_age:
-                                    ok = True
-                        elif med.selection_type == 'temp':
-                            if med.min_temp is not None and med.max_temp is not None:
-                                if med.min_temp <= tmax and med.max_temp >= tmin:
-                                    ok = True
-                        elif med.selection_type == 'age_temp':
-                            age_ok = med.min_age is not None and med.max_age is not None and med.min_age <= age <= med.max_age
-                            temp_ok = med.min_temp is not None and med.max_temp is not None and med.min_temp <= tmax and med.max_temp >= tmin
-                            if age_ok and temp_ok:
-                                ok = True
-                        if ok:
-                            matched_medicines |= med
-
-                    for med in matched_medicines:
-                        for line in med.medicine_line_ids:
-                            pid = line.product_id.id
-                            qty = (line.dose_per_water_liter or 0) * (record.current_birds or 0)
-                            if qty <= 0:
-                                continue
-                            if pid in medicine_lines_dict:
-                                medicine_lines_dict[pid] += qty
-                            else:
-                                medicine_lines_dict[pid] = qty
-                    lines_to_add = []
-                    
-                    for pid, total_qty in medicine_lines_dict.items():
-                        product = self.env['product.product'].browse(pid)
-                        lines_to_add.append((0, 0, {
-                            'product_id': pid,
-                            'consume_quantity': total_qty,
-                            'total_quantity':product.qty_available,
-                            'flock_id': record.flock_id.id,
-                            'date': record.date,
-                        }))
-
-                    record.suggested_medicine_line_ids = lines_to_add
-                    
-                return {
-                    'type': 'ir.actions.act_window',
-                    'name': 'Live Temperature Data',
-                    'view_mode': 'form',
-                    'res_model': 'temperature.details.data',
-                    'res_id': self.id,
-                    'target': 'current',
-                    "data": data,
-                }
-            except Exception as e:
-                _logger.error("Error fetching live temperature: %s", e)
-                raise UserError(f"Error fetching live temperature: {e}")
+            return {
+                'type': 'ir.actions.act_window',
+                'name': 'Live Temperature Data',
+                'view_mode': 'form',
+                'res_model': 'temperature.details.data',
+                'res_id': self.id,
+                'target': 'current',
+            }
+        except Exception as e:
+            _logger.error("Error fetching live temperature: %s", e)
+            raise UserError(f"Error fetching live temperature: {e}")
             
 
     def action_view_dashboard(self):
@@ -17,7 +17,8 @@ class VentilationFans(models.Model):
     """
     _name = "ventilation.fans"
     _description = "Ventilation Fans Details"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
+    _reference_field = 'reference'
     _rec_name = 'name'
     
 
@@ -54,19 +55,3 @@ class VentilationFans(models.Model):
         if self.state == "done":
             return
         self.state = 'done'
-
-    @api.model
-    def create(self, vals):
-        if vals.get('reference', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('reference', 'like', f'VF/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.reference.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['reference'] = f"VF/{today_str}/{next_seq}"
-        return super(VentilationFans, self).create(vals)
\ No newline at end of file
@@ -6,7 +6,8 @@ import logging
 class VentilationFarmDetails(models.Model):
     _name = "ventilation.farm.details"
     _description = "Ventilation Farm Details"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
+    _reference_field = 'reference'
     _rec_name = 'reference'
     
 
@@ -76,36 +77,21 @@ class VentilationFarmDetails(models.Model):
             return
         self.state = 'draft'
 
-    @api.model
-    def create(self, vals):
-        flock_id = vals.get('flock_id')
-        target_temp = vals.get('target_temperature')
-
-        if flock_id and target_temp:
-            existing = self.search([
-                ('flock_id', '=', flock_id),
-                ('target_temperature', '=', target_temp)
-            ], limit=1)
-            if existing:
-                raise UserError("This target temperature already exists for this flock!")
-
-        if vals.get('reference', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-
-            last_record = self.search(
-                [('reference', 'like', f'Fv/{today_str}/%')],
-                order='id desc', limit=1
-            )
-
-            if last_record:
-                last_seq = int(last_record.reference.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-
-            vals['reference'] = f"Fv/{next_seq}"
-
-        return super(VentilationFarmDetails, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            flock_id = vals.get('flock_id')
+            target_temp = vals.get('target_temperature')
+
+            if flock_id and target_temp:
+                existing = self.search([
+                    ('flock_id', '=', flock_id),
+                    ('target_temperature', '=', target_temp)
+                ], limit=1)
+                if existing:
+                    raise UserError("This target temperature already exists for this flock!")
+
+        return super(VentilationFarmDetails, self).create(vals_list)
 
 
 class FarmVentilationLevelLine(models.Model):
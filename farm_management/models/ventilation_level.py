@@ -12,7 +12,8 @@ class VentilationLevel(models.Model):
     """
     _name = "ventilation.level"
     _description = "Ventilation Level Details"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
+    _reference_field = 'reference'
     
   
     reference = fields.Char(string="Reference", tracking=True)
@@ -40,19 +41,3 @@ class VentilationLevel(models.Model):
         if self.state == "done":
             return
         self.state = 'done'
-
-    @api.model
-    def create(self, vals):
-        if vals.get('reference', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('reference', 'like', f'VL/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.reference.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['reference'] = f"VL/{today_str}/{next_seq}"
-        return super(VentilationLevel, self).create(vals)
\ No newline at end of file
@@ -1,12 +1,28 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import UserError
 from datetime import date
 from datetime import datetime
+
+# liters provided per intake type
+CATEGORY_LITERS = {
+    'half_day': 3000,
+    'one_time': 3000,
+    'afternoon': 3000,
+    'full_day': 3000,
+}
+
+
 class FarmWaterIntake(models.Model):
 
     _name = "farm.water.intake"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'farm.running.total.mixin', 'farm.daily.kpi.source',
+                'mail.thread', 'mail.activity.mixin']
     _description = "Daily Water Intake per Flock/Bird"
+    _kpi_trigger_fields = ('providing_category', 'water_lit', 'current_birds')
+
+    # per-flock running water, rows of the same day share their total
+    _running_order = ()
+    _running_totals = {'cumulative_water': 'water_lit'}
     
 
     date = fields.Date(string="Date", default=fields.Date.context_today)
@@ -28,65 +44,40 @@ class FarmWaterIntake(models.Model):
     current_age_display = fields.Char(string="Current Age in Weeks", tracking=True)
     current_age_days = fields.Integer(string="Current Age in Days", tracking=True)
     name = fields.Char(string="Reference", default="New", readonly=True ,tracking =True)
-    water_lit = fields.Float(string="Water intake (Liters)",compute="_compute_water_for_total_birds",inverse="_set_water_lit", required=True ,tracking =True)
-    water_ml_per_bird = fields.Float(string="Water (ml/bird/day)", compute="_compute_water_ml_per_bird",inverse="_set_water_lit",store=True ,tracking =True)
+    water_lit = fields.Float(string="Water intake (Liters)", compute="_compute_water_for_total_birds", store=True, readonly=False, required=True, tracking=True)
+    water_ml_per_bird = fields.Float(string="Water (ml/bird/day)", compute="_compute_water_ml_per_bird", store=True, tracking=True)
     state = fields.Selection([('draft', 'Draft'), ('done', 'Confirm')], default='draft', string="Status",tracking=True)
-    cumulative_water = fields.Float(
-    string="Cumulative Water Intake (Liters)",
-    compute="_compute_cumulative_water",
-    store=True,
-    readonly=True,
-    tracking=True
-     )
+    cumulative_water = fields.Float(string="Cumulative Water Intake (Liters)", readonly=True)
     user_id = fields.Many2one('res.users',string='Farm Boy',help="Wakter intake",default=lambda self: self.env.user,tracking=True)
     note_html = fields.Html(string="Notes (HTML)")
 
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('name', 'like', f'W/I/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.name.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['name'] = f"W/I/{today_str}"
-        return super(FarmWaterIntake, self).create(vals)
 
+    def init(self):
+        # weekly and monthly rollups group the flock's rows by date
+        tools.create_index(self._cr, 'farm_water_intake_flock_date_idx', self._table, ['flock_id', 'date'])
+
+    def _running_trigger_fields(self):
+        # the liters follow the intake type
+        return super()._running_trigger_fields() | {'providing_category'}
 
-    @api.onchange('water_lit')
+    @api.depends('water_lit', 'flock_id')
     def _compute_water_ml_per_bird(self):
-            if self.flock_id and self.flock_id.total_qty:
-                self.water_ml_per_bird = round((self.water_lit * 1000) / self.flock_id.total_qty, 2)
-            else:
-                self.water_ml_per_bird = 0
-    
-    @api.onchange('providing_category')
-    def _compute_water_for_total_birds(self):
         for record in self:
-            if record.providing_category == 'half_day':
-                record.water_lit = 3000
-            elif record.providing_category == 'one_time':
-                record.water_lit = 3000
-            elif record.providing_category == 'full_day':
-                record.water_lit = 3000
-            elif record.providing_category == 'afternoon':
-                record.water_lit = 3000
+            if record.flock_id and record.flock_id.total_qty:
+                record.water_ml_per_bird = round((record.water_lit * 1000) / record.flock_id.total_qty, 2)
             else:
-                record.water_lit = 0
-        
-    def _set_water_lit(self):
+                record.water_ml_per_bird = 0
+
+    @api.depends('providing_category')
+    def _compute_water_for_total_birds(self):
         for record in self:
-            record = record.with_context(manual_entry=True)
+            record.water_lit = CATEGORY_LITERS.get(record.providing_category, 0)
 
     def action_confirm(self):
         if self.state =="done":
             return 
         self.state = "done"
+        self.env['farm.flock.anomaly.state']._trigger_detection()
 
 
     def action_draft(self):
@@ -108,17 +99,3 @@ class FarmWaterIntake(models.Model):
         self.bird_type = self.flock_id.bird_type
         self.current_age_display = self.flock_id.current_age_display
         self.current_age_days = self.flock_id.current_age_in_days
-    
-    @api.depends('water_lit', 'flock_id', 'date')
-
-    def _compute_cumulative_water(self):
-        for record in self:
-            if record.flock_id and record.date:
-                previous_records = self.search([
-                    ('flock_id', '=', record.flock_id.id),
-                    ('date', '<=', record.date)
-                ])
-
-                record.cumulative_water = sum(previous_records.mapped('water_lit'))
-            else:
-                record.cumulative_water = 0
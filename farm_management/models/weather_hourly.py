@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api
+
+
+class WeatherHourly(models.Model):
+    """One row per location and hour, kept for history and range queries."""
+
+    _name = "weather.hourly"
+    _description = "Hourly Weather"
+    _order = "timestamp"
+    _rec_name = "timestamp"
+
+    location = fields.Char(string="Location", required=True, index=True)
+    timestamp = fields.Datetime(string="Time (UTC)", required=True, index=True)
+    utc_offset = fields.Float(string="UTC Offset")
+    temperature = fields.Float(string="Temperature (°C)")
+    windspeed = fields.Float(string="Wind Speed (km/h)")
+    precipitation = fields.Float(string="Precipitation (mm)")
+
+    _sql_constraints = [
+        ('location_timestamp_uniq', 'unique(location, timestamp)',
+         "Only one weather row per location and hour is allowed."),
+    ]
+
+    @api.model
+    def _location_key(self, data):
+        metadata = data.get("metadata", {})
+        return "%.4f,%.4f" % (metadata.get("latitude") or 0.0, metadata.get("longitude") or 0.0)
+
+    @api.model
+    def _store_response(self, data, location=None):
+        """Upsert the ``data_1h`` series of a meteoblue response in one statement.
+
+        :returns: the location key the rows were stored under
+        """
+        location = location or self._location_key(data)
+        offset = data.get("metadata", {}).get("utc_timeoffset") or 0.0
+        data_1h = data.get("data_1h", {})
+        times = data_1h.get("time", [])
+        if not times:
+            return location
+
+        def series(key):
+            values = list(data_1h.get(key, []))
+            return values + [None] * (len(times) - len(values))
+
+        timestamps = [
+            datetime.strptime(value, "%Y-%m-%d %H:%M") - timedelta(hours=offset)
+            for value in times
+        ]
+        self.env.cr.execute("""
+            INSERT INTO weather_hourly (location, timestamp, utc_offset, temperature, windspeed, precipitation,
+                                        create_uid, create_date, write_uid, write_date)
+            SELECT %s, t.timestamp, %s, t.temperature, t.windspeed, t.precipitation,
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%s::timestamp[], %s::float8[], %s::float8[], %s::float8[])
+                AS t(timestamp, temperature, windspeed, precipitation)
+            ON CONFLICT (location, timestamp) DO UPDATE
+               SET utc_offset = EXCLUDED.utc_offset,
+                   temperature = EXCLUDED.temperature,
+                   windspeed = EXCLUDED.windspeed,
+                   precipitation = EXCLUDED.precipitation,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, [
+            location, offset, self.env.uid, self.env.uid,
+            timestamps, series("temperature"), series("windspeed"), series("precipitation"),
+        ])
+        self.invalidate_model()
+        return location
+
+    @api.model
+    def _get_series(self, location, start, end=None):
+        """Return the hourly rows of ``location`` from ``start`` (UTC) on as ``data_1h`` lists.
+
+        Times are given back in the location's local time, like the API does.
+        """
+        domain = [('location', '=', location), ('timestamp', '>=', start)]
+        if end:
+            domain.append(('timestamp', '<', end))
+        rows = self.search_read(
+            domain, ['timestamp', 'utc_offset', 'temperature', 'windspeed', 'precipitation'],
+            order='timestamp',
+        )
+        return {
+            'time': [
+                (row['timestamp'] + timedelta(hours=row['utc_offset'])).strftime("%Y-%m-%d %H:%M")
+                for row in rows
+            ],
+            'temperature': [row['temperature'] for row in rows],
+            'windspeed': [row['windspeed'] for row in rows],
+            'precipitation': [row['precipitation'] for row in rows],
+        }
@@ -0,0 +1,123 @@
+import json
+import logging
+from datetime import date, timedelta
+
+import requests
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import file_path
+
+_logger = logging.getLogger(__name__)
+
+PARAM_PREFIX = "farm_management.weather_"
+DEFAULT_TTL_MINUTES = 60
+
+
+class WeatherProvider(models.AbstractModel):
+    """Fetch weather responses from the configured provider, off the user's transaction.
+
+    Providers are plain ``_fetch_<name>(config)`` methods returning a response
+    in the meteoblue ``basic-1h_basic-day`` layout; the cron keeps one fresh
+    ``weather.data`` per location and user actions only ever read it.
+    """
+
+    _name = "weather.provider"
+    _description = "Weather Provider"
+
+    @api.model
+    def _get_config(self):
+        params = self.env['ir.config_parameter'].sudo()
+
+        def param(key, default=None):
+            return params.get_param(PARAM_PREFIX + key, default)
+
+        latitude = float(param("latitude", 23.8041))
+        longitude = float(param("longitude", 90.4152))
+        return {
+            'provider': param("provider", "meteoblue"),
+            'latitude': latitude,
+            'longitude': longitude,
+            'location': "%.4f,%.4f" % (latitude, longitude),
+            'apikey': param("apikey"),
+            'stub_file': param("stub_file"),
+            'ttl': int(param("ttl_minutes", DEFAULT_TTL_MINUTES)),
+        }
+
+    @api.model
+    def _get_cached(self, config=None):
+        """Return the latest stored response of the configured location if within its TTL."""
+        config = config or self._get_config()
+        limit = fields.Datetime.now() - timedelta(minutes=config['ttl'])
+        return self.env['weather.data'].search([
+            ('location', '=', config['location']),
+            ('create_date', '>=', limit),
+        ], order='create_date desc, id desc', limit=1)
+
+    @api.model
+    def _refresh(self, force=False):
+        """Fetch and store a new response unless the cached one is still fresh."""
+        config = self._get_config()
+        if not force and self._get_cached(config):
+            return False
+        if config['provider'] == 'meteoblue' and not config['apikey']:
+            _logger.warning("Weather refresh skipped: set %sapikey to fetch from meteoblue.", PARAM_PREFIX)
+            return False
+        fetch = getattr(self, '_fetch_%s' % config['provider'], None)
+        if not fetch:
+            raise UserError(f"Unknown weather provider '{config['provider']}'.")
+        data = fetch(config)
+        self.env['weather.data']._store_api_response(data, location=config['location'])
+        return True
+
+    @api.model
+    def _cron_refresh_weather(self):
+        try:
+            stored = self._refresh()
+        except (requests.RequestException, UserError, ValueError) as e:
+            _logger.warning("Weather refresh failed: %s", e)
+            return
+        if stored:
+            self.env['weather.data'].remove_old_data()
+
+    @api.model
+    def _trigger_refresh(self):
+        """Ask the refresh cron to run as soon as possible."""
+        self.env.ref('farm_management.ir_cron_refresh_weather')._trigger()
+
+    @api.model
+    def _fetch_meteoblue(self, config):
+        if not config['apikey']:
+            raise UserError("The meteoblue API key is not configured.")
+        response = requests.get(
+            "https://my.meteoblue.com/packages/basic-1h_basic-day",
+            params={
+                "lat": config['latitude'],
+                "lon": config['longitude'],
+                "apikey": config['apikey'],
+            },
+            timeout=15,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @api.model
+    def _fetch_file(self, config):
+        """Offline provider: replay a stored response, shifted so it starts today."""
+        path = config['stub_file'] or file_path('farm_management/data/weather_stub.json')
+        with open(path, encoding='utf-8') as stub:
+            data = json.load(stub)
+
+        metadata = data.setdefault("metadata", {})
+        metadata.update(latitude=config['latitude'], longitude=config['longitude'])
+        today = date.today()
+        for series in (data.get("data_1h", {}), data.get("data_day", {})):
+            times = series.get("time", [])
+            if not times:
+                continue
+            shift = today - date.fromisoformat(times[0][:10])
+            series["time"] = [
+                (date.fromisoformat(value[:10]) + shift).isoformat() + value[10:]
+                for value in times
+            ]
+        return data
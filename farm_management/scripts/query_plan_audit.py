@@ -0,0 +1,129 @@
+"""Check that the hot farm_management queries use their indexes.
+
+Fills the daily tables with a generated dataset, runs EXPLAIN on the queries
+the running totals, KPI refresh and duplicate checks issue, and fails when
+one of them falls back to a sequential scan of a daily table. Everything is
+rolled back afterwards.
+
+Run it from an Odoo shell on a database with farm_management installed::
+
+    odoo-bin shell -d <database> --no-http < farm_management/scripts/query_plan_audit.py
+"""
+import logging
+import sys
+
+_logger = logging.getLogger("farm_management.query_plan_audit")
+
+FLOCKS = 40
+DAYS = 500
+
+# tables whose sequential scans count as a regression
+AUDITED_TABLES = {
+    'farm_mortality_details', 'farm_mortality_breakdown', 'farm_production_details', 'farm_egg_line',
+    'feed_details', 'farm_water_intake', 'flock_body_weight', 'farm_temperature',
+    'farm_boy_request_data', 'farmboy_request_add_line', 'farm_flock_daily_kpi',
+}
+
+# (label, query) run with %(flock)s, %(day)s and %(ids)s bound to generated rows
+HOT_QUERIES = [
+    ("production running totals", "SELECT id FROM farm_production_details WHERE flock_id = %(flock)s AND date >= %(day)s"),
+    ("production of a day", "SELECT SUM(total_egg) FROM farm_production_details WHERE flock_id = %(flock)s AND date = %(day)s"),
+    ("egg lines of productions", "SELECT id FROM farm_egg_line WHERE production_id = ANY(%(ids)s)"),
+    ("mortality of a day", "SELECT id FROM farm_mortality_details WHERE flock_id = %(flock)s AND date = %(day)s"),
+    ("mortality breakdowns", "SELECT SUM(count) FROM farm_mortality_breakdown WHERE mortality_id = ANY(%(ids)s)"),
+    ("feed running totals", "SELECT id FROM feed_details WHERE flock_id = %(flock)s AND datetime >= %(day)s"),
+    ("feed duplicate check",
+     "SELECT id FROM feed_details WHERE flock_id = %(flock)s AND datetime = %(day)s AND feed_time = 'morning' LIMIT 1"),
+    ("water running totals", "SELECT id FROM farm_water_intake WHERE flock_id = %(flock)s AND date >= %(day)s"),
+    ("body weight of a day", "SELECT AVG(act_weight) FROM flock_body_weight WHERE flock_id = %(flock)s AND date = %(day)s"),
+    ("temperature of a day", "SELECT id FROM farm_temperature WHERE flock_id = %(flock)s AND date = %(day)s"),
+    ("requests of a day", "SELECT id FROM farm_boy_request_data WHERE flock_id = %(flock)s AND date = %(day)s"),
+    ("request lines", "SELECT SUM(total_cost) FROM farmboy_request_add_line WHERE request_id = ANY(%(ids)s)"),
+    ("KPI rows of a flock", "SELECT id FROM farm_flock_daily_kpi WHERE flock_id = %(flock)s AND date >= %(day)s"),
+]
+
+
+def _generate(cr):
+    """Insert FLOCKS flocks with DAYS days of records each; return the flock ids."""
+    cr.execute("SELECT id FROM stock_picking_type ORDER BY id LIMIT 1")
+    picking_type_id = cr.fetchone()[0]
+    cr.execute("SELECT id FROM stock_location ORDER BY id LIMIT 1")
+    location_id = cr.fetchone()[0]
+
+    cr.execute("INSERT INTO farm_layer_flock (name) SELECT 'Audit ' || g FROM generate_series(1, %s) g RETURNING id",
+               [FLOCKS])
+    flock_ids = [row[0] for row in cr.fetchall()]
+    days = "SELECT f, CURRENT_DATE - d AS day FROM unnest(%(flocks)s::int4[]) f, generate_series(1, %(days)s) d"
+    params = {'flocks': flock_ids, 'days': DAYS, 'picking_type': picking_type_id, 'location': location_id}
+    cr.execute(f"""
+        INSERT INTO farm_production_details (flock_id, date, total_egg, picking_type_id, location_id, location_dest_id)
+        SELECT f, day, 900, %(picking_type)s, %(location)s, %(location)s FROM ({days}) s;
+        INSERT INTO farm_egg_line (production_id, egg_type, value)
+        SELECT p.id, t, 100 FROM farm_production_details p, unnest(ARRAY['small', 'medium', 'high']) t
+         WHERE p.flock_id = ANY(%(flocks)s);
+        INSERT INTO farm_mortality_details (flock_id, date) SELECT f, day FROM ({days}) s;
+        INSERT INTO farm_mortality_breakdown (mortality_id, type, count, date)
+        SELECT m.id, 'normal', 2, m.date FROM farm_mortality_details m WHERE m.flock_id = ANY(%(flocks)s);
+        INSERT INTO feed_details (flock_id, datetime, feed_time, feed_kg)
+        SELECT f, day, t, 50 FROM ({days}) s, unnest(ARRAY['morning', 'afternoon']) t;
+        INSERT INTO farm_water_intake (flock_id, date, water_lit) SELECT f, day, 3000 FROM ({days}) s;
+        INSERT INTO flock_body_weight (flock_id, date, age_in_days, act_weight) SELECT f, day, 100, 1500 FROM ({days}) s;
+        INSERT INTO farm_temperature (flock_id, date, temp_min, temp_max) SELECT f, day, 20, 30 FROM ({days}) s;
+        INSERT INTO farm_boy_request_data (flock_id, date, temp_min, temp_max) SELECT f, day, 20, 30 FROM ({days}) s;
+        INSERT INTO farmboy_request_add_line (request_id, flock_id, total_cost)
+        SELECT r.id, r.flock_id, 10 FROM farm_boy_request_data r WHERE r.flock_id = ANY(%(flocks)s);
+        INSERT INTO farm_flock_daily_kpi (flock_id, date) SELECT f, day FROM ({days}) s;
+    """, params)
+    for table in sorted(AUDITED_TABLES):
+        cr.execute(f"ANALYZE {table}")
+    return flock_ids
+
+
+def _seq_scans(plan):
+    """Yield the audited relations scanned sequentially anywhere in ``plan``."""
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in AUDITED_TABLES:
+        yield plan['Relation Name']
+    for child in plan.get('Plans', ()):
+        yield from _seq_scans(child)
+
+
+def audit(env):
+    """Return the ``(label, table)`` pairs of the hot queries that scan sequentially."""
+    cr = env.cr
+    failures = []
+    with cr.savepoint(flush=False) as savepoint:
+        flock_ids = _generate(cr)
+        flock = flock_ids[len(flock_ids) // 2]
+        cr.execute("SELECT CURRENT_DATE - %s", [DAYS // 10])
+        day = cr.fetchone()[0]
+        cr.execute("SELECT id FROM farm_production_details WHERE flock_id = %s AND date >= %s", [flock, day])
+        production_ids = [row[0] for row in cr.fetchall()]
+        cr.execute("SELECT id FROM farm_mortality_details WHERE flock_id = %s AND date >= %s", [flock, day])
+        mortality_ids = [row[0] for row in cr.fetchall()]
+        cr.execute("SELECT id FROM farm_boy_request_data WHERE flock_id = %s AND date >= %s", [flock, day])
+        request_ids = [row[0] for row in cr.fetchall()]
+        ids_by_label = {
+            "egg lines of productions": production_ids,
+            "mortality breakdowns": mortality_ids,
+            "request lines": request_ids,
+        }
+
+        for label, query in HOT_QUERIES:
+            cr.execute(f"EXPLAIN (FORMAT JSON) {query}", {
+                'flock': flock, 'day': day, 'ids': ids_by_label.get(label, []),
+            })
+            plan = cr.fetchone()[0][0]['Plan']
+            tables = sorted(set(_seq_scans(plan)))
+            for table in tables:
+                failures.append((label, table))
+            _logger.info("%-28s %s", label, "SEQ SCAN on " + ", ".join(tables) if tables else "ok")
+        savepoint.rollback()
+    return failures
+
+
+if 'env' in globals():
+    failures = audit(env)  # noqa: F821 - provided by the Odoo shell
+    for label, table in failures:
+        print(f"FAIL {label}: sequential scan on {table}")
+    print(f"{len(HOT_QUERIES) - len({label for label, _table in failures})}/{len(HOT_QUERIES)} hot queries use an index")
+    sys.exit(1 if failures else 0)
@@ -12,6 +12,8 @@ export class DashboardComponent extends Component {
         this._tempChart = null;
         this._windChart = null;
         this._refreshTimer = null;
+        this._etag = null;
+        this._lastWeather = null;
 
         onMounted(() => {
             console.log("🟢 Dashboard component mounted");
@@ -47,44 +49,34 @@ export class DashboardComponent extends Component {
     async fetchWeather() {
         try {
             console.log("🟡 Fetching weather data...");
-            
-            const response = await fetch('/get/live-temperature', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                credentials: 'same-origin',
-                body: JSON.stringify({})
-            });
-
-            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-
-            const data = await response.json();
-            console.log("🟡 Raw response:", data);
-
-            const result = data.result || data;
-            
-            if (result.error) throw new Error(result.error);
-            if (result.success === false) throw new Error(result.error || "Request failed");
-
-            let weatherData = result.data;
-            if (result.raw_action && !weatherData) weatherData = result;
 
-            if (!weatherData) throw new Error("No weather data found");
+            const headers = {};
+            if (this._etag) headers['If-None-Match'] = this._etag;
 
-            console.log("🟡 Weather data structure:", weatherData);
+            // Handle revalidation ourselves: the server answers 304 while the
+            // hourly series is unchanged and we keep the last parsed data.
+            const response = await fetch('/weather/dashboard/hourly', {
+                method: 'GET',
+                headers,
+                credentials: 'same-origin',
+                cache: 'no-store',
+            });
 
-            // FIX: The actual data is nested in weatherData.data.data_1h
-            const actualData = weatherData.data || weatherData;
-            const data_1h = actualData.data_1h;
+            if (response.status === 304 && this._lastWeather) {
+                console.log("🟡 Weather data unchanged");
+                return this._lastWeather;
+            }
 
-            console.log("🟡 Actual data_1h:", data_1h);
+            const result = await response.json();
+            if (!response.ok || result.success === false) {
+                throw new Error(result.error || `HTTP error! status: ${response.status}`);
+            }
 
+            const data_1h = result.data && result.data.data_1h;
             if (!data_1h) {
                 throw new Error("No data_1h found in response");
             }
 
-            // Extract arrays from the correct location
             const times = data_1h.time || [];
             const temps = (data_1h.temperature || []).map(v => this.n(v));
             const winds = (data_1h.windspeed || []).map(v => this.n(v));
@@ -97,7 +89,9 @@ export class DashboardComponent extends Component {
                 rains: rains.length
             });
 
-            return { times, temps, winds, rains };
+            this._etag = response.headers.get('ETag');
+            this._lastWeather = { times, temps, winds, rains };
+            return this._lastWeather;
 
         } catch (error) {
             console.error("❌ fetchWeather error:", error);
@@ -7,7 +7,7 @@ from odoo.exceptions import UserError
 class FarmMedicineApproval(models.Model):
     _name = "farm.medicine.approval"
     _description = "Farm Medicine Approval"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['farm.reference.mixin', 'mail.thread', 'mail.activity.mixin']
     
     
     name = fields.Char(string="Reference", required=True, default="New")
@@ -56,21 +56,6 @@ class FarmMedicineApproval(models.Model):
         tracking=True
     )
 
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            today_str = datetime.today().strftime('%d-%m-%Y')
-            last_record = self.search(
-                [('name', 'like', f'M/S/{today_str}/%')],
-                order='id desc', limit=1
-            )
-            if last_record:
-                last_seq = int(last_record.name.split('/')[-1])
-                next_seq = str(last_seq + 1).zfill(5)
-            else:
-                next_seq = '00001'
-            vals['name'] = f"M/S/{today_str}/{next_seq}"
-        return super(FarmMedicineApproval, self).create(vals)
   
 
     
@@ -7,20 +7,25 @@
     'author': 'Betopia',   # <-- add your name or organization
     'website': 'https://yourcompany.com',  # optional
     'license': 'LGPL-3',  # recommended for Odoo modules
-    'depends': ['base', 'mail', 'stock', 'sale'],
+    'depends': ['base', 'mail', 'stock', 'sale', 'agro_core'],
     'data': [
         'security/ir.model.access.csv',
         'data/sequence.xml',
+        'data/hatchery_config.xml',
         'views/pre_storage.xml',
         'views/egg_batch_views.xml',
         'views/egg_break_wizard_view.xml',
         'views/setter_stage_views.xml',
         'views/setter_machine_views.xml',
+        'views/setter_scheduler_views.xml',
         'views/hatcher_stage_views.xml',
         'views/chick_packaging_views.xml', 
         'views/internal_transfer_views.xml',  
         'views/product_template_views.xml',
         'views/egg_distribution.xml',
+        'views/res_company_views.xml',
+        'views/lineage_views.xml',
+        'data/lineage.xml',
         # 'views/setter_views.xml',  # if implementing setter menu
     ],
      'assets': {
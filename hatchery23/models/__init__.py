@@ -1,3 +1,4 @@
+from . import lineage
 from . import egg_batch
 from . import egg_submodels
 from . import setter_stage
@@ -6,6 +7,7 @@ from . import chick_packaging
 from . import internal_transfer
 from . import product_template_inherit
 from . import stock_picking_inherit
+from . import stock_warehouse
 from . import egg_break_history
 from . import egg_break_wizard
 from . import setter_break_history
@@ -13,5 +15,7 @@ from . import pre_storage
 from. import pre_storage_transfer
 from .import egg_batch_break_history
 from .import setter_machine
+from . import setter_scheduler
 from .import hatcher_break_history
-from . import egg_distribution
\ No newline at end of file
+from . import egg_distribution
+from . import res_company
@@ -8,7 +8,7 @@ _logger = logging.getLogger(__name__)
 class ChickPackaging(models.Model):
     _name = 'chick.packaging'
     _description = 'Chick Packaging'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'hatchery.lineage.mixin']
     
     name = fields.Char(
         string="Packaging Serial", 
@@ -87,7 +87,9 @@ class ChickPackaging(models.Model):
     def create(self, vals):
         if vals.get('name', 'New') == 'New':
             vals['name'] = self.env['ir.sequence'].next_by_code('chick.packaging') or 'PACK/0001'
-        return super().create(vals)
+        packaging = super().create(vals)
+        self.env['hatchery.lineage.edge']._link([(packaging.hatcher_stage_id, packaging, packaging.chicks_count)])
+        return packaging
         
     def write(self, vals):
         res = super(ChickPackaging, self).write(vals)
@@ -99,15 +101,10 @@ class ChickPackaging(models.Model):
         """Create or update scrap when packaging mortality occurs."""
         for rec in self:
             if rec.packaging_mortality and rec.packaging_mortality > 0:
-                # Find product - adjust name to your product ('Eggs' or 'Chicks')
-                product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-                if not product:
-                    raise UserError(_("Product 'Eggs' not found in inventory. Please create it or change the product name."))
+                product = rec.company_id._hatchery_product('chick')
 
-                # Location: prefer destination_location if set, else any internal location
-                location = rec.destination_location or self.env['stock.location'].search([('usage', '=', 'internal')], limit=1)
-                if not location:
-                    raise UserError(_("No internal stock location found. Please configure a stock location."))
+                # Location: prefer destination_location if set, else the company's chick stock
+                location = rec.destination_location or rec.company_id._hatchery_location('chick')
 
                 # Find or create tag
                 tag = self.env['stock.scrap.reason.tag'].search([('name', '=', 'Packaging Mortality')], limit=1)
@@ -176,9 +173,9 @@ class ChickPackaging(models.Model):
                 InternalTransfer = self.env['internal.transfer']
 
                 # Try to resolve references safely
-                stock_loc = self.env.ref('stock.stock_location_stock', raise_if_not_found=False)
+                stock_loc = rec.company_id._hatchery_location('chick')
                 out_loc = self.env.ref('stock.stock_location_output', raise_if_not_found=False)
-                if not stock_loc or not out_loc:
+                if not out_loc:
                     raise UserError(_("Required stock locations not found (stock_stock / stock_output). Please check module data."))
 
                 transfer = InternalTransfer.create({
@@ -189,6 +186,7 @@ class ChickPackaging(models.Model):
                     'note': f"Transfer from Packaging ID {rec.id}",
                 })
                 rec.transfer_id = transfer.id
+                self.env['hatchery.lineage.edge']._link([(rec, transfer, transfer_qty)])
 
                 rec.message_post(body=f"🐣 Created draft Internal Transfer #{transfer.id} with {transfer_qty} chicks.")
 
@@ -204,13 +202,8 @@ class ChickPackaging(models.Model):
             if not rec.distribution_id:
                 Distribution = self.env['chicken.egg.distribution']
 
-                product_for_dist = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-                if not product_for_dist:
-                    raise UserError(_("Product 'Eggs' not found for distribution."))
-
-                stock_loc = self.env.ref('stock.stock_location_stock', raise_if_not_found=False)
-                if not stock_loc:
-                    raise UserError(_("Source stock location not found for distribution."))
+                product_for_dist = rec.company_id._hatchery_product('chick')
+                stock_loc = rec.company_id._hatchery_location('chick')
 
                 distribution = Distribution.create({
                     'product_id': product_for_dist.id,
@@ -220,6 +213,7 @@ class ChickPackaging(models.Model):
                     'parent_transfer_qty': transfer_qty
                 })
                 rec.distribution_id = distribution.id
+                self.env['hatchery.lineage.edge']._link([(rec, distribution, transfer_qty)])
 
                 # Create distribution lines for each customer only once
                 for customer in rec.customer_ids:
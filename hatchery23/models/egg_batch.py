@@ -9,7 +9,7 @@ class EggBatch(models.Model):
     _name = 'hatchery.egg.batch'
     _description = 'Egg Batch'
     _rec_name = 'batch_no'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'hatchery.lineage.mixin']
 
     company_id = fields.Many2one(
         'res.company', string='Company', default=lambda self: self.env.company
@@ -28,8 +28,9 @@ class EggBatch(models.Model):
         'stock.location',
         string="Pre-Storage Location",
         required=True,
-        default=lambda self: self.env.ref('stock.stock_location_stock').id
+        default=lambda self: self.env.company._hatchery_location_id('egg')
     )
+    stock_scrap_id = fields.Many2one('stock.scrap', string="Related Scrap", readonly=True)
 
     qty_available = fields.Integer(
         string="Available Quantity", compute="_compute_qty_available", store=True
@@ -113,28 +114,15 @@ class EggBatch(models.Model):
     # Workflow Actions
     # ----------------------------
     def action_send_to_setter(self):
-        SetterStage = self.env['hatchery.setter.stage']
-        setter_machines = self.env['hatchery.setter.machine'].search([], order='id asc')
-        if not setter_machines:
-            setter_machines = self.env['hatchery.setter.machine'].create([
-                {'name': f'Default Setter Machine {i+1}', 'capacity': 100000} for i in range(7)
-            ])
+        """Open the Setter loading plan of the batches for review."""
         for rec in self:
             if rec.state != 'draft':
                 raise UserError("⚠ This batch has already been sent to Setter.")
-            qty_remaining = rec.qty_available
-            for machine in setter_machines:
-                if qty_remaining <= 0:
-                    break
-                qty_for_machine = min(qty_remaining, machine.capacity)
-                SetterStage.create({
-                    'batch_id': rec.id,
-                    'machine_id': machine.id,
-                    'quantity_loaded': qty_for_machine,
-                    'mortality': 0,
-                    'state': 'in_setter',
-                })
-                qty_remaining -= qty_for_machine
+        plan = self.env['hatchery.setter.plan'].create({'egg_batch_ids': [(6, 0, self.ids)]})
+        return plan.action_replan()
+
+    def _mark_sent_to_setter(self):
+        for rec in self:
             rec.state = 'in_setter'
             rec.message_post(body="✅ Batch sent to Setter.")
 
@@ -174,12 +162,8 @@ class EggBatch(models.Model):
             rec.success_rate = (rec.qty_available / rec.qty_received * 100) if rec.qty_received else 0.0
 
             if rec.pre_storage_waste > 0:
-                product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-                if not product:
-                    raise UserError("Product 'Eggs' not found.")
-                location = rec.location_id or self.env['stock.location'].search([('usage', '=', 'internal')], limit=1)
-                if not location:
-                    raise UserError("No internal stock location found.")
+                product = rec.company_id._hatchery_product('hatching_egg')
+                location = rec.location_id or rec.company_id._hatchery_location('egg')
                 if rec.stock_scrap_id:
                     rec.stock_scrap_id.sudo().write({
                         'scrap_qty': rec.pre_storage_waste,
@@ -222,33 +206,19 @@ class EggBatchBreakHistory(models.Model):
     processed = fields.Boolean(string="Processed", default=False)
 
     def action_break_eggs(self):
-        product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-        if not product:
-            raise UserError("Product 'Eggs' not found in inventory.")
-
-        for line in self.filtered(lambda l: not l.processed):
+        lines = self.filtered(lambda l: not l.processed)
+        if any(not line.batch_id for line in lines):
+            raise UserError("Break line is not linked to any Egg Batch!")
+
+        self.env['agro.stock.consumption'].consume([{
+            'product': line.batch_id.company_id._hatchery_product('hatching_egg'),
+            'qty': line.break_qty,
+            'company': line.batch_id.company_id,
+            'origin': f"Break: {line.break_reason} - Batch {line.batch_id.batch_no}",
+        } for line in lines])
+
+        for line in lines:
             batch = line.batch_id
-            if not batch:
-                raise UserError("Break line is not linked to any Egg Batch!")
-
-            quant = self.env['stock.quant'].search([
-                ('product_id', '=', product.id),
-                ('location_id.usage', '=', 'internal'),
-                ('quantity', '>=', line.break_qty)
-            ], limit=1)
-
-            if not quant:
-                raise UserError(f"Not enough eggs in stock to scrap for batch {batch.batch_no}.")
-
-            scrap = self.env['stock.scrap'].create({
-                'product_id': product.id,
-                'scrap_qty': line.break_qty,
-                'location_id': quant.location_id.id,
-                'company_id': getattr(batch, 'company_id', self.env.company).id,
-                'origin': f"Break: {line.break_reason} - Batch {batch.batch_no}"
-            })
-            scrap.action_validate()
-
             batch.pre_storage_waste += line.break_qty
             batch.qty_available = max(batch.qty_received - batch.broken_qty - batch.pre_storage_waste, 0)
             line.processed = True
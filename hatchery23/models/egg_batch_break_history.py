@@ -24,41 +24,27 @@ class EggBatchBreakHistory(models.Model):
 
     def action_break_eggs(self):
         """Break egg lines and update stock + batch quantities"""
-        product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-        if not product:
-            raise UserError("Product 'Eggs' not found in inventory.")
-
-        for line in self.filtered(lambda l: not l.processed):
+        lines = self.filtered(lambda l: not l.processed)
+        if any(not line.batch_id for line in lines):
+            raise UserError("Break line is not linked to any Egg Batch!")
+
+        scraps = self.env['agro.stock.consumption'].consume([{
+            'product': line.batch_id.company_id._hatchery_product('hatching_egg'),
+            'qty': line.break_qty,
+            'location': line.batch_id.location_id,
+            'company': line.batch_id.company_id,
+            'origin': f"Egg Break: {line.break_reason} - Batch {line.batch_id.batch_no}",
+        } for line in lines])
+
+        for line, scrap in zip(lines, scraps):
             batch = line.batch_id
-            if not batch:
-                raise UserError("Break line is not linked to any Egg Batch!")
-
-            # Find available stock quant
-            quant = self.env['stock.quant'].search([
-                ('product_id', '=', product.id),
-                ('location_id', '=', batch.location_id.id),
-                ('quantity', '>=', line.break_qty)
-            ], limit=1)
-
-            if not quant:
-                raise UserError(f"Not enough eggs in stock to scrap for batch {batch.batch_no}.")
-
-            # Create a scrap specifically for this egg batch break
-            scrap = self.env['stock.scrap'].create({
-                'product_id': product.id,
-                'scrap_qty': line.break_qty,
-                'location_id': quant.location_id.id,
-                'company_id': batch.company_id.id if batch.company_id else self.env.company.id,
-                'origin': f"Egg Break: {line.break_reason} - Batch {batch.batch_no}"
-            })
-            scrap.action_validate()
 
             # Update Egg Batch counts correctly
             batch.broken_qty += line.break_qty  # ✅ use broken_qty, not pre_storage_waste
             batch.qty_available = max(batch.qty_received - batch.broken_qty - getattr(batch, 'pre_storage_waste', 0), 0)
 
             # Link scrap to the break line
-            line.stock_scrap_id = scrap.id
+            line.stock_scrap_id = scrap[:1].id
             line.processed = True
 
             # Post message
@@ -66,4 +52,4 @@ class EggBatchBreakHistory(models.Model):
                 body=f"🥚{line.break_qty} eggs broken in batch {batch.batch_no} "
                      f"due to {line.break_reason} on {line.date}. Note: {line.note or 'N/A'}"
             )
-            logger.info("Egg batch break processed: Batch %s, Qty %s, Scrap ID %s", batch.batch_no, line.break_qty, scrap.id)
+            logger.info("Egg batch break processed: Batch %s, Qty %s, Scrap ID %s", batch.batch_no, line.break_qty, scrap.ids)
@@ -40,58 +40,29 @@ class PreStorageBreakHistory(models.Model):
         return scrap.id if scrap else False
 
     def action_break_eggs(self):
-        product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-        if not product:
-            raise UserError("Product 'Eggs' not found.")
-
-        for line in self.filtered(lambda l: not l.processed):
-            batch = line.batch_id
-            if not batch or not batch.location_id:
+        lines = self.filtered(lambda l: not l.processed)
+        for line in lines:
+            if not line.batch_id or not line.batch_id.location_id:
                 raise UserError("Batch or batch location is not set!")
+        lines.batch_id._update_quant()
 
-            batch._update_quant()
-
-            # Check total available quantity across all quants
-            quants = self.env['stock.quant'].search([
-                ('product_id','=',product.id),
-                ('location_id','=',batch.location_id.id)
-            ])
-            total_qty = sum(quants.mapped('quantity'))
-            if total_qty < line.break_qty:
-                raise UserError(
-                    f"Not enough eggs in stock to scrap for batch {batch.name}. "
-                    f"Available: {total_qty}, Requested: {line.break_qty}"
-                )
+        scraps = self.env['agro.stock.consumption'].consume([{
+            'product': line.batch_id.company_id._hatchery_product('egg'),
+            'qty': line.break_qty,
+            'location': line.batch_id.location_id,
+            'company': line.batch_id.company_id,
+            'origin': f"Pre-Storage Break: {line.break_reason} - Batch {line.batch_id.name}",
+        } for line in lines])
 
-            # Create scrap
-            scrap = self.env['stock.scrap'].create({
-                'product_id': product.id,
-                'scrap_qty': line.break_qty,
-                'location_id': batch.location_id.id,
-                'company_id': getattr(batch, 'company_id', self.env.company).id,
-                'origin': f"Pre-Storage Break: {line.break_reason} - Batch {batch.name}"
-            })
-
-            # Allocate scrap from multiple quants if necessary
-            remaining_qty = line.break_qty
-            for quant in quants:
-                consume_qty = min(quant.quantity, remaining_qty)
-                if consume_qty <= 0:
-                    continue
-                quant.quantity -= consume_qty
-                remaining_qty -= consume_qty
-                if remaining_qty <= 0:
-                    break
-
-            scrap.action_validate()
+        for line, scrap in zip(lines, scraps):
+            batch = line.batch_id
 
             # Update batch
             batch.broken_qty += line.break_qty
-            batch._update_quant()
             batch.available_qty = max(batch.qty_received - batch.broken_qty - batch.pre_storage_waste, 0)
 
             # Link scrap to line
-            line.stock_scrap_id = scrap.id
+            line.stock_scrap_id = scrap[:1].id
             line.processed = True
 
             batch.message_post(
@@ -100,5 +71,6 @@ class PreStorageBreakHistory(models.Model):
 
             _logger.info(
                 "Pre-Storage break processed: Batch %s, Qty %s, Scrap ID %s", 
-                batch.name, line.break_qty, scrap.id
+                batch.name, line.break_qty, scrap.ids
             )
+        lines.batch_id._update_quant()
@@ -19,37 +19,12 @@ class EggBreakWizard(models.TransientModel):
         if self.break_qty > batch.qty_available:
             raise UserError(f"Cannot break more than remaining {batch.qty_available} eggs in batch.")
 
-        # Find Egg product
-        product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-        if not product:
-            raise UserError("Product 'Eggs' not found in inventory.")
-
-        # Get all internal quants with quantity > 0
-        quants = self.env['stock.quant'].search([
-            ('product_id', '=', product.id),
-            ('location_id.usage', '=', 'internal'),
-            ('quantity', '>', 0)
-        ], order='quantity desc')
-
-        qty_to_scrap = self.break_qty
-        for quant in quants:
-            if qty_to_scrap <= 0:
-                break
-            deduct_qty = min(quant.quantity, qty_to_scrap)
-
-            # Create scrap for this quant
-            scrap = self.env['stock.scrap'].create({
-                'product_id': product.id,
-                'scrap_qty': deduct_qty,
-                'location_id': quant.location_id.id,
-                'company_id': batch.company_id.id or self.env.company.id,
-            })
-            scrap.action_validate()
-
-            qty_to_scrap -= deduct_qty
-
-        if qty_to_scrap > 0:
-            raise UserError("Not enough eggs in stock to scrap the requested quantity.")
+        company = batch.company_id or self.env.company
+        self.env['agro.stock.consumption'].consume([{
+            'product': company._hatchery_product('hatching_egg'),
+            'qty': self.break_qty,
+            'origin': f"Egg Break - Batch {batch.batch_no}",
+        }], company=company)
 
         # Update batch broken quantity
         batch.broken_qty += self.break_qty
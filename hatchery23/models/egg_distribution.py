@@ -159,6 +159,7 @@ class ChickenEggDistributionLine(models.Model):
 
             # link the Sale Order to this line
             line.sale_order_id = order.id
+            self.env['hatchery.lineage.edge']._link([(parent, order, line.cus_qty)])
 
         # mark distribution state if all lines have Sale Orders
         # (recompute on related distributions)
@@ -1,6 +1,16 @@
+from collections import defaultdict
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
+# setter stage line field: (hatcher line model, fields copied over)
+SETTER_LINE_COPIES = {
+    'equipment_ids': ('hatchery.hatcher.stage.equipment', ('equipment_id', 'lot', 'qty', 'date', 'production_summary')),
+    'material_ids': ('hatchery.hatcher.stage.material', ('product_id', 'description', 'lot', 'qty', 'uom_id', 'unit_price')),
+    'temperature_ids': ('hatchery.hatcher.stage.temperature', ('date', 'min_temp', 'max_temp', 'avg_temp', 'humidity', 'user_id')),
+    'sanitizer_ids': ('hatchery.hatcher.stage.sanitizer', ('checklist', 'date', 'user_id')),
+}
+
 # -----------------------
 # Hatcher Machine
 # -----------------------
@@ -22,7 +32,7 @@ class HatcherMachine(models.Model):
 class HatcherStage(models.Model):
     _name = 'hatchery.hatcher.stage'
     _description = 'Hatcher Stage'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'hatchery.lineage.mixin']
 
     name = fields.Char(
         string="Serial Number",
@@ -168,55 +178,35 @@ class HatcherStage(models.Model):
     # -----------------------
     # Override create method
     # -----------------------
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('hatchery.hatcher.stage') or 'HATCHER/0001'
-        stage = super().create(vals)
-        setter_stage = stage.setter_stage_id
-        if setter_stage:
-            # Copy Equipments
-            for eq in setter_stage.equipment_ids:
-                self.env['hatchery.hatcher.stage.equipment'].create({
-                    'hatcher_stage_id': stage.id,
-                    'equipment_id': eq.equipment_id.id if eq.equipment_id else False,
-                    'lot': eq.lot or '',
-                    'qty': eq.qty or 0,
-                    'date': eq.date,
-                    'production_summary': eq.production_summary or '',
-                })
-            # Copy Materials
-            for mat in setter_stage.material_ids:
-                self.env['hatchery.hatcher.stage.material'].create({
-                    'hatcher_stage_id': stage.id,
-                    'product_id': mat.product_id.id if mat.product_id else False,
-                    'description': mat.description,
-                    'lot': mat.lot,
-                    'qty': mat.qty,
-                    'uom_id': mat.uom_id.id if mat.uom_id else False,
-                    'unit_price': mat.unit_price,
-                    'subtotal': mat.subtotal,
-                })
-            # Copy Temperature
-            for temp in setter_stage.temperature_ids:
-                self.env['hatchery.hatcher.stage.temperature'].create({
-                    'hatcher_stage_id': stage.id,
-                    'date': temp.date,
-                    'min_temp': temp.min_temp,
-                    'max_temp': temp.max_temp,
-                    'avg_temp': temp.avg_temp,
-                    'humidity': temp.humidity,
-                    'user_id': temp.user_id.id if temp.user_id else False,
-                })
-            # Copy Sanitizer
-            for san in setter_stage.sanitizer_ids:
-                self.env['hatchery.hatcher.stage.sanitizer'].create({
-                    'hatcher_stage_id': stage.id,
-                    'checklist': san.checklist,
-                    'date': san.date,
-                    'user_id': san.user_id.id if san.user_id else False,
-                })
-        return stage
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', 'New') == 'New':
+                vals['name'] = self.env['ir.sequence'].next_by_code('hatchery.hatcher.stage') or 'HATCHER/0001'
+        stages = super().create(vals_list)
+        stages._copy_setter_lines()
+        self.env['hatchery.lineage.edge']._link([
+            (stage.setter_stage_id, stage, stage.quantity_loaded) for stage in stages
+        ])
+        return stages
+
+    def _copy_setter_lines(self):
+        """Copy the lines of the source setter stages, with one create per line model."""
+        stages_by_setter = defaultdict(list)
+        for stage in self.filtered('setter_stage_id'):
+            stages_by_setter[stage.setter_stage_id.id].append(stage.id)
+        if not stages_by_setter:
+            return
+        setter_stages = self.env['hatchery.setter.stage'].browse(list(stages_by_setter))
+        for field_name, (model_name, copied_fields) in SETTER_LINE_COPIES.items():
+            rows = setter_stages[field_name].read(['setter_stage_id', *copied_fields], load=False)
+            vals_list = [
+                dict({fname: row[fname] for fname in copied_fields}, hatcher_stage_id=stage_id)
+                for row in rows
+                for stage_id in stages_by_setter[row['setter_stage_id']]
+            ]
+            if vals_list:
+                self.env[model_name].create(vals_list)
 
 
 # -----------------------
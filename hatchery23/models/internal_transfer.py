@@ -59,12 +59,9 @@ class InternalTransfer(models.Model):
     # ----------------------------
     def action_done(self):
         """Create stock picking and moves safely."""
-        Product = self.env['product.product']
         PickingType = self.env['stock.picking.type']
 
-        product_eggs = Product.search([('name', '=', 'Eggs')], limit=1)
-        if not product_eggs:
-            raise UserError(_("Product 'Eggs' not found. Please create it in Products."))
+        product_chicks = self.env.company._hatchery_product('chick')
 
         picking_type = PickingType.search([('code', '=', 'internal')], limit=1)
         if not picking_type:
@@ -90,10 +87,10 @@ class InternalTransfer(models.Model):
 
             # Create move
             self.env['stock.move'].create({
-                'name': 'Eggs Internal Transfer',
-                'product_id': product_eggs.id,
+                'name': f'{product_chicks.display_name} Internal Transfer',
+                'product_id': product_chicks.id,
                 'product_uom_qty': rec.chicks_count,
-                'product_uom': product_eggs.uom_id.id,
+                'product_uom': product_chicks.uom_id.id,
                 'picking_id': picking.id,
                 'location_id': rec.source_location.id,
                 'location_dest_id': rec.destination_location.id,
@@ -102,7 +99,7 @@ class InternalTransfer(models.Model):
             rec.picking_id = picking.id
             rec.state = 'done'
             rec.message_post(
-                body=f"🐣🚚 Internal Transfer #{rec.id} created picking #{picking.name} for product 'Eggs'."
+                body=f"🐣🚚 Internal Transfer #{rec.id} created picking #{picking.name} for product '{product_chicks.display_name}'."
             )
             _logger.info("Created picking %s with move qty %s for transfer %s",
                          picking.name, rec.chicks_count, rec.id)
@@ -123,10 +120,11 @@ class InternalTransfer(models.Model):
             picking = rec.picking_id
             _logger.info("Delivering Transfer %s, Picking %s, State %s", rec.id, picking.name, picking.state)
 
-            # Ensure only 'Eggs' are moved
+            # Ensure only chicks are moved
+            product_chicks = self.env.company._hatchery_product('chick')
             for move in picking.move_ids_without_package:
-                if move.product_id.name != 'Eggs':
-                    raise UserError(_("This transfer can only deliver product 'Eggs'."))
+                if move.product_id != product_chicks:
+                    raise UserError(_("This transfer can only deliver product '%s'.", product_chicks.display_name))
 
             # Confirm & assign picking
             if picking.state == 'draft':
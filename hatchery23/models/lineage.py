@@ -0,0 +1,209 @@
+import logging
+
+from odoo import models, fields, api, tools, _
+
+_logger = logging.getLogger(__name__)
+
+# documents eggs and chicks pass through, from the flock to the customer
+LINEAGE_MODELS = [
+    'farm.layer.flock', 'farm.production.details', 'stock.picking', 'hatchery.prestorage.batch',
+    'hatchery.egg.batch', 'hatchery.setter.stage', 'hatchery.hatcher.stage', 'chick.packaging',
+    'internal.transfer', 'chicken.egg.distribution', 'sale.order',
+]
+
+# (source model, target model, SELECT source id, target id, quantity) deriving the edges from existing links
+BACKFILL_QUERIES = [
+    ('stock.picking', 'hatchery.prestorage.batch',
+     "SELECT picking_id, id, qty_received FROM hatchery_prestorage_batch WHERE picking_id IS NOT NULL"),
+    ('hatchery.prestorage.batch', 'hatchery.egg.batch',
+     "SELECT prestorage_id, egg_batch_id, SUM(transfer_qty) FROM hatchery_egg_selection"
+     " WHERE state = 'done' AND prestorage_id IS NOT NULL AND egg_batch_id IS NOT NULL GROUP BY prestorage_id, egg_batch_id"),
+    ('hatchery.egg.batch', 'hatchery.setter.stage',
+     "SELECT batch_id, id, quantity_loaded FROM hatchery_setter_stage WHERE batch_id IS NOT NULL AND prestorage_batch_id IS NULL"),
+    ('hatchery.prestorage.batch', 'hatchery.setter.stage',
+     "SELECT prestorage_batch_id, id, quantity_loaded FROM hatchery_setter_stage WHERE prestorage_batch_id IS NOT NULL"),
+    ('hatchery.setter.stage', 'hatchery.hatcher.stage',
+     "SELECT setter_stage_id, id, quantity_loaded FROM hatchery_hatcher_stage WHERE setter_stage_id IS NOT NULL"),
+    ('hatchery.hatcher.stage', 'chick.packaging',
+     "SELECT hatcher_stage_id, id, chicks_count FROM chick_packaging WHERE hatcher_stage_id IS NOT NULL"),
+    ('chick.packaging', 'internal.transfer',
+     "SELECT packaging_id, id, chicks_count FROM internal_transfer WHERE packaging_id IS NOT NULL"),
+    ('chick.packaging', 'chicken.egg.distribution',
+     "SELECT p.id, d.id, d.parent_transfer_qty FROM chick_packaging p JOIN chicken_egg_distribution d ON d.id = p.distribution_id"),
+    ('chicken.egg.distribution', 'sale.order',
+     "SELECT distribution_id, sale_order_id, SUM(cus_qty) FROM chicken_egg_distribution_line"
+     " WHERE distribution_id IS NOT NULL AND sale_order_id IS NOT NULL GROUP BY distribution_id, sale_order_id"),
+]
+
+
+class HatcheryLineageEdge(models.Model):
+    """One hop of eggs or chicks from a source document to the next one.
+
+    Edges are written at each stage transition, so the whole path from a
+    flock's production to a customer's sale order can be walked by one
+    recursive query instead of following each Many2one by hand.
+    """
+
+    _name = 'hatchery.lineage.edge'
+    _description = 'Egg Lineage Edge'
+    _order = 'date, id'
+
+    source_model = fields.Char(string="Source Model", required=True, readonly=True)
+    source_id = fields.Many2oneReference(string="Source ID", model_field='source_model', required=True, readonly=True)
+    target_model = fields.Char(string="Target Model", required=True, readonly=True)
+    target_id = fields.Many2oneReference(string="Target ID", model_field='target_model', required=True, readonly=True)
+    quantity = fields.Float(string="Quantity", readonly=True)
+    date = fields.Datetime(string="Date", default=fields.Datetime.now, readonly=True)
+    source_ref = fields.Reference(selection='_selection_lineage_models', string="From", compute='_compute_refs')
+    target_ref = fields.Reference(selection='_selection_lineage_models', string="To", compute='_compute_refs')
+
+    _sql_constraints = [
+        ('edge_uniq', 'unique(source_model, source_id, target_model, target_id)', "A lineage edge is recorded once."),
+    ]
+
+    def init(self):
+        tools.create_index(self.env.cr, 'hatchery_lineage_edge_source_idx', self._table, ['source_model', 'source_id'])
+        tools.create_index(self.env.cr, 'hatchery_lineage_edge_target_idx', self._table, ['target_model', 'target_id'])
+
+    @api.model
+    def _selection_lineage_models(self):
+        return [
+            (model_name, self.env[model_name]._description)
+            for model_name in LINEAGE_MODELS
+            if model_name in self.env
+        ]
+
+    @api.depends('source_model', 'source_id', 'target_model', 'target_id')
+    def _compute_refs(self):
+        for edge in self:
+            edge.source_ref = f"{edge.source_model},{edge.source_id}" if edge.source_model in self.env else False
+            edge.target_ref = f"{edge.target_model},{edge.target_id}" if edge.target_model in self.env else False
+
+    # -----------------------
+    # Recording
+    # -----------------------
+    @api.model
+    def _link(self, edges):
+        """Record ``[(source record, target record, quantity)]``; quantities add up on an existing edge."""
+        rows = [
+            (source._name, source.id, target._name, target.id, quantity or 0.0)
+            for source, target, quantity in edges
+            if source and target
+        ]
+        if not rows:
+            return
+        self.env.cr.execute("""
+            INSERT INTO hatchery_lineage_edge (source_model, source_id, target_model, target_id, quantity, date,
+                                               create_uid, create_date, write_uid, write_date)
+            SELECT e.source_model, e.source_id, e.target_model, e.target_id, SUM(e.quantity), NOW() AT TIME ZONE 'UTC',
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%s::varchar[], %s::int4[], %s::varchar[], %s::int4[], %s::float8[])
+                AS e(source_model, source_id, target_model, target_id, quantity)
+             GROUP BY e.source_model, e.source_id, e.target_model, e.target_id
+            ON CONFLICT (source_model, source_id, target_model, target_id) DO UPDATE
+               SET quantity = hatchery_lineage_edge.quantity + EXCLUDED.quantity,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, [self.env.uid, self.env.uid] + [list(column) for column in zip(*rows)])
+        self.invalidate_model()
+
+    @api.model
+    def _link_picking_productions(self, pickings):
+        """Link the flock and production behind egg receipts when farm_management is installed."""
+        if 'farm_production_id' not in pickings._fields:
+            return
+        edges = []
+        for picking in pickings.sudo().filtered('farm_production_id'):
+            production = picking.farm_production_id
+            quantity = sum(picking.move_ids.mapped('quantity'))
+            edges.append((production.flock_id, production, quantity))
+            edges.append((production, picking, quantity))
+        self._link(edges)
+
+    @api.model
+    def _forget(self, records):
+        """Drop the edges into and out of ``records``."""
+        if not records:
+            return
+        self.search([
+            '|',
+            '&', ('source_model', '=', records._name), ('source_id', 'in', records.ids),
+            '&', ('target_model', '=', records._name), ('target_id', 'in', records.ids),
+        ]).unlink()
+
+    @api.model
+    def _backfill(self):
+        """Derive the edges of documents created before lineage was recorded; existing edges are kept."""
+        for source_model, target_model, query in BACKFILL_QUERIES:
+            self.env.cr.execute(f"""
+                INSERT INTO hatchery_lineage_edge (source_model, source_id, target_model, target_id, quantity, date,
+                                                   create_uid, create_date, write_uid, write_date)
+                SELECT %s, s.source_id, %s, s.target_id, COALESCE(s.quantity, 0), NOW() AT TIME ZONE 'UTC',
+                       %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+                  FROM ({query}) AS s(source_id, target_id, quantity)
+                ON CONFLICT (source_model, source_id, target_model, target_id) DO NOTHING
+            """, [source_model, target_model, self.env.uid, self.env.uid])
+            _logger.info("Lineage backfill %s -> %s: %s edges", source_model, target_model, self.env.cr.rowcount)
+        pickings = self.env['stock.picking'].search([('x_prestorage_created', '=', True)])
+        linked = self.search([
+            ('source_model', '=', 'farm.production.details'),
+            ('target_model', '=', 'stock.picking'),
+            ('target_id', 'in', pickings.ids),
+        ])
+        # _link adds quantities up, so receipts linked already are left alone
+        self._link_picking_productions(pickings - pickings.browse(linked.mapped('target_id')))
+        self.invalidate_model()
+
+    # -----------------------
+    # Tracing
+    # -----------------------
+    @api.model
+    def _trace(self, records, upstream=True):
+        """Return every edge upstream (towards the flock) or downstream (towards the customer) of ``records``.
+
+        One recursive query walks the whole graph; each edge is visited once
+        even when paths merge or split, which also ends the walk on a cycle.
+        """
+        if not records:
+            return self
+        self.flush_model()
+        near, far = ('target', 'source') if upstream else ('source', 'target')
+        self.env.cr.execute(f"""
+            WITH RECURSIVE walk(id, model, res_id) AS (
+                SELECT e.id, e.{far}_model, e.{far}_id
+                  FROM hatchery_lineage_edge e
+                 WHERE e.{near}_model = %s AND e.{near}_id = ANY(%s)
+                 UNION
+                SELECT e.id, e.{far}_model, e.{far}_id
+                  FROM walk w
+                  JOIN hatchery_lineage_edge e ON e.{near}_model = w.model AND e.{near}_id = w.res_id
+            )
+            SELECT id FROM walk
+        """, [records._name, records.ids])
+        return self.search([('id', 'in', [row[0] for row in self.env.cr.fetchall()])])
+
+
+class HatcheryLineageMixin(models.AbstractModel):
+    _name = 'hatchery.lineage.mixin'
+    _description = 'Egg Lineage Tracing'
+
+    def _action_view_lineage(self, upstream):
+        edges = self.env['hatchery.lineage.edge']._trace(self, upstream=upstream)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _("Upstream Lineage") if upstream else _("Downstream Lineage"),
+            'res_model': 'hatchery.lineage.edge',
+            'view_mode': 'list',
+            'domain': [('id', 'in', edges.ids)],
+            'context': {'create': False},
+        }
+
+    def unlink(self):
+        self.env['hatchery.lineage.edge'].sudo()._forget(self)
+        return super().unlink()
+
+    def action_view_upstream(self):
+        return self._action_view_lineage(upstream=True)
+
+    def action_view_downstream(self):
+        return self._action_view_lineage(upstream=False)
@@ -7,7 +7,7 @@ _logger = logging.getLogger(__name__)
 class HatcheryPreStorage(models.Model):
     _name = 'hatchery.prestorage.batch'
     _description = 'Pre-Storage Batch'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'hatchery.lineage.mixin']
 
     # ===========================
     # Basic Fields
@@ -28,7 +28,7 @@ class HatcheryPreStorage(models.Model):
         'stock.location',
         string="Pre-Storage Location",
         required=True,
-        default=lambda self: self.env.ref('stock.stock_location_stock').id
+        default=lambda self: self.env.company._hatchery_location_id('egg')
     )
     egg_transfer_ids = fields.One2many(
         'hatchery.egg.selection',
@@ -164,13 +164,8 @@ class HatcheryPreStorage(models.Model):
 
             # Create or update scrap record
             if rec.pre_storage_waste > 0:
-                product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-                if not product:
-                    raise UserError(_("Product 'Eggs' not found in inventory."))
-
-                location = rec.location_id or self.env['stock.location'].search([('usage', '=', 'internal')], limit=1)
-                if not location:
-                    raise UserError(_("No internal stock location found."))
+                product = rec.company_id._hatchery_product('egg')
+                location = rec.location_id or rec.company_id._hatchery_location('egg')
 
                 tag = self.env['stock.scrap.reason.tag'].search([('name', '=', 'Pre-Storage Waste')], limit=1)
                 if not tag:
@@ -241,28 +236,15 @@ class HatcheryPreStorage(models.Model):
     # Send to Setter
     # ===========================
     def action_send_to_setter(self):
-        SetterStage = self.env['hatchery.setter.stage']
-        setter_machines = self.env['hatchery.setter.machine'].search([], order='id asc')
-        if not setter_machines:
-            setter_machines = self.env['hatchery.setter.machine'].create([
-                {'name': f'Default Setter Machine {i+1}', 'capacity': 100000} for i in range(7)
-            ])
-
+        """Open the Setter loading plan of the batches for review."""
         for rec in self:
-            qty_remaining = rec.available_qty
-            for machine in setter_machines:
-                if qty_remaining <= 0:
-                    break
-                qty_for_machine = min(qty_remaining, machine.capacity)
-                SetterStage.create({
-                    'prestorage_batch_id': rec.id,
-                    'machine_id': machine.id,
-                    'quantity_loaded': qty_for_machine,
-                    'mortality': 0,
-                    'state': 'in_setter',
-                })
-                qty_remaining -= qty_for_machine
+            if rec.state != 'draft':
+                raise UserError(_("⚠ Batch %s has already been sent to Setter.", rec.name))
+        plan = self.env['hatchery.setter.plan'].create({'prestorage_ids': [(6, 0, self.ids)]})
+        return plan.action_replan()
 
+    def _mark_sent_to_setter(self):
+        for rec in self:
             sent_qty = rec.available_qty
             rec.qty_received -= sent_qty
             rec.state = 'in_setter'
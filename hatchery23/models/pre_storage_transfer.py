@@ -119,6 +119,7 @@ class EggSelection(models.Model):
             # Mark this selection line as transferred
             rec.transferred = True
             rec.state = 'done'
+            self.env['hatchery.lineage.edge']._link([(rec.prestorage_id, rec.egg_batch_id, rec.transfer_qty)])
             
             _logger.info("EggSelection ID %s state after transfer: %s", rec.id, rec.state)
             # or just for console debugging (less recommended)
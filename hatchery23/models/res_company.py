@@ -0,0 +1,94 @@
+from odoo import models, fields, tools, _
+from odoo.exceptions import UserError
+
+# kind: (company field, label, kind it falls back to)
+HATCHERY_PRODUCTS = {
+    'egg': ('hatchery_egg_product_id', "Egg", None),
+    'hatching_egg': ('hatchery_hatching_egg_product_id', "Hatching Egg", 'egg'),
+    'chick': ('hatchery_chick_product_id', "Chick", 'egg'),
+}
+HATCHERY_LOCATIONS = {
+    'egg': 'hatchery_egg_location_id',
+    'chick': 'hatchery_chick_location_id',
+}
+HATCHERY_CONFIG_FIELDS = {fname for fname, _label, _fallback in HATCHERY_PRODUCTS.values()} | set(HATCHERY_LOCATIONS.values())
+
+
+class ResCompany(models.Model):
+    _inherit = "res.company"
+
+    hatchery_egg_product_id = fields.Many2one(
+        'product.product', string="Egg Product",
+        help="Eggs received and wasted in pre-storage.",
+    )
+    hatchery_hatching_egg_product_id = fields.Many2one(
+        'product.product', string="Hatching Egg Product",
+        help="Eggs set into egg batches, setters and hatchers. Defaults to the Egg Product.",
+    )
+    hatchery_chick_product_id = fields.Many2one(
+        'product.product', string="Chick Product",
+        help="Chicks packaged and transferred. Defaults to the Egg Product.",
+    )
+    hatchery_egg_location_id = fields.Many2one(
+        'stock.location', string="Egg Stock Location", domain="[('usage', '=', 'internal')]",
+        help="Defaults to the stock location of the company's warehouse.",
+    )
+    hatchery_chick_location_id = fields.Many2one(
+        'stock.location', string="Chick Stock Location", domain="[('usage', '=', 'internal')]",
+        help="Defaults to the Egg Stock Location.",
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if HATCHERY_CONFIG_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache('company_id')
+    def _get_hatchery_config(self, company_id):
+        """Return ``({kind: product id}, {kind: location id})`` of a company, fallbacks applied."""
+        company = self.browse(company_id).sudo()
+        products = {}
+        for kind, (fname, _label, fallback) in HATCHERY_PRODUCTS.items():
+            products[kind] = company[fname].id or products.get(fallback) or False
+        egg_location = company.hatchery_egg_location_id or self.env['stock.warehouse'].sudo().search(
+            [('company_id', '=', company_id)], limit=1,
+        ).lot_stock_id
+        locations = {
+            'egg': egg_location.id,
+            'chick': company.hatchery_chick_location_id.id or egg_location.id,
+        }
+        return products, locations
+
+    def _hatchery_product(self, kind):
+        """Return the configured ``product.product`` of ``kind`` (see HATCHERY_PRODUCTS)."""
+        company = self or self.env.company
+        company.ensure_one()
+        product_id = self._get_hatchery_config(company.id)[0][kind]
+        if not product_id:
+            raise UserError(_(
+                "⚠ Set the %(product)s Product of company %(company)s (Settings > Companies > Agro Modules).",
+                product=HATCHERY_PRODUCTS[kind][1], company=company.name,
+            ))
+        return self.env['product.product'].browse(product_id)
+
+    def _hatchery_location_id(self, kind):
+        """Return the id of the configured location of ``kind``, False when there is none (field defaults)."""
+        company = self or self.env.company
+        company.ensure_one()
+        return self._get_hatchery_config(company.id)[1][kind]
+
+    def _hatchery_location(self, kind):
+        """Return the configured ``stock.location`` of ``kind`` ('egg' or 'chick')."""
+        company = self or self.env.company
+        company.ensure_one()
+        location_id = company._hatchery_location_id(kind)
+        if not location_id:
+            raise UserError(_("⚠ Set the stock locations of company %s (Settings > Companies > Agro Modules).", company.name))
+        return self.env['stock.location'].browse(location_id)
+
+    def _init_hatchery_products(self):
+        """Seed the Egg Product of the companies from the product formerly looked up by name."""
+        product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
+        if product:
+            self.search([('hatchery_egg_product_id', '=', False)]).hatchery_egg_product_id = product
@@ -45,55 +45,52 @@ class SetterBreakHistory(models.Model):
         if vals.get('setter_stage_id') and not vals.get('batch_id'):
             stage = self.env['hatchery.setter.stage'].browse(vals['setter_stage_id'])
             vals['batch_id'] = stage.batch_id.id if stage.batch_id else False
-        return super().create(vals)
+        lines = super().create(vals)
+        lines.setter_stage_id.machine_id._sync_racks()
+        return lines
+
+    def write(self, vals):
+        machines = self.setter_stage_id.machine_id
+        res = super().write(vals)
+        if 'break_qty' in vals or 'setter_stage_id' in vals:
+            (machines | self.setter_stage_id.machine_id)._sync_racks()
+        return res
+
+    def unlink(self):
+        machines = self.setter_stage_id.machine_id
+        res = super().unlink()
+        machines._sync_racks()
+        return res
 
     def action_break_eggs(self):
         """Process break lines during setter stage and create stock scrap."""
-        product = self.env['product.product'].search([('name', '=', 'Eggs')], limit=1)
-        if not product:
-            raise UserError("Product 'Eggs' not found in inventory.")
-
-        for line in self.filtered(lambda l: not l.processed):
-            stage = line.setter_stage_id
+        lines = self.filtered(lambda l: not l.processed)
+        for stage, stage_lines in lines.grouped('setter_stage_id').items():
             if not stage:
                 raise UserError("Break line is not linked to any Setter Stage!")
-
-            batch = line.batch_id or stage.batch_id
-            if not batch:
+            if not all(line.batch_id or stage.batch_id for line in stage_lines):
                 raise UserError("No linked Egg Batch found for this Setter Stage.")
-
-            if line.break_qty > stage.qty_available:
+            break_qty = sum(stage_lines.mapped('break_qty'))
+            if break_qty > stage.qty_available:
                 raise UserError(
-                    f"Cannot break {line.break_qty} eggs. Only {stage.qty_available} available in this stage."
+                    f"Cannot break {break_qty} eggs. Only {stage.qty_available} available in this stage."
                 )
 
-            # Find stock quant to scrap
-            quant = self.env['stock.quant'].search([
-                ('product_id', '=', product.id),
-                ('location_id.usage', '=', 'internal'),
-                ('quantity', '>=', line.break_qty)
-            ], limit=1)
+        scraps = self.env['agro.stock.consumption'].consume([{
+            'product': (line.batch_id or line.setter_stage_id.batch_id).company_id._hatchery_product('hatching_egg'),
+            'qty': line.break_qty,
+            'company': (line.batch_id or line.setter_stage_id.batch_id).company_id,
+            'origin': f"Setter Break: {line.break_reason} - Batch {(line.batch_id or line.setter_stage_id.batch_id).batch_no}",
+        } for line in lines])
 
-            if not quant:
-                raise UserError(f"Not enough eggs in stock to scrap for batch {batch.batch_no}.")
-
-            # Create scrap entry
-            scrap = self.env['stock.scrap'].create({
-                'product_id': product.id,
-                'scrap_qty': line.break_qty,
-                'location_id': quant.location_id.id,
-                'company_id': batch.company_id.id if batch.company_id else self.env.company.id,
-                'origin': f"Setter Break: {line.break_reason} - Batch {batch.batch_no}"
-            })
-            scrap.action_validate()
+        for line, scrap in zip(lines, scraps):
+            stage = line.setter_stage_id
+            batch = line.batch_id or stage.batch_id
 
             # Mark line processed
-            line.stock_scrap_id = scrap.id
+            line.stock_scrap_id = scrap[:1].id
             line.processed = True
 
-            # Update stage qty_available
-            stage._compute_qty_available()
-
             # Post messages to chatter
             stage.message_post(
                 body=f"🥚 {line.break_qty} eggs broken in Setter Stage ({stage.machine_id.name}) "
@@ -107,4 +104,7 @@ class SetterBreakHistory(models.Model):
             _logger.info(
                 "Setter Break processed: Batch %s | Stage %s | Qty %s | Reason: %s",
                 batch.batch_no, stage.id, line.break_qty, line.break_reason
-            )
\ No newline at end of file
+            )
+
+        # Update stage qty_available
+        lines.setter_stage_id._compute_qty_available()
@@ -1,8 +1,15 @@
 import logging
+from collections import defaultdict
+
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+RACK_CAPACITY = 10000  # Eggs per rack
+# setter stages whose eggs still sit in their machine
+ACTIVE_STAGE_STATES = ('in_setter', 'ready_for_hatcher')
+
 # -----------------------
 # Setter Machine
 # -----------------------
@@ -13,6 +20,16 @@ class SetterMachine(models.Model):
 
     name = fields.Char(required=True, tracking=True)
     capacity = fields.Integer(default=100000, tracking=True)
+    incubation_days = fields.Integer(
+        string="Incubation Days", default=18, tracking=True,
+        help="Days a load occupies the machine before moving to the Hatcher."
+    )
+    temperature_profile = fields.Selection([
+        ('multi_stage', 'Multi-Stage'),
+        ('single_stage', 'Single-Stage'),
+    ], string="Temperature Profile", default='multi_stage', required=True, tracking=True,
+        help="A single-stage machine runs one temperature curve per cycle, so it only holds eggs set on the same day."
+    )
 
     # Stages linked to this machine
     setter_stage_ids = fields.One2many(
@@ -25,6 +42,8 @@ class SetterMachine(models.Model):
     egg_batch_id = fields.Many2one(
         'hatchery.egg.batch',
         string="Egg Batch",
+        compute="_compute_available_qty",
+        store=True,
         tracking=True
     )
 
@@ -35,97 +54,93 @@ class SetterMachine(models.Model):
         string="Available Eggs"
     )
 
-    # Racks generated dynamically for the latest batch
+    # Racks of the latest batch, maintained by _sync_racks()
     rack_ids = fields.One2many(
         'hatchery.setter.stage.rack',
         'machine_id',
-        string="Racks",
-        store=True,
-        compute="_compute_racks"
+        string="Racks"
     )
 
+    @api.constrains('capacity', 'incubation_days')
+    def _check_planning_limits(self):
+        for machine in self:
+            if machine.capacity <= 0:
+                raise UserError(f"⚠️ Setter Machine {machine.name} must have a capacity greater than zero.")
+            if not 0 < machine.incubation_days <= 18:
+                raise UserError(f"⚠️ Incubation days of Setter Machine {machine.name} must be between 1 and 18.")
+
     # -----------------------
     # Compute Methods
     # -----------------------
     @api.depends('setter_stage_ids.qty_available', 'setter_stage_ids.state', 'setter_stage_ids.batch_id')
     def _compute_available_qty(self):
-      for machine in self:
-        # Filter only active stages
-        active_stages = machine.setter_stage_ids.filtered(
-            lambda s: s.state in ['in_setter', 'ready_for_hatcher']
-        )
-
-        if not active_stages:
-            # No active stages → reset machine
-            machine.egg_batch_id = False
-            machine.available_qty = 0
-            # Remove all racks
-            machine.rack_ids.unlink()
-            continue
-
-        # Pick the stage with the highest ID (latest created)
-        latest_stage = max(active_stages, key=lambda s: s.id)
-        new_batch = latest_stage.batch_id
-
-        # If batch changed, delete previous batch racks
-        if machine.egg_batch_id != new_batch:
-            machine.rack_ids.unlink()
-
-        machine.egg_batch_id = new_batch
-
-        # Sum only stages for that batch and still active
-        stages_for_batch = machine.setter_stage_ids.filtered(
-            lambda s: s.batch_id == machine.egg_batch_id
-            and s.state in ['in_setter', 'ready_for_hatcher']
-        )
-        machine.available_qty = sum(stages_for_batch.mapped('qty_available'))
-
-        # Debug log - using batch_no since _rec_name is batch_no
-        _logger.info(
-            "Machine %s latest batch: %s, available_qty: %s",
-            machine.name,
-            machine.egg_batch_id.batch_no if machine.egg_batch_id else "None",
-            machine.available_qty
-        )
-
-
-    @api.depends('available_qty', 'egg_batch_id')
-    def _compute_racks(self):
-        rack_capacity = 10000  # Eggs per rack
         for machine in self:
-            total_eggs = machine.available_qty or 0
-
-            # Delete only racks for the current batch
-            if machine.egg_batch_id:
-                machine.rack_ids.filtered(
-                    lambda r: r.batch_id == machine.egg_batch_id
-                ).unlink()
-
-            racks_to_create = []
-            if total_eggs > 0:
-                full_racks = total_eggs // rack_capacity
-                remainder = total_eggs % rack_capacity
-
-                # Create full racks
-                for i in range(full_racks):
-                    racks_to_create.append({
-                        'rack_no': f'Rack {i + 1}',
-                        'qty': rack_capacity,
-                        'machine_id': machine.id,
-                        'batch_id': machine.egg_batch_id.id
-                    })
+            active_stages = machine.setter_stage_ids.filtered(lambda s: s.state in ACTIVE_STAGE_STATES)
+            # The stage with the highest ID (latest created) decides the batch
+            batch = active_stages.sorted('id')[-1:].batch_id
+            machine.egg_batch_id = batch
+            machine.available_qty = sum(
+                active_stages.filtered(lambda s: s.batch_id == batch).mapped('qty_available')
+            )
 
-                # Create partial rack if remainder exists
-                if remainder > 0:
-                    racks_to_create.append({
-                        'rack_no': f'Rack {full_racks + 1}',
-                        'qty': remainder,
+    # -----------------------
+    # Rack Allocation
+    # -----------------------
+    def _rack_layout(self):
+        """Return the ``[(rack no, qty)]`` the machine's available eggs should fill."""
+        self.ensure_one()
+        full_racks, remainder = divmod(self.available_qty or 0, RACK_CAPACITY)
+        layout = [(f'Rack {i + 1}', RACK_CAPACITY) for i in range(full_racks)]
+        if remainder > 0:
+            layout.append((f'Rack {full_racks + 1}', remainder))
+        return layout
+
+    def _sync_racks(self):
+        """Bring the racks of the machines in line with their layout.
+
+        Existing racks are matched on their number: racks that changed are
+        updated, missing ones created and the ones left over archived, so
+        racks that are still right are not touched at all.
+        """
+        if not self:
+            return
+        Rack = self.env['hatchery.setter.stage.rack'].with_context(active_test=False)
+        racks = {}
+        leftovers = Rack
+        for rack in Rack.search([('machine_id', 'in', self.ids)], order='active desc, id'):
+            key = (rack.machine_id.id, rack.rack_no)
+            if key in racks:
+                leftovers |= rack
+            else:
+                racks[key] = rack
+
+        to_create = []
+        to_update = defaultdict(lambda: Rack)
+        for machine in self:
+            for rack_no, qty in machine._rack_layout():
+                rack = racks.pop((machine.id, rack_no), None)
+                if rack is None:
+                    to_create.append({
+                        'rack_no': rack_no,
+                        'qty': qty,
                         'machine_id': machine.id,
-                        'batch_id': machine.egg_batch_id.id
+                        'batch_id': machine.egg_batch_id.id,
                     })
-
-                # Create racks in DB
-                self.env['hatchery.setter.stage.rack'].create(racks_to_create)
+                elif rack.qty != qty or rack.batch_id != machine.egg_batch_id or not rack.active:
+                    to_update[qty, machine.egg_batch_id.id] |= rack
+        leftovers |= Rack.concat(*racks.values())
+        to_archive = leftovers.filtered('active')
+
+        for (qty, batch_id), updated in to_update.items():
+            updated.write({'qty': qty, 'batch_id': batch_id, 'active': True})
+        if to_archive:
+            to_archive.write({'active': False})
+        if to_create:
+            Rack.create(to_create)
+        _logger.debug(
+            "Racks of %s setter machines: %s created, %s updated, %s archived",
+            len(self), len(to_create), sum(len(updated) for updated in to_update.values()), len(to_archive)
+        )
 
 
 # -----------------------
@@ -136,6 +151,7 @@ class SetterStageRack(models.Model):
     _description = 'Setter Stage Rack'
 
     rack_no = fields.Char(string="Rack No")
-    machine_id = fields.Many2one('hatchery.setter.machine', string="Setter Machine")
+    machine_id = fields.Many2one('hatchery.setter.machine', string="Setter Machine", index=True)
     batch_id = fields.Many2one('hatchery.egg.batch', string="Egg Batch")
-    qty = fields.Integer(string="Egg Quantity")
\ No newline at end of file
+    qty = fields.Integer(string="Egg Quantity")
+    active = fields.Boolean(default=True)
@@ -0,0 +1,230 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from .setter_machine import ACTIVE_STAGE_STATES
+
+_logger = logging.getLogger(__name__)
+
+
+# -----------------------
+# Setter Scheduler
+# -----------------------
+class SetterScheduler(models.AbstractModel):
+    """Plan egg loads into setter machines against their occupancy calendar.
+
+    Every machine gets one counter of loaded eggs per day over the planning
+    horizon. A load set on day D occupies its machine from D for the machine's
+    incubation days, and fits only if the busiest day of that window still has
+    room for it, so a plan can never overbook a machine on any day.
+    """
+
+    _name = 'hatchery.setter.scheduler'
+    _description = 'Setter Capacity Scheduler'
+
+    @api.model
+    def _load_calendar(self, machines, date_from, date_to):
+        """Return ``(load, sets)``: per machine, the eggs and the set days on each day of the horizon."""
+        days = (date_to - date_from).days
+        load = {machine.id: [0] * days for machine in machines}
+        sets = {machine.id: [set() for _day in range(days)] for machine in machines}
+        incubation = {machine.id: machine.incubation_days for machine in machines}
+
+        stages = self.env['hatchery.setter.stage'].search_read([
+            ('machine_id', 'in', machines.ids),
+            ('state', 'in', ACTIVE_STAGE_STATES),
+            ('start_date', '<', fields.Datetime.to_datetime(date_to)),
+        ], ['machine_id', 'start_date', 'end_date', 'quantity_loaded'])
+        for stage in stages:
+            machine_id = stage['machine_id'][0]
+            start = stage['start_date'].date()
+            end = stage['end_date'].date() if stage['end_date'] else start + timedelta(days=incubation[machine_id])
+            for day in range(max((start - date_from).days, 0), min((end - date_from).days, days)):
+                load[machine_id][day] += stage['quantity_loaded']
+                sets[machine_id][day].add(start)
+        return load, sets
+
+    @api.model
+    def _plan(self, demands, machines=None):
+        """Pack ``demands`` into setter machines.
+
+        Loads of a day are placed largest first. A load goes whole into the
+        machine it leaves the least room in, so partly filled machines are
+        topped up before empty ones are opened; a load no machine can take
+        whole fills the machine with the most room and the rest is placed
+        again. Single-stage machines only share a cycle between eggs set on
+        the same day.
+
+        :param demands: list of ``(key, quantity, set date)``
+        :returns: list of dicts with ``key``, ``machine``, ``quantity``,
+            ``set_date``, ``end_date`` and ``fill_rate`` (peak occupancy of
+            the machine over the load's window, in %)
+        :raises UserError: when the machines cannot take a load
+        """
+        machines = machines if machines is not None else self.env['hatchery.setter.machine'].search([], order='id')
+        if not machines:
+            raise UserError(_("⚠ Configure at least one Setter Machine before sending eggs to the Setter."))
+        demands = [demand for demand in demands if demand[1] > 0]
+        if not demands:
+            return []
+
+        date_from = min(set_date for _key, _qty, set_date in demands)
+        date_to = max(set_date for _key, _qty, set_date in demands) + timedelta(days=max(machines.mapped('incubation_days')))
+        load, sets = self._load_calendar(machines, date_from, date_to)
+        specs = [(machine, machine.capacity, machine.incubation_days, machine.temperature_profile == 'single_stage')
+                 for machine in machines]
+
+        allocations = []
+        for key, qty, set_date in sorted(demands, key=lambda demand: (demand[2], -demand[1])):
+            start = (set_date - date_from).days
+            remaining = qty
+            while remaining > 0:
+                candidates = []
+                for machine, capacity, incubation, single_stage in specs:
+                    window = slice(start, start + incubation)
+                    if single_stage and any(day_sets - {set_date} for day_sets in sets[machine.id][window]):
+                        continue
+                    peak = max(load[machine.id][window])
+                    if capacity - peak > 0:
+                        candidates.append((capacity - peak, peak, machine, incubation))
+                if not candidates:
+                    raise UserError(_(
+                        "⚠ Not enough Setter capacity on %(date)s: %(qty)s eggs could not be placed.",
+                        date=set_date, qty=remaining,
+                    ))
+                fitting = [candidate for candidate in candidates if candidate[0] >= remaining]
+                if fitting:
+                    # tightest fit, partly filled machines first
+                    free, _peak, machine, incubation = min(fitting, key=lambda c: (c[0], c[1] == 0, c[2].id))
+                else:
+                    free, _peak, machine, incubation = max(candidates, key=lambda c: (c[0], -c[2].id))
+                placed = min(free, remaining)
+                for day in range(start, start + incubation):
+                    load[machine.id][day] += placed
+                    sets[machine.id][day].add(set_date)
+                allocations.append({
+                    'key': key,
+                    'machine': machine,
+                    'quantity': placed,
+                    'set_date': set_date,
+                    'end_date': set_date + timedelta(days=incubation),
+                    'start': start,
+                })
+                remaining -= placed
+
+        for allocation in allocations:
+            machine = allocation['machine']
+            window = slice(allocation.pop('start'), (allocation['end_date'] - date_from).days)
+            allocation['fill_rate'] = max(load[machine.id][window]) * 100.0 / machine.capacity
+        _logger.info("Setter plan: %s loads over %s machines", len(allocations), len(machines))
+        return allocations
+
+
+# -----------------------
+# Setter Plan (preview wizard)
+# -----------------------
+class SetterPlan(models.TransientModel):
+    _name = 'hatchery.setter.plan'
+    _description = 'Setter Loading Plan'
+
+    set_date = fields.Date(string="Set Date", required=True, default=fields.Date.context_today,
+                           help="Batches received later are set on their receipt date.")
+    egg_batch_ids = fields.Many2many('hatchery.egg.batch', string="Egg Batches")
+    prestorage_ids = fields.Many2many('hatchery.prestorage.batch', string="Pre-Storage Batches")
+    line_ids = fields.One2many('hatchery.setter.plan.line', 'plan_id', string="Planned Loads")
+    total_qty = fields.Integer(string="Eggs Planned", compute='_compute_total_qty')
+
+    @api.depends('line_ids.quantity')
+    def _compute_total_qty(self):
+        for plan in self:
+            plan.total_qty = sum(plan.line_ids.mapped('quantity'))
+
+    def _demands(self):
+        self.ensure_one()
+        demands = []
+        for batch in self.egg_batch_ids:
+            demands.append((batch, batch.qty_available, max(self.set_date, batch.date_received or self.set_date)))
+        for batch in self.prestorage_ids:
+            demands.append((batch, int(batch.available_qty), max(self.set_date, batch.date_in or self.set_date)))
+        return demands
+
+    def _compute_plan(self):
+        """Return the planned loads as ``hatchery.setter.plan.line`` values."""
+        self.ensure_one()
+        return [{
+            'egg_batch_id': allocation['key'].id if allocation['key']._name == 'hatchery.egg.batch' else False,
+            'prestorage_id': allocation['key'].id if allocation['key']._name == 'hatchery.prestorage.batch' else False,
+            'machine_id': allocation['machine'].id,
+            'quantity': allocation['quantity'],
+            'set_date': allocation['set_date'],
+            'end_date': allocation['end_date'],
+            'fill_rate': allocation['fill_rate'],
+        } for allocation in self.env['hatchery.setter.scheduler']._plan(self._demands())]
+
+    def action_replan(self):
+        for plan in self:
+            plan.line_ids = [(5, 0, 0)] + [(0, 0, vals) for vals in plan._compute_plan()]
+        return self._action_open()
+
+    def _action_open(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _("Setter Loading Plan"),
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_confirm(self):
+        """Commit the previewed loads, provided the machines still have room for them."""
+        self.ensure_one()
+        if not self.line_ids:
+            raise UserError(_("⚠ Nothing to send to the Setter."))
+        # serialize concurrent plans on the machines they load
+        machines = self.env['hatchery.setter.machine'].search([], order='id')
+        self.env.cr.execute("SELECT id FROM hatchery_setter_machine WHERE id = ANY(%s) FOR UPDATE", [machines.ids])
+        self.env['hatchery.setter.stage'].flush_model()
+        preview = sorted(
+            (line.egg_batch_id.id, line.prestorage_id.id, line.machine_id.id, line.quantity, line.set_date)
+            for line in self.line_ids
+        )
+        current = sorted(
+            (vals['egg_batch_id'], vals['prestorage_id'], vals['machine_id'], vals['quantity'], vals['set_date'])
+            for vals in self._compute_plan()
+        )
+        if preview != current:
+            raise UserError(_("⚠ Setter occupancy changed since this plan was made. Click Re-plan and review it again."))
+
+        today = fields.Date.context_today(self)
+        now = fields.Datetime.now()
+        self.env['hatchery.setter.stage'].create([{
+            'batch_id': line.egg_batch_id.id,
+            'prestorage_batch_id': line.prestorage_id.id,
+            'machine_id': line.machine_id.id,
+            'quantity_loaded': line.quantity,
+            'mortality': 0,
+            'start_date': now if line.set_date <= today else datetime.combine(line.set_date, time.min),
+            'state': 'in_setter',
+        } for line in self.line_ids])
+        self.egg_batch_ids._mark_sent_to_setter()
+        self.prestorage_ids._mark_sent_to_setter()
+        return {'type': 'ir.actions.act_window_close'}
+
+
+class SetterPlanLine(models.TransientModel):
+    _name = 'hatchery.setter.plan.line'
+    _description = 'Setter Loading Plan Line'
+    _order = 'set_date, machine_id'
+
+    plan_id = fields.Many2one('hatchery.setter.plan', required=True, ondelete='cascade')
+    egg_batch_id = fields.Many2one('hatchery.egg.batch', string="Egg Batch", readonly=True)
+    prestorage_id = fields.Many2one('hatchery.prestorage.batch', string="Pre-Storage Batch", readonly=True)
+    machine_id = fields.Many2one('hatchery.setter.machine', string="Setter Machine", readonly=True)
+    quantity = fields.Integer(string="Eggs", readonly=True)
+    set_date = fields.Date(string="Set Date", readonly=True)
+    end_date = fields.Date(string="Out of Setter", readonly=True)
+    fill_rate = fields.Float(string="Machine Fill (%)", readonly=True, digits=(5, 1))
@@ -5,13 +5,16 @@ from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# stage fields the racks of its machine are laid out from
+RACK_FIELDS = {'machine_id', 'batch_id', 'quantity_loaded', 'mortality', 'state'}
+
 # -----------------------
 # Setter Stage
 # -----------------------
 class SetterStage(models.Model):
     _name = 'hatchery.setter.stage'
     _description = 'Setter Stage'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'hatchery.lineage.mixin']
     
     name = fields.Char(
         string="Serial Number",
@@ -22,9 +25,11 @@ class SetterStage(models.Model):
     )
 
     batch_id = fields.Many2one(
-        'hatchery.egg.batch', string='Egg Batch', required=True, tracking=True,
+        'hatchery.egg.batch', string='Egg Batch', tracking=True,
         default=lambda self: self.env['hatchery.egg.batch'].search([], order='id desc', limit=1).id
     )
+    prestorage_batch_id = fields.Many2one(
+        'hatchery.prestorage.batch', string='Pre-Storage Batch', tracking=True, index=True)
     machine_id = fields.Many2one(
         'hatchery.setter.machine', string='Setter Machine', required=True)
     quantity_loaded = fields.Integer(string='Quantity Loaded', required=True)
@@ -81,11 +86,30 @@ class SetterStage(models.Model):
             if first_batch:
                 res['batch_id'] = first_batch.id
         return res
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('hatchery.setter.stage') or 'SETTER/0001'
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', 'New') == 'New':
+                vals['name'] = self.env['ir.sequence'].next_by_code('hatchery.setter.stage') or 'SETTER/0001'
+        stages = super().create(vals_list)
+        stages.machine_id._sync_racks()
+        self.env['hatchery.lineage.edge']._link([
+            (stage.prestorage_batch_id or stage.batch_id, stage, stage.quantity_loaded) for stage in stages
+        ])
+        return stages
+
+    def write(self, vals):
+        machines = self.machine_id
+        res = super().write(vals)
+        if RACK_FIELDS.intersection(vals):
+            (machines | self.machine_id)._sync_racks()
+        return res
+
+    def unlink(self):
+        machines = self.machine_id
+        res = super().unlink()
+        machines._sync_racks()
+        return res
     @api.onchange('machine_id')
     def _onchange_machine(self):
         for rec in self:
@@ -121,6 +145,12 @@ class SetterStage(models.Model):
         for rec in self:
             rec.total_broken = sum(rec.setter_break_line_ids.mapped('break_qty') or [0])
 
+    @api.constrains('batch_id', 'prestorage_batch_id')
+    def _check_source_batch(self):
+        for rec in self:
+            if not rec.batch_id and not rec.prestorage_batch_id:
+                raise UserError("⚠️ A Setter Stage must come from an Egg Batch or a Pre-Storage Batch.")
+
     # -----------------------
     # Constraint: Maximum 18 Days
     # -----------------------
@@ -138,34 +168,42 @@ class SetterStage(models.Model):
     # Stage Actions
     # -----------------------
     def action_move_to_hatcher(self):
+        """Move the stages to the Hatcher, creating all their Hatcher Stages at once."""
         HatcherStage = self.env['hatchery.hatcher.stage']
         HatcherMachine = self.env['hatchery.hatcher.machine']
 
-        for rec in self:
-            existing_hatcher = HatcherStage.search([('setter_stage_id', '=', rec.id)], limit=1)
-            if existing_hatcher:
-                 raise UserError(f"⚠️ Hatcher Stage already created for Setter Stage {rec.name}. Cannot create duplicate.")
-            rec.state = 'ready_for_hatcher'
-            rec.end_date = fields.Datetime.now()
+        existing_hatcher = HatcherStage.search([('setter_stage_id', 'in', self.ids)], limit=1)
+        if existing_hatcher:
+            raise UserError(f"⚠️ Hatcher Stage already created for Setter Stage {existing_hatcher.setter_stage_id.name}. Cannot create duplicate.")
+        not_in_setter = self.filtered(lambda s: s.state != 'in_setter')
+        if not_in_setter:
+            raise UserError(f"⚠️ Setter Stage {not_in_setter[0].name} is not in the Setter and cannot be moved to Hatcher.")
+
+        machine = HatcherMachine.search([], limit=1)
+        if not machine:
+            machine = HatcherMachine.create({'name': 'Default Hatcher Machine', 'capacity': 50000})
 
+        self.write({'state': 'ready_for_hatcher', 'end_date': fields.Datetime.now()})
+        vals_list, bodies = [], {}
+        for rec in self:
             eggs_after_setter = rec.qty_available
             success_rate = ((eggs_after_setter / rec.quantity_loaded) * 100) if rec.quantity_loaded else 0
-
-            machine = HatcherMachine.search([], limit=1)
-            if not machine:
-                machine = HatcherMachine.create({'name': 'Default Hatcher Machine', 'capacity': 50000})
-
-            HatcherStage.create({
-                'batch_id': rec.batch_id.id,
+            vals = {
                 'setter_stage_id': rec.id,
                 'machine_id': machine.id,
                 'quantity_loaded': eggs_after_setter,
                 'mortality': rec.mortality,
                 'success_rate': success_rate,
                 'state': 'in_hatcher',
-            })
+            }
+            # stages loaded from pre-storage keep the Hatcher Stage default batch
+            if rec.batch_id:
+                vals['batch_id'] = rec.batch_id.id
+            vals_list.append(vals)
+            bodies[rec.id] = f"Moved {eggs_after_setter} eggs to Hatcher. Mortality: {rec.mortality}, Success Rate: {success_rate:.1f}%"
+        HatcherStage.create(vals_list)
+        self._message_log_batch(bodies=bodies)
 
-            rec.message_post(body=f"Moved {eggs_after_setter} eggs to Hatcher. Mortality: {rec.mortality}, Success Rate: {success_rate:.1f}%")
     def action_done(self):
         for rec in self:
             if rec.state != 'ready_for_hatcher':
@@ -20,6 +20,7 @@ class StockPicking(models.Model):
         # Call the original validate
         res = super().button_validate()
 
+        lineage = []
         for picking in self:
             _logger.info("Processing Picking: %s", picking.name)
 
@@ -57,11 +58,16 @@ class StockPicking(models.Model):
                 'location_id': picking.location_dest_id.id,
             })
             _logger.info("Created Pre-Storage Batch %s with qty: %s", pre_storage.name, total_qty)
+            lineage.append((picking, pre_storage, total_qty))
 
             # Mark picking as processed to prevent duplicates
             picking.x_prestorage_created = True
             _logger.info("Marked Picking %s as pre-storage processed", picking.name)
 
+        if lineage:
+            Lineage = self.env['hatchery.lineage.edge'].sudo()
+            Lineage._link(lineage)
+            Lineage._link_picking_productions(self.browse([picking.id for picking, _batch, _qty in lineage]))
         return res
 
 
@@ -0,0 +1,18 @@
+from odoo import models, api
+
+
+class StockWarehouse(models.Model):
+    _inherit = 'stock.warehouse'
+
+    # the hatchery locations of a company default to its warehouse stock
+    @api.model_create_multi
+    def create(self, vals_list):
+        warehouses = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return warehouses
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'company_id', 'lot_stock_id', 'active'}.intersection(vals):
+            self.env.registry.clear_cache()
+        return res